@@ -4,9 +4,11 @@ from __future__ import absolute_import
 import logging
 import re
 from abc import ABCMeta, abstractmethod
+from collections import namedtuple
 from datetime import timedelta
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.urlresolvers import resolve
 from django.utils.translation import ugettext as _
 from django.utils.translation import ugettext_lazy
@@ -16,10 +18,13 @@ from six import add_metaclass
 from contentstore.course_group_config import GroupConfiguration
 from course_modes.models import CourseMode
 from eventtracking import tracker
+from openedx.core.djangoapps.waffle_utils import WaffleSwitch
 from openedx.core.lib.courses import course_image_url
 from xmodule.annotator_mixin import html_to_text
 from xmodule.library_tools import normalize_key_for_search
 from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.parent_index import get_parent_index
 
 # REINDEX_AGE is the default amount of time that we look back for changes
 # that might have happened. If we are provided with a time at which the
@@ -28,8 +33,17 @@ from xmodule.modulestore import ModuleStoreEnum
 # how far back from the trigger point to look back in order to index
 REINDEX_AGE = timedelta(0, 60)  # 60 seconds
 
+# When on, publishing a course only indexes the blocks that changed since the
+# course was last indexed, instead of walking the whole course.
+INCREMENTAL_INDEX_SWITCH = WaffleSwitch(u'courseware_index', u'incremental_index')
+
 log = logging.getLogger('edx.modulestore')
 
+# The changes to the blocks of a structure since it was last indexed: the
+# blocks to index again, the blocks on the paths from the root to those, and
+# the blocks that are no longer in the structure.
+StructureChanges = namedtuple('StructureChanges', ['changed', 'walked', 'removed'])
+
 
 def strip_html_content_to_text(html_content):
     """ Gets only the textual part for html content - useful for building text to be searched """
@@ -43,6 +57,63 @@ def strip_html_content_to_text(html_content):
     return text_content
 
 
+def get_structure_changes(old_structure, new_structure):
+    """
+    Returns the StructureChanges from `old_structure` to `new_structure`, two
+    versions of a split modulestore structure.
+
+    The index document of a block holds settings inherited from its ancestors
+    and their display names, so when the settings or the parents of a block
+    change, all of its subtree is indexed again.
+    """
+    old_blocks = old_structure['blocks']
+    new_blocks = new_structure['blocks']
+    old_parents = get_parent_index(old_structure)
+    new_parents = get_parent_index(new_structure)
+
+    def block_settings(block):
+        """ Returns the fields and defaults of `block` that its children may inherit """
+        return {name: value for name, value in block.fields.iteritems() if name != 'children'}, block.defaults
+
+    changed = set()
+    subtree_roots = []
+    for block_key, block in new_blocks.iteritems():
+        if not new_parents.has_path_to_root(block_key):
+            continue
+        old_block = old_blocks.get(block_key)
+        if old_block is None or not old_parents.has_path_to_root(block_key):
+            changed.add(block_key)
+        elif (
+                block_settings(block) != block_settings(old_block) or
+                sorted(new_parents.get_parents(block_key)) != sorted(old_parents.get_parents(block_key))
+        ):
+            subtree_roots.append(block_key)
+        elif block.definition != old_block.definition or block.fields != old_block.fields:
+            changed.add(block_key)
+
+    subtrees = set()
+    while subtree_roots:
+        block_key = subtree_roots.pop()
+        if block_key not in subtrees and block_key in new_blocks:
+            subtrees.add(block_key)
+            subtree_roots.extend(new_blocks[block_key].fields.get('children', []))
+    changed.update(subtrees)
+
+    walked = set()
+    path_keys = list(changed)
+    while path_keys:
+        block_key = path_keys.pop()
+        if block_key not in walked:
+            walked.add(block_key)
+            path_keys.extend(new_parents.get_parents(block_key))
+
+    removed = set(
+        block_key for block_key in old_blocks
+        if old_parents.has_path_to_root(block_key) and not new_parents.has_path_to_root(block_key)
+    )
+    return StructureChanges(changed, walked, removed)
+
+
 def indexing_is_enabled():
     """
     Checks to see if the indexing feature is enabled
@@ -88,7 +159,7 @@ class SearchIndexerBase(object):
 
     @classmethod
     @abstractmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
 
     @classmethod
@@ -116,7 +187,50 @@ class SearchIndexerBase(object):
         searcher.remove(cls.DOCUMENT_TYPE, result_ids)
 
     @classmethod
-    def index(cls, modulestore, structure_key, triggered_at=None, reindex_age=REINDEX_AGE):
+    def _indexed_version_cache_key(cls, structure_key):
+        """ Returns the cache key of the version of the structure that was last indexed """
+        return u'{}.indexed_version.{}'.format(cls.INDEX_NAME, structure_key)
+
+    @classmethod
+    def _get_changes(cls, modulestore, structure_key):
+        """
+        Returns the published version of the structure, and its StructureChanges
+        since the version that was last indexed, or (None, None) if they can't
+        be found, either because the structure isn't in the split modulestore,
+        or because that version isn't known.
+        """
+        indexed_version = cache.get(cls._indexed_version_cache_key(structure_key))
+        if indexed_version is None or modulestore.get_modulestore_type(structure_key) != ModuleStoreEnum.Type.split:
+            return None, None
+
+        store = modulestore._get_modulestore_for_courselike(structure_key)  # pylint: disable=protected-access
+        index_entry = store.get_course_index_info(structure_key)
+        published_version = index_entry and index_entry['versions'].get(ModuleStoreEnum.BranchName.published)
+        if published_version is None:
+            return None, None
+        old_structure = store.get_structure(structure_key, structure_key.as_object_id(indexed_version))
+        new_structure = store.get_structure(structure_key, published_version)
+        if old_structure is None or new_structure is None:
+            return None, None
+        return published_version, get_structure_changes(old_structure, new_structure)
+
+    @classmethod
+    def _remove_changed_items(cls, searcher, structure, changes, items_index):
+        """
+        Remove the items that are no longer in the structure from the index, as
+        well as the changed items that no longer have anything to add to it
+        """
+        structure_usage_id = structure.scope_ids.usage_id
+        removed_ids = set(
+            unicode(cls._id_modifier(structure_usage_id.replace(block_type=block_key.type, block_id=block_key.id)))
+            for block_key in changes.removed | changes.changed
+        )
+        removed_ids.difference_update(item_index['id'] for item_index in items_index)
+        if removed_ids:
+            searcher.remove(cls.DOCUMENT_TYPE, list(removed_ids))
+
+    @classmethod
+    def index(cls, modulestore, structure_key, triggered_at=None, reindex_age=REINDEX_AGE, incremental=False):
         """
         Process course for indexing
 
@@ -132,6 +246,12 @@ class SearchIndexerBase(object):
             which items may need to be removed from the index
             If None, then a full reindex takes place
 
+        incremental (bool) - if True, and the structure is in the split modulestore,
+            the version of the structure that was last indexed is compared with the
+            published version, and only the blocks that were added or changed are
+            indexed, and the ones that were removed are deleted from the index.
+            Falls back to walking the structure when that version isn't known.
+
         Returns:
         Number of items that have been added to the index
         """
@@ -165,7 +285,15 @@ class SearchIndexerBase(object):
             """
             return item.location.version_agnostic().replace(branch=None)
 
-        def prepare_item_index(item, skip_index=False, groups_usage_info=None):
+        def walked_filter(changes):
+            """
+            Returns the filter of the usage ids of the children to walk
+            """
+            if changes is None:
+                return None
+            return lambda usage_id: BlockKey.from_usage_key(usage_id) in changes.walked
+
+        def prepare_item_index(item, skip_index=False, groups_usage_info=None, changes=None):
             """
             Add this item to the items_index and indexed_items list
 
@@ -177,6 +305,10 @@ class SearchIndexerBase(object):
                 This should really only be passed from the recursive child calls when
                 this method has determined that it is safe to do so
 
+            changes - the StructureChanges of an incremental index; only the children
+                on the path to a changed block are walked, and only the changed
+                blocks are indexed
+
             Returns:
             item_content_groups - content groups assigned to indexed item
             """
@@ -210,18 +342,28 @@ class SearchIndexerBase(object):
 
             item_id = unicode(cls._id_modifier(item.scope_ids.usage_id))
             indexed_items.add(item_id)
+            if changes is not None:
+                if item_content_groups:
+                    # The content groups of this item depend on those of all of its
+                    # children, so its whole subtree is indexed again.
+                    changes = None
+                elif BlockKey.from_usage_key(item.location) not in changes.changed:
+                    skip_index = True
             if item.has_children:
                 # determine if it's okay to skip adding the children herein based upon how recently any may have changed
-                skip_child_index = skip_index or \
-                    (triggered_at is not None and (triggered_at - item.subtree_edited_on) > reindex_age)
+                # in an incremental index, each child is skipped unless it changed
+                skip_child_index = changes is None and (skip_index or (
+                    triggered_at is not None and (triggered_at - item.subtree_edited_on) > reindex_age
+                ))
                 children_groups_usage = []
-                for child_item in item.get_children():
+                for child_item in item.get_children(usage_id_filter=walked_filter(changes)):
                     if modulestore.has_published_version(child_item):
                         children_groups_usage.append(
                             prepare_item_index(
                                 child_item,
                                 skip_index=skip_child_index,
-                                groups_usage_info=groups_usage_info
+                                groups_usage_info=groups_usage_info,
+                                changes=changes,
                             )
                         )
                 if None in children_groups_usage:
@@ -248,19 +390,32 @@ class SearchIndexerBase(object):
                 log.warning('Could not index item: %s - %r', item.location, err)
                 error_list.append(_('Could not index item: {}').format(item.location))
 
+        indexed_version = None
+        changes = None
         try:
             with modulestore.branch_setting(ModuleStoreEnum.RevisionOption.published_only):
-                structure = cls._fetch_top_level(modulestore, structure_key)
+                if incremental:
+                    indexed_version, changes = cls._get_changes(modulestore, structure_key)
+                if changes is None:
+                    structure = cls._fetch_top_level(modulestore, structure_key)
+                    indexed_version = getattr(structure, 'course_version', None)
+                else:
+                    # The changed blocks are loaded as they are walked.
+                    structure = cls._fetch_top_level(modulestore, structure_key, depth=0)
+                    triggered_at = None
                 groups_usage_info = cls.fetch_group_usage(modulestore, structure)
 
                 # First perform any additional indexing from the structure object
                 cls.supplemental_index_information(modulestore, structure)
 
                 # Now index the content
-                for item in structure.get_children():
-                    prepare_item_index(item, groups_usage_info=groups_usage_info)
+                for item in structure.get_children(usage_id_filter=walked_filter(changes)):
+                    prepare_item_index(item, groups_usage_info=groups_usage_info, changes=changes)
                 searcher.index(cls.DOCUMENT_TYPE, items_index)
-                cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                if changes is None:
+                    cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                else:
+                    cls._remove_changed_items(searcher, structure, changes, items_index)
         except Exception as err:  # pylint: disable=broad-except
             # broad exception so that index operation does not prevent the rest of the application from working
             log.exception(
@@ -273,6 +428,9 @@ class SearchIndexerBase(object):
         if error_list:
             raise SearchIndexingError('Error(s) present during indexing', error_list)
 
+        if indexed_version is not None:
+            cache.set(cls._indexed_version_cache_key(structure_key), unicode(indexed_version), None)
+
         return indexed_count["count"]
 
     @classmethod
@@ -360,9 +518,10 @@ class CoursewareSearchIndexer(SearchIndexerBase):
         return structure_key
 
     @classmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
-        return modulestore.get_course(structure_key, depth=None)
+        # index_dictionary reads the "data" field of most items.
+        return modulestore.get_course(structure_key, depth=depth, prefetch_fields=['data'])
 
     @classmethod
     def _get_location_info(cls, normalized_structure_key):
@@ -448,9 +607,10 @@ class LibrarySearchIndexer(SearchIndexerBase):
         return normalize_key_for_search(structure_key)
 
     @classmethod
-    def _fetch_top_level(cls, modulestore, structure_key):
+    def _fetch_top_level(cls, modulestore, structure_key, depth=None):
         """ Fetch the item from the modulestore location """
-        return modulestore.get_library(structure_key, depth=None)
+        # index_dictionary reads the "data" field of most items.
+        return modulestore.get_library(structure_key, depth=depth, prefetch_fields=['data'])
 
     @classmethod
     def _get_location_info(cls, normalized_structure_key):
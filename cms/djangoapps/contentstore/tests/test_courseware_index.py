@@ -440,6 +440,50 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         indexed_count = self.reindex_course(store)
         self.assertEqual(indexed_count, 7)
 
+    def _test_incremental_index(self, store):
+        """ Make sure that an incremental index only indexes the blocks that changed """
+        self.publish_item(store, self.vertical.location)
+        indexed_count = self.reindex_course(store)
+        self.assertEqual(indexed_count, 4)
+
+        # Without changes, nothing is indexed
+        indexed_count = CoursewareSearchIndexer.index(store, self.course.id, incremental=True)
+        self.assertEqual(indexed_count, 0)
+
+        # Adding a block indexes it and its parent
+        html_unit2 = ItemFactory.create(
+            parent_location=self.vertical.location,
+            category="html",
+            display_name="Some other content",
+            publish_item=False,
+            modulestore=store,
+        )
+        self.publish_item(store, self.vertical.location)
+        indexed_count = CoursewareSearchIndexer.index(store, self.course.id, incremental=True)
+        self.assertEqual(indexed_count, 2)
+        response = self.search()
+        self.assertEqual(response["total"], 5)
+
+        # Changing the settings of a block indexes its subtree
+        self.vertical.display_name = "Subsection 1 renamed"
+        self.update_item(store, self.vertical)
+        self.publish_item(store, self.vertical.location)
+        indexed_count = CoursewareSearchIndexer.index(store, self.course.id, incremental=True)
+        self.assertEqual(indexed_count, 3)
+        response = self.search()
+        unit_locations = [
+            result["data"]["location"] for result in response["results"] if len(result["data"]["location"]) == 3
+        ]
+        self.assertEqual(unit_locations, [["Week 1", "Lesson 1", "Subsection 1 renamed"]] * 3)
+
+        # Deleting a block removes it from the index
+        self.delete_item(store, html_unit2.location)
+        self.publish_item(store, self.vertical.location)
+        indexed_count = CoursewareSearchIndexer.index(store, self.course.id, incremental=True)
+        self.assertEqual(indexed_count, 1)
+        response = self.search()
+        self.assertEqual(response["total"], 4)
+
     def _test_course_about_property_index(self, store):
         """ Test that informational properties in the course object end up in the course_info index """
         display_name = "Help, I need somebody!"
@@ -575,6 +619,9 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
     def test_exception(self, store_type):
         self._perform_test_using_store(store_type, self._test_exception)
 
+    def test_incremental_index(self):
+        self._perform_test_using_store(ModuleStoreEnum.Type.split, self._test_incremental_index)
+
     @ddt.data(*WORKS_WITH_STORES)
     def test_course_about_property_index(self, store_type):
         self._perform_test_using_store(store_type, self._test_course_about_property_index)
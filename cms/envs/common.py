@@ -491,6 +491,7 @@ MIDDLEWARE_CLASSES = [
     'django.middleware.locale.LocaleMiddleware',
 
     'codejail.django_integration.ConfigureCodeJailMiddleware',
+    'util.sandboxing.ConfigureSandboxWorkerPoolMiddleware',
 
     # catches any uncaught RateLimitExceptions and returns a 403 instead of a 500
     'ratelimitbackend.middleware.RateLimitMiddleware',
@@ -576,6 +577,23 @@ MODULESTORE = {
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
 
+# Local tiers of the course asset cache used by the contentserver.  Small assets can be kept
+# in each process for TIMEOUT seconds, and the data of assets too large for the
+# "course_assets" cache can be kept in files in DIRECTORY.  Both are turned off by default.
+COURSE_ASSETS_LOCAL_CACHE = {
+    'MAX_SIZE': 0,
+    'MAX_ITEM_SIZE': 32 * 1024,
+    'TIMEOUT': 60,
+}
+COURSE_ASSETS_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_SIZE': 1024 * 1024 * 1024,
+}
+
+# Size in bytes (of their pickles) of the decoded course structures that each process keeps
+# in memory, in front of the "course_structure_cache" cache.  0 turns this off.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE = 0
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -589,6 +607,16 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pool of pre-started sandboxed Python interpreters used by capa's safe_exec.
+    'worker_pool': {
+        # How many interpreters to run at most?  0 means don't use a pool.
+        'size': 0,
+        # How many jobs can an interpreter run before it is replaced?
+        'max_jobs': 100,
+        # How many seconds can a job take before its interpreter is killed?
+        'timeout': 10,
+    },
 }
 
 ############################ DJANGO_BUILTINS ################################
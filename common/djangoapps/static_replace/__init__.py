@@ -5,6 +5,7 @@ from django.contrib.staticfiles.storage import staticfiles_storage
 from django.contrib.staticfiles import finders
 from django.conf import settings
 
+from openedx.core.djangoapps.contentserver.caching import get_asset_manifest
 from xmodule.contentstore.content import StaticContent
 
 from opaque_keys.edx.locator import AssetLocator
@@ -13,6 +14,9 @@ from six import text_type
 log = logging.getLogger(__name__)
 XBLOCK_STATIC_RESOURCE_PREFIX = '/static/xblock'
 
+# Compiled url replacement regexes, by pattern.
+_COMPILED_REGEXES = {}
+
 
 def _url_replace_regex(prefix):
     """
@@ -30,6 +34,27 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+def _compiled_url_replace_regex(prefix):
+    """
+    Return the compiled _url_replace_regex for `prefix`, compiling it only once.
+    """
+    pattern = _url_replace_regex(prefix)
+    regex = _COMPILED_REGEXES.get(pattern)
+    if regex is None:
+        regex = _COMPILED_REGEXES[pattern] = re.compile(pattern)
+    return regex
+
+
+def _static_url_prefix(data_dir=None):
+    """
+    The prefix of the static urls that are replaced for content from `data_dir`.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -71,7 +96,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _compiled_url_replace_regex('/jump_to_id/').sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -91,13 +116,13 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compiled_url_replace_regex('/course/').sub(replace_course_url, text)
 
 
-def process_static_urls(text, replacement_function, data_dir=None):
+def _static_url_extractor(replacement_function):
     """
-    Run an arbitrary replacement function on any urls matching the static file
-    directory
+    Return a function that calls `replacement_function` with the parts of a
+    static url match, unless it is an XBlock resource url.
     """
     def wrap_part_extraction(match):
         """
@@ -121,12 +146,16 @@ def process_static_urls(text, replacement_function, data_dir=None):
 
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
+    return wrap_part_extraction
+
+
+def process_static_urls(text, replacement_function, data_dir=None):
+    """
+    Run an arbitrary replacement function on any urls matching the static file
+    directory
+    """
+    return _compiled_url_replace_regex(_static_url_prefix(data_dir)).sub(
+        _static_url_extractor(replacement_function),
         text
     )
 
@@ -160,6 +189,19 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
     course_id: The course identifier used to distinguish static content for this course in studio
     static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
     """
+    return process_static_urls(
+        text,
+        _static_url_replacer(data_directory, course_id, static_asset_path),
+        data_dir=static_asset_path or data_directory
+    )
+
+
+def _static_url_replacer(data_directory, course_id, static_asset_path):
+    """
+    Return the replacement function that replace_static_urls runs on each static url.
+    """
+    # The course's asset manifest, fetched when the first course asset url is found.
+    asset_manifests = []
 
     def replace_static_url(original, prefix, quote, rest):
         """
@@ -193,7 +235,11 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
                 from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
                 base_url = AssetBaseUrlConfig.get_base_url()
                 excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
+                if not asset_manifests:
+                    asset_manifests.append(get_asset_manifest(course_id))
+                url = StaticContent.get_canonicalized_asset_path(
+                    course_id, rest, base_url, excluded_exts, asset_manifest=asset_manifests[0]
+                )
 
                 if AssetLocator.CANONICAL_NAMESPACE in url:
                     url = url.replace('block@', 'block/', 1)
@@ -215,4 +261,47 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
 
         return "".join([quote, url, quote])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    return replace_static_url
+
+
+def replace_urls(text, course_id, data_directory=None, static_asset_path='', jump_to_id_base_url=None):
+    """
+    Do the replacements of replace_static_urls, replace_course_urls and, if
+    jump_to_id_base_url is given, replace_jump_to_id_urls, in a single pass
+    over the text.
+
+    The result is the same as running those functions one after the other,
+    except that a url inside the quotes of another url isn't replaced.
+
+    text: The source text to do the substitution in
+    course_id: The course identifier used to distinguish static content for this course in studio
+    data_directory: The directory in which course data is stored
+    static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
+    jump_to_id_base_url: The base of the jump_to_id urls, see replace_jump_to_id_urls
+    """
+    prefixes = [
+        u'(?P<static>{})'.format(_static_url_prefix(static_asset_path or data_directory)),
+        u'(?P<course>/course/)',
+    ]
+    if jump_to_id_base_url is not None:
+        prefixes.append(u'(?P<jump_to_id>/jump_to_id/)')
+
+    replace_static_url = _static_url_extractor(
+        _static_url_replacer(data_directory, course_id, static_asset_path)
+    )
+    course_url_base = '/courses/' + text_type(course_id) + '/'
+
+    def replace_url(match):
+        """
+        Replace a single matched url, according to the prefix that it matched.
+        """
+        if match.group('static') is not None:
+            return replace_static_url(match)
+
+        quote = match.group('quote')
+        rest = match.group('rest')
+        if match.group('course') is not None:
+            return "".join([quote, course_url_base, rest, quote])
+        return "".join([quote, jump_to_id_base_url + rest, quote])
+
+    return _compiled_url_replace_regex(u'|'.join(prefixes)).sub(replace_url, text)
@@ -0,0 +1,84 @@
+"""
+Benchmark for rewriting the urls in course html with the separate
+static_replace passes, and with replace_urls in a single pass.
+
+The html is the html of the test courses in common/test/data.  Run in
+`./manage.py lms shell` with:
+    from static_replace.test.benchmark_static_replace import main; main()
+"""
+import glob
+import os
+import time
+
+from django.conf import settings
+from opaque_keys.edx.keys import CourseKey
+
+from static_replace import replace_course_urls, replace_jump_to_id_urls, replace_static_urls, replace_urls
+
+COURSE_KEY = CourseKey.from_string('edX/toy/2012_Fall')
+JUMP_TO_ID_BASE_URL = '/courses/edX/toy/2012_Fall/jump_to_id/'
+
+
+def load_html():
+    """
+    Return the (data directory, html) of the html files of the test courses.
+    """
+    data_root = os.path.join(settings.COMMON_ROOT, 'test', 'data')
+    documents = []
+    for path in sorted(glob.glob(os.path.join(data_root, '*', 'html', '*.html'))):
+        with open(path) as html_file:
+            documents.append((os.path.basename(os.path.dirname(os.path.dirname(path))), html_file.read()))
+    return documents
+
+
+def separate_passes(data_dir, html):
+    """
+    Rewrite the urls in `html` the way module_render used to.
+    """
+    html = replace_static_urls(html, course_id=COURSE_KEY, static_asset_path=data_dir)
+    html = replace_course_urls(html, COURSE_KEY)
+    return replace_jump_to_id_urls(html, COURSE_KEY, JUMP_TO_ID_BASE_URL)
+
+
+def single_pass(data_dir, html):
+    """
+    Rewrite the urls in `html` with replace_urls.
+    """
+    return replace_urls(html, COURSE_KEY, static_asset_path=data_dir, jump_to_id_base_url=JUMP_TO_ID_BASE_URL)
+
+
+def time_rewrites(rewrite, documents, number):
+    """
+    Return the seconds taken to rewrite all of `documents` `number` times.
+    """
+    start = time.time()
+    for __ in xrange(number):
+        for data_dir, html in documents:
+            rewrite(data_dir, html)
+    return time.time() - start
+
+
+def main(number=100):
+    """
+    Print the time taken to rewrite each html document with and without a single pass.
+    """
+    documents = load_html()
+    if not documents:
+        print "No course html found."
+        return
+
+    for data_dir, html in documents:
+        if separate_passes(data_dir, html) != single_pass(data_dir, html):
+            print "Results differ for an html document of {}.".format(data_dir)
+
+    total_size = sum(len(html) for __, html in documents)
+    print "{} documents, {} bytes".format(len(documents), total_size)
+    for name, rewrite in (("separate passes", separate_passes), ("single pass", single_pass)):
+        seconds = time_rewrites(rewrite, documents, number)
+        print "{:16} {:.1f} us per document, {:.1f} MB/s".format(
+            name + ":", seconds / (number * len(documents)) * 1000000, total_size * number / seconds / 1000000,
+        )
+
+
+if __name__ == '__main__':
+    main()
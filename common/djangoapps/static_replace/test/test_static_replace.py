@@ -15,12 +15,16 @@ from opaque_keys.edx.keys import CourseKey
 from PIL import Image
 
 from static_replace import (
+    _compiled_url_replace_regex,
     _url_replace_regex,
     make_static_urls_absolute,
     process_static_urls,
     replace_course_urls,
-    replace_static_urls
+    replace_jump_to_id_urls,
+    replace_static_urls,
+    replace_urls
 )
+from openedx.core.djangoapps.contentserver.caching import del_cached_content, get_asset_manifest
 from xmodule.assetstore.assetmgr import AssetManager
 from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.django import contentstore
@@ -119,7 +123,10 @@ def test_storage_url_not_exists(mock_storage):
 @patch('xmodule.modulestore.django.modulestore', autospec=True)
 @patch('static_replace.models.AssetBaseUrlConfig.get_base_url')
 @patch('static_replace.models.AssetExcludedExtensionsConfig.get_excluded_extensions')
-def test_mongo_filestore(mock_get_excluded_extensions, mock_get_base_url, mock_modulestore, mock_static_content):
+@patch('static_replace.get_asset_manifest')
+def test_mongo_filestore(
+        mock_get_asset_manifest, mock_get_excluded_extensions, mock_get_base_url, mock_modulestore, mock_static_content
+):
 
     mock_modulestore.return_value = Mock(MongoModuleStore)
     mock_static_content.get_canonicalized_asset_path.return_value = "c4x://mock_url"
@@ -135,7 +142,10 @@ def test_mongo_filestore(mock_get_excluded_extensions, mock_get_base_url, mock_m
         replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY, course_id=COURSE_KEY)
     )
 
-    mock_static_content.get_canonicalized_asset_path.assert_called_once_with(COURSE_KEY, 'file.png', u'', ['foobar'])
+    mock_static_content.get_canonicalized_asset_path.assert_called_once_with(
+        COURSE_KEY, 'file.png', u'', ['foobar'], asset_manifest=mock_get_asset_manifest.return_value
+    )
+    mock_get_asset_manifest.assert_called_once_with(COURSE_KEY)
 
 
 @patch('static_replace.settings', autospec=True)
@@ -232,6 +242,48 @@ def test_static_url_with_xblock_resource_on_cdn(mock_modulestore, mock_storage):
 
 
 @ddt.ddt
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_replace_urls(mock_storage):
+    """
+    Make sure that replace_urls does the replacements of the separate
+    replace functions in one pass.
+    """
+    mock_storage.exists.return_value = False
+    mock_storage.url.side_effect = lambda path: '/static/hashed/' + path
+
+    text = (
+        '<img src="/static/file.png"/><a href=\'/course/info\'>info</a>'
+        '<a href="/jump_to_id/abc">jump</a><a href="/static/xblock/resources/a.png">xblock</a>'
+        '<a href="/static/file.pdf?raw">raw</a>'
+    )
+    separately = replace_jump_to_id_urls(
+        replace_course_urls(
+            replace_static_urls(text, course_id=COURSE_KEY, static_asset_path=DATA_DIRECTORY), COURSE_KEY
+        ),
+        COURSE_KEY,
+        '/jump_base/'
+    )
+    assert_equals(
+        separately,
+        replace_urls(text, COURSE_KEY, static_asset_path=DATA_DIRECTORY, jump_to_id_base_url='/jump_base/')
+    )
+    assert_true('/static/hashed/data_dir/file.png' in separately)
+    assert_true('/courses/org/course/run/info' in separately)
+    assert_true('/jump_base/abc' in separately)
+
+    # Without a jump_to_id base url, /jump_to_id/ urls are left alone.
+    assert_true('"/jump_to_id/abc"' in replace_urls(text, COURSE_KEY, static_asset_path=DATA_DIRECTORY))
+
+
+def test_compiled_url_replace_regex():
+    """
+    Make sure that each url replacement regex is compiled only once.
+    """
+    regex = _compiled_url_replace_regex('/course/')
+    assert_true(regex is _compiled_url_replace_regex('/course/'))
+    assert_true(regex.match('"/course/file.png"'))
+
+
 class CanonicalContentTest(SharedModuleStoreTestCase):
     """
     Tests the generation of canonical asset URLs for different types
@@ -768,3 +820,39 @@ class CanonicalContentTest(SharedModuleStoreTestCase):
             print expected
             print asset_path
             self.assertIsNotNone(re.match(expected, asset_path))
+
+    @ddt.data('split', 'old')
+    def test_canonical_asset_path_with_manifest(self, prefix):
+        course_key = self.courses[prefix].id
+        paths = [
+            u'{}_ünlöck.png'.format(prefix),
+            u'{}_lock.png'.format(prefix),
+            u'special/weird {}_ünlöck.png'.format(prefix),
+            u'{}_excluded.html'.format(prefix),
+            u'/static/{}_ünlöck.png?foo=/static/{}_lock.png'.format(prefix, prefix),
+            u'nonexistent.png',
+        ]
+        expected = [
+            StaticContent.get_canonicalized_asset_path(course_key, path, u'dev', ['.html'])
+            for path in paths
+        ]
+
+        manifest = contentstore().get_asset_manifest(course_key)
+        with check_mongo_calls(0):
+            actual = [
+                StaticContent.get_canonicalized_asset_path(course_key, path, u'dev', ['.html'], asset_manifest=manifest)
+                for path in paths
+            ]
+        self.assertEqual(actual, expected)
+
+    def test_asset_manifest_invalidation(self):
+        course_key = self.courses['split'].id
+        replace_static_urls(STATIC_SOURCE, course_id=course_key)
+        with check_mongo_calls(0):
+            manifest = get_asset_manifest(course_key)
+        self.assertIsNone(manifest.get(StaticContent.compute_location(course_key, 'new.png')))
+
+        new_content = self.create_arbitrary_content('split', 'new.png')
+        self.addCleanup(contentstore().delete, new_content.location)
+        del_cached_content(new_content.location)
+        self.assertIsNotNone(get_asset_manifest(course_key).get(new_content.location))
@@ -0,0 +1,177 @@
+"""
+Event tracker backend that sends events to another backend in batches.
+
+Events are put on an in-process queue by `send`, and a background thread
+sends them to the wrapped backend with its `send_batch` method, once
+`max_batch_size` events are queued or the oldest queued event has waited
+`max_delay` seconds.  This keeps the latency of the wrapped backend out of
+the request.
+
+The backend can be configured in the tracking settings as::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'track.backends.batching.BatchingBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {...},
+              },
+              'max_batch_size': 100,
+              'max_delay': 1,
+              'max_queue_size': 10000,
+              'overflow': 'drop',
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+import time
+from Queue import Empty, Full, Queue
+
+from django.db import close_old_connections
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend
+
+log = logging.getLogger(__name__)
+
+# Put on the queue to stop the flush thread.
+_STOP = object()
+
+
+class BatchingBackend(BaseBackend):
+    """
+    Event tracker backend that queues events and sends them to another
+    backend in batches from a background thread.
+    """
+
+    def __init__(self, backend, max_batch_size=100, max_delay=1, max_queue_size=10000,
+                 overflow='drop', block_timeout=1, **kwargs):
+        """
+        Configure the batching backend.
+
+        :Parameters:
+
+          - `backend`: dict with the `ENGINE` and `OPTIONS` of the wrapped
+            backend, in the same form as the `TRACKING_BACKENDS` setting.
+          - `max_batch_size`: largest number of events sent in one batch.
+          - `max_delay`: seconds an event can wait for its batch to fill up.
+          - `max_queue_size`: largest number of events waiting to be sent.
+          - `overflow`: what `send` does when the queue is full, either
+            'drop' the event, or 'block' until there is room for it.
+          - `block_timeout`: seconds to block before dropping the event,
+            when `overflow` is 'block'.  None blocks indefinitely.
+
+        """
+        super(BatchingBackend, self).__init__(**kwargs)
+
+        if overflow not in ('drop', 'block'):
+            raise ValueError('Invalid overflow policy %s' % overflow)
+
+        # Imported here, since the tracker module instantiates the backends
+        # when it is imported.
+        from track.tracker import _instantiate_backend_from_name
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_queue_size = max_queue_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+
+        self._queue = Queue(max_queue_size)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def send(self, event):
+        """Queue the event to be sent in a batch."""
+        self._start_thread()
+        try:
+            if self.overflow == 'block':
+                self._queue.put(event, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(event)
+        except Full:
+            dog_stats_api.increment('track.batching.dropped')
+
+    def close(self):
+        """
+        Send the queued events, and stop the flush thread.
+        """
+        with self._lock:
+            thread = self._thread if self._pid == os.getpid() else None
+            self._thread = None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _start_thread(self):
+        """
+        Start the flush thread, if it isn't running in this process.
+
+        A process forked from one that has queued events gets its own queue,
+        so that those events are only sent by one process.
+        """
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                if self._pid != os.getpid():
+                    self._queue = Queue(self.max_queue_size)
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='track.batching')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def _run(self):
+        """
+        Send batches of queued events until `_STOP` is queued.
+        """
+        queue = self._queue
+        stopping = False
+        while not stopping:
+            batch = []
+            event = queue.get()
+            deadline = time.time() + self.max_delay
+            while event is not _STOP:
+                batch.append(event)
+                remaining = deadline - time.time()
+                if len(batch) >= self.max_batch_size or remaining <= 0:
+                    break
+                try:
+                    event = queue.get(timeout=remaining)
+                except Empty:
+                    break
+            else:
+                stopping = True
+
+            if batch:
+                self._flush(batch, queue.qsize())
+
+    def _flush(self, batch, queue_depth):
+        """
+        Send `batch` to the wrapped backend.
+        """
+        dog_stats_api.histogram('track.batching.queue_depth', queue_depth)
+        dog_stats_api.histogram('track.batching.batch_size', len(batch))
+        start = time.time()
+        try:
+            self.backend.send_batch(batch)
+        except Exception:  # pylint: disable=broad-except
+            # The thread must keep running, so the batch is lost.
+            log.exception('Error sending a batch of %d tracking events', len(batch))
+            dog_stats_api.increment('track.batching.failed', len(batch))
+        finally:
+            # This thread isn't handling a request, so Django won't close its
+            # database connection.
+            close_old_connections()
+        dog_stats_api.histogram('track.batching.flush_time', time.time() - start)
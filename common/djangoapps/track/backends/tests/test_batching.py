@@ -0,0 +1,93 @@
+from __future__ import absolute_import
+
+import threading
+from unittest import TestCase
+
+from mock import patch
+
+from track.backends import BaseBackend
+from track.backends.batching import BatchingBackend
+
+
+class InMemoryBackend(BaseBackend):
+    """A backend that records the batches it is sent."""
+    def __init__(self, **kwargs):
+        super(InMemoryBackend, self).__init__(**kwargs)
+        self.batches = []
+        self.sending = threading.Event()
+        self.sending.set()
+
+    def send(self, event):
+        self.send_batch([event])
+
+    def send_batch(self, events):
+        self.sending.wait()
+        self.batches.append(list(events))
+
+
+class TestBatchingBackend(TestCase):
+    def create_backend(self, **options):
+        backend = BatchingBackend(
+            backend={'ENGINE': 'track.backends.tests.test_batching.InMemoryBackend'},
+            **options
+        )
+        self.addCleanup(backend.close)
+        return backend
+
+    def test_batch_size(self):
+        backend = self.create_backend(max_batch_size=2, max_delay=60)
+        for i in range(5):
+            backend.send({'test': i})
+        backend.close()
+
+        self.assertEqual(
+            backend.backend.batches,
+            [[{'test': 0}, {'test': 1}], [{'test': 2}, {'test': 3}], [{'test': 4}]],
+        )
+
+    def test_max_delay(self):
+        backend = self.create_backend(max_batch_size=100, max_delay=0.01)
+        backend.send({'test': 0})
+        backend._thread.join(0.5)  # pylint: disable=protected-access
+
+        # The batch was sent without waiting for it to fill up.
+        self.assertEqual(backend.backend.batches, [[{'test': 0}]])
+
+    @patch('track.backends.batching.dog_stats_api')
+    def test_drop_when_full(self, mock_stats):
+        backend = self.create_backend(max_batch_size=1, max_queue_size=1)
+        backend.backend.sending.clear()
+        backend.send({'test': 0})
+        # Wait for the flush thread to start sending the first event.
+        while not backend._queue.empty():  # pylint: disable=protected-access
+            pass
+        backend.send({'test': 1})
+        backend.send({'test': 2})
+        mock_stats.increment.assert_called_once_with('track.batching.dropped')
+
+        backend.backend.sending.set()
+        backend.close()
+        self.assertEqual(backend.backend.batches, [[{'test': 0}], [{'test': 1}]])
+
+    @patch('track.backends.batching.dog_stats_api')
+    def test_block_when_full(self, mock_stats):
+        backend = self.create_backend(max_batch_size=1, max_queue_size=1, overflow='block')
+        for i in range(3):
+            backend.send({'test': i})
+        backend.close()
+
+        self.assertFalse(mock_stats.increment.called)
+        self.assertEqual(backend.backend.batches, [[{'test': 0}], [{'test': 1}], [{'test': 2}]])
+
+    @patch('track.backends.batching.log')
+    def test_send_error(self, mock_log):
+        backend = self.create_backend(max_batch_size=1)
+        with patch.object(InMemoryBackend, 'send_batch', side_effect=[Exception, None]):
+            backend.send({'test': 0})
+            backend.send({'test': 1})
+            backend.close()
+        self.assertTrue(mock_log.exception.called)
+
+    def test_invalid_overflow(self):
+        with self.assertRaises(ValueError):
+            self.create_backend(overflow='wait')
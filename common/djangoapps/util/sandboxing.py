@@ -1,6 +1,8 @@
 import re
 
+from capa.safe_exec.safe_exec import configure_worker_pool
 from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
 from lms.djangoapps.dashboard.git_import import DEFAULT_PYTHON_LIB_FILENAME
 
 
@@ -38,3 +40,21 @@ def get_python_lib_zip(contentstore, course_id):
         return zip_lib.data
     else:
         return None
+
+
+class ConfigureSandboxWorkerPoolMiddleware(object):
+    """
+    Configure capa's pool of sandboxed Python interpreters from
+    CODE_JAIL['worker_pool'].
+
+    Like codejail's ConfigureCodeJailMiddleware, this only runs once, when
+    the middleware is loaded.
+    """
+    def __init__(self):
+        pool_settings = settings.CODE_JAIL.get('worker_pool') or {}
+        configure_worker_pool(
+            pool_settings.get('size', 0),
+            max_jobs=pool_settings.get('max_jobs', 100),
+            timeout=pool_settings.get('timeout', 10),
+        )
+        raise MiddlewareNotUsed
@@ -2,12 +2,14 @@
 Tests for sandboxing.py in util app
 """
 
+from django.core.exceptions import MiddlewareNotUsed
 from django.test import TestCase
 from django.test.utils import override_settings
+from mock import patch
 from opaque_keys.edx.keys import CourseKey
 from opaque_keys.edx.locator import CourseLocator, LibraryLocator
 
-from util.sandboxing import can_execute_unsafe_code
+from util.sandboxing import ConfigureSandboxWorkerPoolMiddleware, can_execute_unsafe_code
 
 
 class SandboxingTest(TestCase):
@@ -38,3 +40,22 @@ class SandboxingTest(TestCase):
         self.assertFalse(can_execute_unsafe_code(CourseLocator('edX', 'full', '2012_Fall')))
         self.assertFalse(can_execute_unsafe_code(CourseLocator('edX', 'full', '2013_Spring')))
         self.assertFalse(can_execute_unsafe_code(LibraryLocator('edX', 'test_bank')))
+
+
+class ConfigureSandboxWorkerPoolMiddlewareTest(TestCase):
+    """
+    Test configuring the sandbox worker pool
+    """
+    @patch('util.sandboxing.configure_worker_pool')
+    def test_configure(self, mock_configure):
+        with override_settings(CODE_JAIL={'worker_pool': {'size': 4, 'max_jobs': 50, 'timeout': 5}}):
+            with self.assertRaises(MiddlewareNotUsed):
+                ConfigureSandboxWorkerPoolMiddleware()
+        mock_configure.assert_called_once_with(4, max_jobs=50, timeout=5)
+
+    @patch('util.sandboxing.configure_worker_pool')
+    def test_not_configured(self, mock_configure):
+        with override_settings(CODE_JAIL={}):
+            with self.assertRaises(MiddlewareNotUsed):
+                ConfigureSandboxWorkerPoolMiddleware()
+        mock_configure.assert_called_once_with(0, max_jobs=100, timeout=10)
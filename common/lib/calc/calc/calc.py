@@ -7,6 +7,8 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import numbers
 import operator
+import threading
+from collections import OrderedDict
 
 import numpy
 import scipy.constants
@@ -70,6 +72,12 @@ DEFAULT_FUNCTIONS = {
     'arccoth': functions.arccoth
 }
 
+# Default functions which accept NumPy arrays and apply elementwise. Other
+# functions are called once per sample when evaluating over arrays.
+ARRAY_FUNCTIONS = set(
+    func for func in DEFAULT_FUNCTIONS.itervalues() if func is not math.factorial
+)
+
 DEFAULT_VARIABLES = {
     'i': numpy.complex(0, 1),
     'j': numpy.complex(0, 1),
@@ -93,6 +101,10 @@ SUFFIXES = {
 }
 
 
+# Maximum number of parsed expressions kept by `parse_expression`.
+PARSE_CACHE_SIZE = 1024
+
+
 class UndefinedVariable(Exception):
     """
     Indicate when a student inputs a variable which was not expected.
@@ -220,6 +232,75 @@ def eval_product(parse_result):
     return prod
 
 
+# The following functions are the array counterparts of the evaluation actions
+# above, used by `evaluator_samples`. Each value may be a NumPy array holding
+# one entry per sample, so operators are told apart from values by type.
+
+def eval_atom_array(parse_result):
+    """
+    Return the value wrapped by the atom, ignoring any parentheses.
+    """
+    return next(k for k in parse_result if not isinstance(k, basestring))
+
+
+def eval_power_array(parse_result):
+    """
+    Exponentiate the values right to left, like `eval_power`.
+    """
+    parse_result = reversed([k for k in parse_result if not isinstance(k, basestring)])
+    return reduce(lambda a, b: b ** a, parse_result)
+
+
+def eval_parallel_array(parse_result):
+    """
+    Apply the parallel resistors operator, like `eval_parallel`.
+
+    Zero inputs divide by zero here, which makes `evaluator_samples` fall back
+    to `eval_parallel` (and its NaN result) for every sample.
+    """
+    if len(parse_result) == 1:
+        return parse_result[0]
+    reciprocals = [1. / e for e in parse_result if not isinstance(e, basestring)]
+    return 1. / sum(reciprocals)
+
+
+def eval_sum_array(parse_result):
+    """
+    Add the values, keeping in mind their sign, like `eval_sum`.
+    """
+    total = 0.0
+    current_op = operator.add
+    for token in parse_result:
+        if isinstance(token, basestring):
+            current_op = operator.sub if token == '-' else operator.add
+        else:
+            total = current_op(total, token)
+    return total
+
+
+def eval_product_array(parse_result):
+    """
+    Multiply the values, like `eval_product`.
+    """
+    prod = 1.0
+    current_op = operator.mul
+    for token in parse_result:
+        if isinstance(token, basestring):
+            current_op = operator.truediv if token == '/' else operator.mul
+        else:
+            prod = current_op(prod, token)
+    return prod
+
+
+def apply_function_array(func, arg):
+    """
+    Apply a unary function to a value which may hold one entry per sample.
+    """
+    if func in ARRAY_FUNCTIONS or numpy.ndim(arg) == 0:
+        return func(arg)
+    return numpy.array([func(value) for value in arg])
+
+
 def add_defaults(variables, functions, case_sensitive):
     """
     Create dictionaries with both the default and user-defined variables.
@@ -249,8 +330,7 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
         return float('nan')
 
     # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    math_interpreter = parse_expression(math_expr, case_sensitive)
 
     # Get our variables together.
     all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
@@ -258,12 +338,53 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     # ...and check them
     math_interpreter.check_variables(all_variables, all_functions)
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
+    return evaluate_tree(math_interpreter, all_variables, all_functions)
+
 
+def evaluator_samples(variables_list, functions, math_expr, case_sensitive=False):
+    """
+    Evaluate an expression once for each dictionary in `variables_list`.
+
+    Return the same list of results as calling `evaluator` for each dictionary,
+    but parse the expression only once and, where possible, evaluate it over
+    all the samples at once with NumPy arrays. When that raises or runs into a
+    floating point error, evaluate the samples one by one instead, so that
+    results and exceptions match those of `evaluator`.
+    """
+    if math_expr.strip() == "":
+        return [float('nan')] * len(variables_list)
+    if not variables_list:
+        return []
+
+    math_interpreter = parse_expression(math_expr, case_sensitive)
+
+    samples = []
+    for variables in variables_list:
+        all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+        math_interpreter.check_variables(all_variables, all_functions)
+        samples.append(all_variables)
+
+    try:
+        with numpy.errstate(divide='raise', over='raise', invalid='raise'):
+            result = evaluate_tree_array(math_interpreter, samples, all_functions)
+    except Exception:  # pylint: disable=broad-except
+        result = None
+
+    if result is not None:
+        if numpy.ndim(result) == 0:
+            return [result] * len(samples)
+        if numpy.shape(result) == (len(samples),):
+            return list(result)
+
+    return [evaluate_tree(math_interpreter, sample, all_functions) for sample in samples]
+
+
+def evaluate_tree(math_interpreter, all_variables, all_functions):
+    """
+    Evaluate the parsed tree of `math_interpreter` with the given variables and
+    functions, which include the defaults.
+    """
+    casify = math_interpreter.casify
     evaluate_actions = {
         'number': eval_number,
         'variable': lambda x: all_variables[casify(x[0])],
@@ -278,6 +399,98 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     return math_interpreter.reduce_tree(evaluate_actions)
 
 
+def evaluate_tree_array(math_interpreter, samples, all_functions):
+    """
+    Evaluate the parsed tree of `math_interpreter` over all the variable
+    dictionaries in `samples` at once.
+
+    Each variable is bound to a NumPy array holding its value in every sample.
+    Return an array with one result per sample, or a single value if the
+    expression does not depend on the samples.
+    """
+    casify = math_interpreter.casify
+    array_variables = {}
+
+    def variable_array(name):
+        """
+        Return the array of values of the given (casified) variable.
+        """
+        if name not in array_variables:
+            array_variables[name] = numpy.array([all_variables[name] for all_variables in samples])
+        return array_variables[name]
+
+    evaluate_actions = {
+        'number': eval_number,
+        'variable': lambda x: variable_array(casify(x[0])),
+        'function': lambda x: apply_function_array(all_functions[casify(x[0])], x[1]),
+        'atom': eval_atom_array,
+        'power': eval_power_array,
+        'parallel': eval_parallel_array,
+        'product': eval_product_array,
+        'sum': eval_sum_array
+    }
+
+    return math_interpreter.reduce_tree(evaluate_actions)
+
+
+class ParseCache(object):
+    """
+    A bounded, least-recently-used cache of parsed expressions.
+
+    Keys are `(math_expr, case_sensitive)` and values are ParseAugmenters whose
+    `parse_algebra` has already run. Parse trees do not depend on the values
+    of variables or functions, so a cached tree can be evaluated with any.
+    """
+    def __init__(self, max_size=PARSE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, math_expr, case_sensitive):
+        """
+        Return the parsed expression, parsing and caching it if needed.
+
+        Expressions which fail to parse are not cached.
+        """
+        key = (math_expr, case_sensitive)
+        with self._lock:
+            math_interpreter = self._entries.pop(key, None)
+            if math_interpreter is not None:
+                self._entries[key] = math_interpreter
+                return math_interpreter
+
+        math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+        math_interpreter.parse_algebra()
+
+        with self._lock:
+            self._entries[key] = math_interpreter
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return math_interpreter
+
+    def clear(self):
+        """
+        Remove all the parsed expressions.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+PARSE_CACHE = ParseCache()
+
+
+def parse_expression(math_expr, case_sensitive=False):
+    """
+    Return a ParseAugmenter holding the parse tree of `math_expr`.
+
+    The result is shared through `PARSE_CACHE`, so it must not be modified.
+    """
+    return PARSE_CACHE.get(math_expr, case_sensitive)
+
+
 class ParseAugmenter(object):
     """
     Holds the data for a particular parse.
@@ -315,6 +528,14 @@ class ParseAugmenter(object):
         self.variable_parse_action = vpa
         self.function_parse_action = fpa
 
+    def casify(self, name):
+        """
+        Return the form of `name` used to look up variables and functions.
+        """
+        if self.case_sensitive:
+            return name
+        return name.lower()  # Lowercase for case insens.
+
     def parse_algebra(self):
         """
         Parse an algebraic expression into a tree.
@@ -423,10 +644,7 @@ class ParseAugmenter(object):
 
         Otherwise, raise an UndefinedVariable containing all bad variables.
         """
-        if self.case_sensitive:
-            casify = lambda x: x
-        else:
-            casify = lambda x: x.lower()  # Lowercase for case insens.
+        casify = self.casify
 
         # Test if casify(X) is valid, but return the actual bad input (i.e. X)
         bad_vars = set(var for var in self.variables_used
@@ -49,10 +49,9 @@ def arccot(val):
     """
     Inverse cotangent
     """
-    if numpy.real(val) < 0:
-        return -numpy.pi / 2 - numpy.arctan(val)
-    else:
-        return numpy.pi / 2 - numpy.arctan(val)
+    # Pick the branch per element, so that arrays of values are supported.
+    offset = numpy.where(numpy.real(val) < 0, -numpy.pi / 2, numpy.pi / 2)
+    return offset - numpy.arctan(val)
 
 
 # Hyperbolic Trig
@@ -0,0 +1,49 @@
+"""
+Benchmark for the parse cache of calc.evaluator.
+
+Run with:
+    python -m calc.tests.benchmark_calc
+"""
+import timeit
+
+import calc
+
+EXPRESSIONS = [
+    '3*x^2 + 2*x - 1',
+    'sqrt(x^2 + y^2) / (x || y)',
+    'sin(omega*t + phi) * exp(-t/tau)',
+    '(1 + 2*i) * k*T / q',
+]
+
+VARIABLES = {'x': 1.5, 'y': 2.5, 'omega': 3.0, 't': 0.5, 'phi': 0.1, 'tau': 2.0}
+
+
+def evaluate_all():
+    """
+    Evaluate each of the benchmark expressions once.
+    """
+    for math_expr in EXPRESSIONS:
+        calc.evaluator(VARIABLES, {}, math_expr)
+
+
+def evaluate_all_uncached():
+    """
+    Evaluate each of the benchmark expressions once, parsing each of them.
+    """
+    calc.PARSE_CACHE.clear()
+    evaluate_all()
+
+
+def main(number=200):
+    """
+    Print the time taken per evaluation with and without the parse cache.
+    """
+    per_call = lambda seconds: seconds / (number * len(EXPRESSIONS)) * 1e6
+    uncached = timeit.timeit(evaluate_all_uncached, number=number)
+    cached = timeit.timeit(evaluate_all, number=number)
+    print "uncached: {:.1f} us per evaluation".format(per_call(uncached))
+    print "cached:   {:.1f} us per evaluation".format(per_call(cached))
+
+
+if __name__ == '__main__':
+    main()
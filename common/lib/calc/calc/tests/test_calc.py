@@ -554,3 +554,103 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class EvaluatorSamplesTest(unittest.TestCase):
+    """
+    Run tests for calc.evaluator_samples, which should always agree with
+    calling calc.evaluator once per sample.
+    """
+    SAMPLES = [
+        {'x': 1.5, 'y': -2.0},
+        {'x': 0.25, 'y': 3.0},
+        {'x': -4.0, 'y': 0.5},
+    ]
+
+    def assert_same_results(self, math_expr, samples=None, functions=None, case_sensitive=False):
+        """
+        Assert that evaluator_samples agrees with evaluator for each sample.
+        """
+        samples = samples or self.SAMPLES
+        functions = functions or {}
+        results = calc.evaluator_samples(samples, functions, math_expr, case_sensitive=case_sensitive)
+        self.assertEqual(len(results), len(samples))
+        for sample, result in zip(samples, results):
+            expected = calc.evaluator(sample, functions, math_expr, case_sensitive=case_sensitive)
+            if numpy.isnan(expected):
+                self.assertTrue(numpy.isnan(result))
+            else:
+                self.assertAlmostEqual(complex(expected), complex(result))
+
+    def test_arithmetic(self):
+        self.assert_same_results('x + y')
+        self.assert_same_results('-x*y/3 - 2^x')
+        self.assert_same_results('abs(x)^y^2')
+        self.assert_same_results('x || y')
+        self.assert_same_results('5k*X + 3%', case_sensitive=False)
+
+    def test_constant(self):
+        self.assert_same_results('2*pi')
+        self.assertEqual(calc.evaluator_samples(self.SAMPLES, {}, ''), [float('nan')] * 3)
+
+    def test_functions(self):
+        self.assert_same_results('sqrt(y) + sin(x)*cos(y)')
+        self.assert_same_results('arccot(x) + sech(y) + ln(x)')
+        self.assert_same_results('fact(3) + abs(x)')
+        self.assert_same_results('f(x) + y', functions={'f': lambda z: z + 1})
+
+    def test_complex(self):
+        self.assert_same_results('x + i*y')
+        self.assert_same_results('sqrt(x)*j')
+
+    def test_sample_fallback(self):
+        # Parallel resistors with a zero input give NaN for that sample only.
+        self.assert_same_results('x || y', samples=[{'x': 0.0, 'y': 1.0}, {'x': 2.0, 'y': 2.0}])
+        # Factorial is only defined for the integral samples.
+        self.assert_same_results('fact(x)', samples=[{'x': 3.0}, {'x': 4.0}])
+        with self.assertRaises(ValueError):
+            calc.evaluator_samples([{'x': 3.0}, {'x': 2.5}], {}, 'fact(x)')
+        with self.assertRaises(ZeroDivisionError):
+            calc.evaluator_samples([{'x': 1.0}, {'x': 0.0}], {}, '1/x')
+
+    def test_undefined_vars(self):
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'z'):
+            calc.evaluator_samples(self.SAMPLES, {}, 'x + z')
+
+
+class ParseCacheTest(unittest.TestCase):
+    """
+    Run tests for calc.ParseCache and its use by calc.evaluator
+    """
+    def test_reuse(self):
+        cache = calc.ParseCache()
+        parsed = cache.get('x^2 + y', False)
+        self.assertIs(cache.get('x^2 + y', False), parsed)
+        self.assertIsNot(cache.get('x^2 + y', True), parsed)
+        self.assertEqual(parsed.variables_used, {'x', 'y'})
+
+    def test_bounded(self):
+        cache = calc.ParseCache(max_size=2)
+        first = cache.get('1+x', False)
+        cache.get('2+x', False)
+        cache.get('1+x', False)
+        cache.get('3+x', False)
+        self.assertEqual(len(cache), 2)
+        # '2+x' was the least recently used, so it was evicted.
+        self.assertIs(cache.get('1+x', False), first)
+
+    def test_parse_error_not_cached(self):
+        cache = calc.ParseCache()
+        with self.assertRaises(ParseException):
+            cache.get('1+.', False)
+        self.assertEqual(len(cache), 0)
+
+    def test_evaluator_binding(self):
+        """
+        A cached parse tree is evaluated with the variables of each call.
+        """
+        self.assertEqual(calc.evaluator({'x': 2.0}, {}, '3*x'), 6.0)
+        self.assertEqual(calc.evaluator({'x': 5.0}, {}, '3*x'), 15.0)
+        self.assertEqual(calc.evaluator({'x': 5.0}, {'f': lambda v: v + 1}, 'f(x)'), 6.0)
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'x'):
+            calc.evaluator({}, {}, '3*x')
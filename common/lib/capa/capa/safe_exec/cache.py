@@ -0,0 +1,215 @@
+"""
+Caching of sandboxed execution results for capa's safe_exec.
+
+Results are stored as zlib-compressed JSON.  A bounded least-recently-used
+cache in this process sits in front of the shared cache passed to safe_exec
+(usually the Django cache), and concurrent misses for the same key are
+serialized so that the code runs only once.
+"""
+
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from dogapi import dog_stats_api
+
+# Maximum total size, in bytes, of the compressed results kept in this process.
+LOCAL_CACHE_MAX_SIZE = 16 * 1024 * 1024
+
+# How long, in seconds, a process may hold the shared lock for a key.
+LOCK_TIMEOUT = 30
+
+# How long, in seconds, to wait for another process to store a result before
+# running the code anyway, and how often to check for the result meanwhile.
+LOCK_WAIT = 10
+LOCK_POLL_INTERVAL = 0.1
+
+
+def encode_result(result):
+    """
+    Encode a (exception message, globals dict) result for caching.
+    """
+    return zlib.compress(json.dumps(result))
+
+
+def decode_result(value):
+    """
+    Decode a cached value made by `encode_result`.
+
+    Values cached before results were compressed are (exception message,
+    globals dict) pairs, and are returned as they are.
+    """
+    if isinstance(value, (tuple, list)):
+        return tuple(value)
+    emsg, cleaned_results = json.loads(zlib.decompress(value))
+    return emsg, cleaned_results
+
+
+class LocalResultCache(object):
+    """
+    A size-bounded, least-recently-used cache of encoded results.
+    """
+    def __init__(self, max_size=LOCAL_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the encoded result for `key`, or None.
+        """
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self._entries[key] = value
+            return value
+
+    def set(self, key, value):
+        """
+        Store the encoded result for `key`, evicting the least recently used
+        results as needed.  Results larger than the cache are not stored.
+        """
+        if len(value) > self.max_size:
+            return
+        with self._lock:
+            old_value = self._entries.pop(key, None)
+            if old_value is not None:
+                self.size -= len(old_value)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        """
+        Remove all results.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+# The results cached in this process, shared by all SafeExecCaches.
+LOCAL_CACHE = LocalResultCache()
+
+# Locks for the keys being computed in this process, with the number of
+# threads using each.
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+
+
+class SafeExecCache(object):
+    """
+    Cache of safe_exec results in front of a shared cache.
+
+    `shared_cache` is an object with .get(key) and .set(key, value) methods.
+    If it also has an .add(key, value, timeout) method, like the Django and
+    memcached caches, it is used to keep other processes from running the
+    same code at the same time.
+    """
+    def __init__(self, shared_cache, local_cache=None):
+        self.shared_cache = shared_cache
+        self.local_cache = LOCAL_CACHE if local_cache is None else local_cache
+
+    def get(self, key):
+        """
+        Return the cached (exception message, globals dict) result for `key`,
+        or None.
+        """
+        start = time.time()
+        value = self.local_cache.get(key)
+        if value is not None:
+            tier = 'local'
+        else:
+            value = self.shared_cache.get(key)
+            if value is not None:
+                tier = 'shared'
+                if not isinstance(value, (tuple, list)):
+                    self.local_cache.set(key, value)
+
+        if value is None:
+            dog_stats_api.increment('capa.safe_exec.cache.miss')
+            return None
+
+        result = decode_result(value)
+        dog_stats_api.increment('capa.safe_exec.cache.hit', tags=['tier:{}'.format(tier)])
+        dog_stats_api.histogram('capa.safe_exec.cache.get_time', time.time() - start, tags=['tier:{}'.format(tier)])
+        return result
+
+    def set(self, key, result):
+        """
+        Cache the (exception message, globals dict) result for `key`.
+        """
+        value = encode_result(result)
+        self.local_cache.set(key, value)
+        self.shared_cache.set(key, value)
+
+    @contextmanager
+    def lock(self, key):
+        """
+        Hold the lock for computing the result for `key`.
+
+        Threads in this process wait for each other.  If another process holds
+        the shared lock, wait until it stores the result, up to LOCK_WAIT
+        seconds, and then continue without the shared lock.
+        """
+        with _key_locks_lock:
+            key_lock, users = _key_locks.get(key, (None, 0))
+            if key_lock is None:
+                key_lock = threading.Lock()
+            _key_locks[key] = (key_lock, users + 1)
+
+        try:
+            with key_lock:
+                acquired = self._acquire_shared_lock(key)
+                try:
+                    yield
+                finally:
+                    if acquired:
+                        self._release_shared_lock(key)
+        finally:
+            with _key_locks_lock:
+                key_lock, users = _key_locks[key]
+                if users == 1:
+                    del _key_locks[key]
+                else:
+                    _key_locks[key] = (key_lock, users - 1)
+
+    def _acquire_shared_lock(self, key):
+        """
+        Try to take the shared lock for `key`, waiting for its holder to store
+        the result if it is taken.  Returns whether the lock was taken.
+        """
+        add = getattr(self.shared_cache, 'add', None)
+        if add is None:
+            return False
+
+        lock_key = self._lock_key(key)
+        if add(lock_key, 1, LOCK_TIMEOUT):
+            return True
+
+        dog_stats_api.increment('capa.safe_exec.cache.lock_wait')
+        deadline = time.time() + LOCK_WAIT
+        while time.time() < deadline:
+            if self.shared_cache.get(key) is not None:
+                break
+            time.sleep(LOCK_POLL_INTERVAL)
+        return False
+
+    def _release_shared_lock(self, key):
+        """
+        Release the shared lock for `key`.
+        """
+        self.shared_cache.delete(self._lock_key(key))
+
+    @staticmethod
+    def _lock_key(key):
+        """
+        Return the shared cache key used to lock `key`.
+        """
+        return key + ".lock"
@@ -3,7 +3,8 @@
 from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
-from . import lazymod
+from . import lazymod, worker_pool
+from .cache import SafeExecCache
 from dogapi import dog_stats_api
 from six import text_type
 
@@ -74,6 +75,19 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj))
 
 
+def configure_worker_pool(size, max_jobs=100, timeout=10):
+    """
+    Run sandboxed code in a pool of `size` pre-started workers, which import
+    the assumed modules in advance.  A `size` of 0 turns the pool off.
+
+    See `worker_pool.WorkerPool`.
+    """
+    worker_pool.configure(
+        size, max_jobs, timeout,
+        preload_modules=[modname for _, modname in ASSUMED_IMPORTS],
+    )
+
+
 @dog_stats_api.timed('capa.safe_exec.time')
 def safe_exec(
     code,
@@ -103,7 +117,9 @@ def safe_exec(
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
     to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    and the random seed.  Results are also cached in this process, and if `cache`
+    has an .add(key, value, timeout) method, it is used to keep other processes
+    from running the same code at the same time.  See `SafeExecCache`.
 
     `slug` is an arbitrary string, a description that's meaningful to the
     caller, that will be used in log messages.
@@ -111,49 +127,68 @@ def safe_exec(
     If `unsafely` is true, then the code will actually be executed without sandboxing.
 
     """
-    # Check the cache for a previous result.
-    if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
-        cached = cache.get(key)
-        if cached is not None:
-            # We have a cached result.  The result is a pair: the exception
-            # message, if any, else None; and the resulting globals dictionary.
-            emsg, cleaned_results = cached
-            globals_dict.update(cleaned_results)
-            if emsg:
-                raise SafeExecException(emsg)
-            return
+    if not cache:
+        _run_code(code, globals_dict, random_seed, python_path, extra_files, slug, unsafely)
+        return
+
+    result_cache = SafeExecCache(cache)
+    safe_globals = json_safe(globals_dict)
+    md5er = hashlib.md5()
+    md5er.update(repr(code))
+    update_hash(md5er, safe_globals)
+    key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+
+    # Check the cache for a previous result.  If there is none, check again
+    # while holding the lock for the key, in case the same code was being run
+    # with the same globals at the same time.
+    cached = result_cache.get(key)
+    if cached is None:
+        with result_cache.lock(key):
+            cached = result_cache.get(key)
+            if cached is None:
+                try:
+                    _run_code(code, globals_dict, random_seed, python_path, extra_files, slug, unsafely)
+                except SafeExecException as e:
+                    emsg = text_type(e)
+                else:
+                    emsg = None
+
+                # Put the result in the cache.  This is complicated by the fact
+                # that the globals dict might not be entirely serializable.
+                cleaned_results = json_safe(globals_dict)
+                result_cache.set(key, (emsg, cleaned_results))
+
+                # If an exception happened, raise it now.
+                if emsg:
+                    raise e
+                return
+
+    # We have a cached result.  The result is a pair: the exception message,
+    # if any, else None; and the resulting globals dictionary.
+    emsg, cleaned_results = cached
+    globals_dict.update(cleaned_results)
+    if emsg:
+        raise SafeExecException(emsg)
+
 
+def _run_code(code, globals_dict, random_seed, python_path, extra_files, slug, unsafely):
+    """
+    Run `code` for `safe_exec`, without caching.
+    """
     # Create the complete code we'll run.
     code_prolog = CODE_PROLOG % random_seed
 
     # Decide which code executor to use.
+    pool = worker_pool.get_pool()
     if unsafely:
         exec_fn = codejail_not_safe_exec
+    elif pool is not None:
+        exec_fn = pool.safe_exec
     else:
         exec_fn = codejail_safe_exec
 
     # Run the code!  Results are side effects in globals_dict.
-    try:
-        exec_fn(
-            code_prolog + LAZY_IMPORTS + code, globals_dict,
-            python_path=python_path, extra_files=extra_files, slug=slug,
-        )
-    except SafeExecException as e:
-        emsg = text_type(e)
-    else:
-        emsg = None
-
-    # Put the result back in the cache.  This is complicated by the fact that
-    # the globals dict might not be entirely serializable.
-    if cache:
-        cleaned_results = json_safe(globals_dict)
-        cache.set(key, (emsg, cleaned_results))
-
-    # If an exception happened, raise it now.
-    if emsg:
-        raise e
+    exec_fn(
+        code_prolog + LAZY_IMPORTS + code, globals_dict,
+        python_path=python_path, extra_files=extra_files, slug=slug,
+    )
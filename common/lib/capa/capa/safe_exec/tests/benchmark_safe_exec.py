@@ -0,0 +1,64 @@
+"""
+Benchmark for running safe_exec with and without the sandbox worker pool.
+
+CodeJail must be configured for python.  Run with:
+    python -m capa.safe_exec.tests.benchmark_safe_exec
+"""
+import time
+
+from capa.safe_exec import safe_exec
+from capa.safe_exec.safe_exec import configure_worker_pool
+from codejail.jail_code import is_configured
+
+CODE = """
+a = numpy.linalg.solve(numpy.array([[3, 1], [1, 2]]), numpy.array([9, 8])).tolist()
+b = random.randint(0, 999) + int(math.pi)
+"""
+
+
+def percentile(timings, fraction):
+    """
+    Return the timing at `fraction` of the way through the sorted `timings`.
+    """
+    timings = sorted(timings)
+    return timings[min(int(len(timings) * fraction), len(timings) - 1)]
+
+
+def time_calls(number):
+    """
+    Return the times taken by `number` calls of safe_exec.
+    """
+    timings = []
+    for seed in xrange(number):
+        start = time.time()
+        safe_exec(CODE, {}, random_seed=seed)
+        timings.append(time.time() - start)
+    return timings
+
+
+def main(number=100, pool_size=2):
+    """
+    Print the p50 and p99 latency of safe_exec with and without the pool.
+    """
+    if not is_configured("python"):
+        print "CodeJail isn't configured for python."
+        return
+
+    configure_worker_pool(0)
+    results = [("without pool", time_calls(number))]
+    configure_worker_pool(pool_size)
+    try:
+        # Start the workers before timing them.
+        time_calls(pool_size)
+        results.append(("with pool", time_calls(number)))
+    finally:
+        configure_worker_pool(0)
+
+    for name, timings in results:
+        print "{:13} p50 {:.1f} ms, p99 {:.1f} ms".format(
+            name + ":", percentile(timings, 0.5) * 1000, percentile(timings, 0.99) * 1000,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Test cache.py"""
+
+import unittest
+
+from capa.safe_exec.cache import LocalResultCache, decode_result, encode_result
+
+
+class TestEncoding(unittest.TestCase):
+    def test_round_trip(self):
+        result = (u"ZeroDivisionError", {u'a': [1, 2.5, u"☃"], u'b': {u'c': None}})
+        value = encode_result(result)
+        self.assertIsInstance(value, str)
+        self.assertEqual(decode_result(value), result)
+
+    def test_compressed(self):
+        result = (None, {u'a': u"x" * 10000})
+        self.assertLess(len(encode_result(result)), 1000)
+
+    def test_legacy_value(self):
+        self.assertEqual(decode_result((None, {'a': 3})), (None, {'a': 3}))
+
+
+class TestLocalResultCache(unittest.TestCase):
+    def setUp(self):
+        super(TestLocalResultCache, self).setUp()
+        self.cache = LocalResultCache(max_size=10)
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.set('a', 'aaaa')
+        self.assertEqual(self.cache.get('a'), 'aaaa')
+        self.assertEqual(self.cache.size, 4)
+
+        self.cache.set('a', 'aaaaa')
+        self.assertEqual(self.cache.get('a'), 'aaaaa')
+        self.assertEqual(self.cache.size, 5)
+
+    def test_lru_eviction(self):
+        self.cache.set('a', 'aaaa')
+        self.cache.set('b', 'bbbb')
+        self.cache.get('a')
+        self.cache.set('c', 'cccc')
+
+        # 'b' was the least recently used.
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), 'aaaa')
+        self.assertEqual(self.cache.get('c'), 'cccc')
+        self.assertEqual(self.cache.size, 8)
+
+    def test_too_large(self):
+        self.cache.set('a', 'a' * 11)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.size, 0)
+
+    def test_clear(self):
+        self.cache.set('a', 'aaaa')
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.size, 0)
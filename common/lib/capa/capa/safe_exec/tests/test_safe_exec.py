@@ -5,12 +5,16 @@ import os
 import os.path
 import random
 import textwrap
+import threading
+import time
 import unittest
 
+from mock import patch
 from nose.plugins.skip import SkipTest
 from six import text_type
 
 from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec.cache import LOCAL_CACHE, decode_result, encode_result
 from codejail.safe_exec import SafeExecException
 from codejail.jail_code import is_configured
 
@@ -108,9 +112,32 @@ class DictCache(object):
         self.cache[key] = value
 
 
+class LockingDictCache(DictCache):
+    """A DictCache that also supports .add() and .delete(), for testing."""
+
+    def __init__(self, d):
+        super(LockingDictCache, self).__init__(d)
+        self.lock = threading.Lock()
+
+    def add(self, key, value, timeout=None):  # pylint: disable=unused-argument
+        with self.lock:
+            if key in self.cache:
+                return False
+            self.set(key, value)
+            return True
+
+    def delete(self, key):
+        self.cache.pop(key, None)
+
+
 class TestSafeExecCaching(unittest.TestCase):
     """Test that caching works on safe_exec."""
 
+    def setUp(self):
+        super(TestSafeExecCaching, self).setUp()
+        LOCAL_CACHE.clear()
+        self.addCleanup(LOCAL_CACHE.clear)
+
     def test_cache_miss_then_hit(self):
         g = {}
         cache = {}
@@ -119,10 +146,11 @@ class TestSafeExecCaching(unittest.TestCase):
         safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
         self.assertEqual(g['a'], 3)
         # A result has been cached
-        self.assertEqual(cache.values()[0], (None, {'a': 3}))
+        self.assertEqual(decode_result(cache.values()[0]), (None, {'a': 3}))
 
         # Fiddle with the cache, then try it again.
-        cache[cache.keys()[0]] = (None, {'a': 17})
+        LOCAL_CACHE.clear()
+        cache[cache.keys()[0]] = encode_result((None, {'a': 17}))
 
         g = {}
         safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
@@ -149,24 +177,96 @@ class TestSafeExecCaching(unittest.TestCase):
 
         # The exception should be in the cache now.
         self.assertEqual(len(cache), 1)
-        cache_exc_msg, cache_globals = cache.values()[0]
+        cache_exc_msg, cache_globals = decode_result(cache.values()[0])
         self.assertIn("ZeroDivisionError", cache_exc_msg)
 
         # Change the value stored in the cache, the result should change.
-        cache[cache.keys()[0]] = ("Hey there!", {})
+        LOCAL_CACHE.clear()
+        cache[cache.keys()[0]] = encode_result(("Hey there!", {}))
 
-        with self.assertRaises(SafeExecException):
+        with self.assertRaises(SafeExecException) as cm:
             safe_exec(code, g, cache=DictCache(cache))
+        self.assertEqual("Hey there!", text_type(cm.exception))
 
         self.assertEqual(len(cache), 1)
-        cache_exc_msg, cache_globals = cache.values()[0]
+        cache_exc_msg, cache_globals = decode_result(cache.values()[0])
         self.assertEqual("Hey there!", cache_exc_msg)
 
         # Change it again, now no exception!
-        cache[cache.keys()[0]] = (None, {'a': 17})
+        LOCAL_CACHE.clear()
+        cache[cache.keys()[0]] = encode_result((None, {'a': 17}))
         safe_exec(code, g, cache=DictCache(cache))
         self.assertEqual(g['a'], 17)
 
+    def test_legacy_cached_result(self):
+        # Results cached before they were compressed are still used.
+        cache = {}
+        safe_exec("a = int(math.pi)", {}, cache=DictCache(cache))
+        LOCAL_CACHE.clear()
+        cache[cache.keys()[0]] = (None, {'a': 17})
+
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
+        self.assertEqual(g['a'], 17)
+
+    def test_local_cache_hit(self):
+        cache = {}
+        safe_exec("a = int(math.pi)", {}, cache=DictCache(cache))
+
+        # The result is still cached in this process.
+        cache.clear()
+        g = {}
+        with patch('capa.safe_exec.safe_exec._run_code') as mock_run_code:
+            safe_exec("a = int(math.pi)", g, cache=DictCache(cache))
+        self.assertFalse(mock_run_code.called)
+        self.assertEqual(g['a'], 3)
+
+    def test_concurrent_misses(self):
+        # Threads running the same code with the same globals run it once.
+        cache = LockingDictCache({})
+        run_count = []
+
+        def run_code(code, globals_dict, *args):  # pylint: disable=unused-argument
+            run_count.append(1)
+            time.sleep(0.1)
+            globals_dict['a'] = 3
+
+        results = []
+
+        def run():
+            g = {}
+            safe_exec("a = int(math.pi)", g, cache=cache)
+            results.append(g['a'])
+
+        with patch('capa.safe_exec.safe_exec._run_code', side_effect=run_code):
+            threads = [threading.Thread(target=run) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(run_count), 1)
+        self.assertEqual(results, [3] * 5)
+        # The shared lock was released.
+        self.assertEqual(len(cache.cache), 1)
+
+    @patch('capa.safe_exec.cache.LOCK_WAIT', 0.2)
+    def test_shared_lock_held(self):
+        # Another process is running the code, but doesn't store a result in
+        # time, so the code is run here.
+        cache = LockingDictCache({})
+        safe_exec("a = int(math.pi)", {}, cache=cache)
+        key = cache.cache.keys()[0]
+        cache.cache.clear()
+        LOCAL_CACHE.clear()
+        cache.add(key + ".lock", 1, 30)
+
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=cache)
+        self.assertEqual(g['a'], 3)
+        self.assertIn(key, cache.cache)
+        self.assertIn(key + ".lock", cache.cache)
+
     def test_unicode_submission(self):
         # Check that using non-ASCII unicode does not raise an encoding error.
         # Try several non-ASCII unicode characters.
@@ -0,0 +1,170 @@
+"""Test worker_pool.py"""
+
+import os.path
+import threading
+import time
+import unittest
+
+from mock import patch
+from nose.plugins.skip import SkipTest
+from six import text_type
+
+from capa.safe_exec import safe_exec
+from capa.safe_exec import worker_pool
+from capa.safe_exec.safe_exec import configure_worker_pool
+from codejail.jail_code import is_configured
+from codejail.safe_exec import SafeExecException
+
+
+class TestWorkerPool(unittest.TestCase):
+    """Test running sandboxed code in a WorkerPool."""
+
+    def setUp(self):
+        super(TestWorkerPool, self).setUp()
+        # Can't start sandboxed workers if CodeJail isn't configured for python.
+        if not is_configured("python"):
+            raise SkipTest
+
+        self.pool = worker_pool.WorkerPool(size=2, max_jobs=3, timeout=5, preload_modules=["math"])
+        self.addCleanup(self.pool.stop)
+
+    def test_set_values(self):
+        g = {'b': 2}
+        self.pool.safe_exec("a = b + 15\nimport math; c = math.pi", g)
+        self.assertEqual(g['a'], 17)
+        self.assertIn('c', g)
+
+    def test_raising_exceptions(self):
+        with self.assertRaises(SafeExecException) as cm:
+            self.pool.safe_exec("1/0", {})
+        self.assertIn("ZeroDivisionError", text_type(cm.exception))
+
+    def test_jobs_are_isolated(self):
+        self.pool.safe_exec("import math; math.pi = 3", {})
+        g = {}
+        self.pool.safe_exec("import math; a = math.pi", g)
+        self.assertNotEqual(g['a'], 3)
+
+    def test_python_lib(self):
+        pylib = os.path.dirname(__file__) + "/test_files/pylib"
+        g = {}
+        self.pool.safe_exec("import constant; a = constant.THE_CONST", g, python_path=[pylib])
+        self.assertIn('a', g)
+
+    def test_extra_files(self):
+        g = {}
+        self.pool.safe_exec("a = open('data.txt').read()", g, extra_files=[("data.txt", "hello")])
+        self.assertEqual(g['a'], "hello")
+
+    def test_workers_are_recycled(self):
+        g = {}
+        code = "import os; pid = os.getppid()"
+        pids = []
+        for _ in range(4):
+            self.pool.safe_exec(code, g)
+            pids.append(g['pid'])
+        # One worker ran the first three jobs, then was replaced.
+        self.assertEqual(len(set(pids[:3])), 1)
+        self.assertNotEqual(pids[2], pids[3])
+
+    def test_job_cannot_write_to_protocol(self):
+        # A job that writes a forged result to every descriptor it might have
+        # inherited from its worker.
+        forge = (
+            "import json, os\n"
+            "forged = json.dumps({'globals': {'a': 'forged'}}) + '\\n'\n"
+            "for fd in range(256):\n"
+            "    try:\n"
+            "        os.write(fd, forged)\n"
+            "    except OSError:\n"
+            "        pass\n"
+        )
+        try:
+            self.pool.safe_exec(forge, {})
+        except SafeExecException:
+            # Writing to its own result pipe makes the job's result invalid.
+            pass
+
+        # The next job runs in the same worker, and gets its own result.
+        g = {'b': 1}
+        self.pool.safe_exec("a = b + 1", g)
+        self.assertEqual(g['a'], 2)
+
+    def test_timeout(self):
+        self.pool.timeout = 0.5
+        with self.assertRaises(SafeExecException):
+            self.pool.safe_exec("import time; time.sleep(5)", {})
+
+        # A new worker is started for the next job.
+        g = {}
+        self.pool.safe_exec("a = 1", g)
+        self.assertEqual(g['a'], 1)
+
+
+class TestWorkerPoolCapacity(unittest.TestCase):
+    """Test waiting for the workers of a full WorkerPool, without sandboxed workers."""
+
+    @patch('capa.safe_exec.worker_pool.Worker')
+    def test_waiting_for_a_stopped_worker(self, mock_worker_class):
+        running = threading.Event()
+        finish = threading.Event()
+
+        def run(job, timeout):  # pylint: disable=unused-argument
+            running.set()
+            finish.wait()
+            return {'globals': {}}
+
+        mock_worker_class.return_value.run.side_effect = run
+        mock_worker_class.return_value.jobs = 1
+        pool = worker_pool.WorkerPool(size=1, max_jobs=1)
+        results = []
+
+        def run_job():
+            results.append(pool._run({}, None))  # pylint: disable=protected-access
+
+        threads = [threading.Thread(target=run_job) for _ in range(2)]
+        for thread in threads:
+            thread.daemon = True
+        threads[0].start()
+        running.wait(5)
+        # The second job waits for the only worker, which is stopped once the
+        # first job is done, since it has run max_jobs jobs.
+        threads[1].start()
+        time.sleep(0.1)
+        finish.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, [{'globals': {}}, {'globals': {}}])
+        self.assertEqual(mock_worker_class.call_count, 2)
+
+
+class TestConfigureWorkerPool(unittest.TestCase):
+    """Test choosing the worker pool in safe_exec."""
+
+    def setUp(self):
+        super(TestConfigureWorkerPool, self).setUp()
+        self.addCleanup(configure_worker_pool, 0)
+
+    def test_configure(self):
+        configure_worker_pool(2, max_jobs=5, timeout=3)
+        pool = worker_pool._pool  # pylint: disable=protected-access
+        self.assertEqual((pool.size, pool.max_jobs, pool.timeout), (2, 5, 3))
+        self.assertIn("numpy", pool.preload_modules)
+
+        configure_worker_pool(0)
+        self.assertIsNone(worker_pool.get_pool())
+
+    def test_safe_exec_uses_pool(self):
+        configure_worker_pool(1)
+        with patch('capa.safe_exec.worker_pool.jail_code.is_configured', return_value=True):
+            with patch.object(worker_pool.WorkerPool, 'safe_exec') as mock_safe_exec:
+                safe_exec("a = 1", {})
+                self.assertTrue(mock_safe_exec.called)
+
+                # Unsafe code doesn't run in the sandbox at all.
+                mock_safe_exec.reset_mock()
+                g = {}
+                safe_exec("a = 1", g, unsafely=True)
+                self.assertFalse(mock_safe_exec.called)
+                self.assertEqual(g['a'], 1)
@@ -0,0 +1,379 @@
+"""
+A pool of pre-started sandboxed Python interpreters for capa's safe_exec.
+
+Starting a sandboxed interpreter and importing numpy and the other assumed
+modules takes a large part of each safe_exec call.  A pool worker is a
+sandboxed interpreter, started with the same command line and user as
+codejail's jailed code, that imports those modules once and then runs jobs
+that it reads from its stdin.  Each job runs in a child process forked from
+the worker, with its own CPU limit, without the ability to fork, and with
+only its own result pipe open, so jobs can't see or change each other's
+state or results.  Workers are replaced after a number
+of jobs, and are killed if a job takes too long.
+"""
+
+import json
+import logging
+import os
+import resource
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException, json_safe
+from dogapi import dog_stats_api
+
+log = logging.getLogger(__name__)
+
+# The program run by each worker.  It reads one JSON job per line from stdin,
+# and writes one JSON result per line to stdout.
+WORKER_CODE = r"""
+import json
+import os
+import resource
+import shutil
+import signal
+import sys
+import traceback
+
+for modname in sys.argv[1:]:
+    try:
+        __import__(modname)
+    except Exception:
+        pass
+
+protocol_out = os.fdopen(os.dup(1), 'w')
+devnull = os.open(os.devnull, os.O_RDWR)
+job_pid = None
+
+
+def stop_worker(signum, frame):
+    if job_pid:
+        os.kill(job_pid, signal.SIGKILL)
+    os._exit(1)
+
+signal.signal(signal.SIGTERM, stop_worker)
+
+
+class DevNull(object):
+    def write(self, *args, **kwargs):
+        pass
+
+
+def close_inherited_fds(keep_fd):
+    # The job must not be able to write to the worker's protocol stream,
+    # or to any other descriptor that the worker has open.
+    try:
+        fds = [int(fd) for fd in os.listdir('/proc/self/fd')]
+    except OSError:
+        max_fd = os.sysconf('SC_OPEN_MAX')
+        os.closerange(3, keep_fd)
+        os.closerange(keep_fd + 1, max_fd)
+        return
+    for fd in fds:
+        if fd > 2 and fd != keep_fd:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def run_job(job, result_fd):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    close_inherited_fds(result_fd)
+    sys.stdin = sys.stdout = sys.stderr = DevNull()
+    resource.setrlimit(resource.RLIMIT_CPU, (job['cpu'], job['cpu']))
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    os.chdir(job['dir'])
+    os.environ['TMPDIR'] = os.path.join(job['dir'], 'tmp')
+    for pybase in job['python_path']:
+        sys.path.append(pybase)
+    try:
+        g_dict = job['globals']
+        exec job['code'] in g_dict
+        ok_types = (type(None), int, long, float, str, unicode, list, tuple, dict)
+
+        def jsonable(v):
+            if not isinstance(v, ok_types):
+                return False
+            try:
+                json.dumps(v)
+            except Exception:
+                return False
+            return True
+        g_dict = dict(
+            (k, v) for k, v in g_dict.iteritems()
+            if jsonable(v) and k != '__builtins__'
+        )
+        result = {'globals': g_dict}
+    except BaseException:
+        result = {'error': traceback.format_exc()}
+    with os.fdopen(result_fd, 'w') as result_file:
+        json.dump(result, result_file)
+
+
+while True:
+    line = sys.stdin.readline()
+    if not line:
+        break
+    job = json.loads(line)
+    read_fd, write_fd = os.pipe()
+    job_pid = os.fork()
+    if job_pid == 0:
+        os.close(read_fd)
+        try:
+            run_job(job, write_fd)
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as result_file:
+        output = result_file.read()
+    _, status = os.waitpid(job_pid, 0)
+    job_pid = None
+    shutil.rmtree(os.path.join(job['dir'], 'tmp'), ignore_errors=True)
+    try:
+        result = json.loads(output)
+    except ValueError:
+        result = {'error': 'Job exited with status %d' % status}
+    protocol_out.write(json.dumps(result) + '\n')
+    protocol_out.flush()
+"""
+
+
+class Worker(object):
+    """
+    One sandboxed interpreter in a `WorkerPool`.
+    """
+    def __init__(self, preload_modules):
+        cmd = []
+        user = jail_code.COMMANDS['python']['user']
+        if user:
+            cmd.extend(['sudo', '-u', user])
+        cmd.extend(jail_code.COMMANDS['python']['cmdline_start'])
+        cmd.extend(['-c', WORKER_CODE])
+        cmd.extend(preload_modules)
+
+        self.jobs = 0
+        self.process = subprocess.Popen(
+            cmd,
+            preexec_fn=set_worker_limits,
+            env={},
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def run(self, job, timeout):
+        """
+        Run `job` and return the worker's result, or None if the worker
+        didn't answer within `timeout` seconds or exited.
+        """
+        self.jobs += 1
+        try:
+            self.process.stdin.write(json.dumps(job) + '\n')
+            self.process.stdin.flush()
+        except IOError:
+            return None
+
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            return None
+        line = self.process.stdout.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def stop(self):
+        """
+        Stop the worker, and the job it is running.
+
+        The worker is sent SIGTERM rather than SIGKILL, since sudo passes
+        SIGTERM on to it.
+        """
+        try:
+            self.process.terminate()
+        except OSError:
+            pass
+        self.process.wait()
+
+
+def set_worker_limits():
+    """
+    Set the resource limits of a worker, before it starts.
+
+    The CPU limit is set for each job by the worker, and the worker itself
+    must be able to fork, so only the other codejail limits are set here.
+    """
+    vmem = jail_code.LIMITS.get("VMEM", 0)
+    if vmem:
+        resource.setrlimit(resource.RLIMIT_AS, (vmem, vmem))
+    fsize = jail_code.LIMITS.get("FSIZE", 0)
+    resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
+
+
+class WorkerPool(object):
+    """
+    A pool of at most `size` workers, each of which is replaced after it has
+    run `max_jobs` jobs.  Jobs that take longer than `timeout` seconds fail,
+    and the worker running them is killed.
+    """
+    def __init__(self, size, max_jobs=100, timeout=10, preload_modules=()):
+        self.size = size
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+        self.preload_modules = list(preload_modules)
+        self._idle = []
+        self._started = 0
+        # Guards _idle and _started, and is notified when a worker becomes
+        # idle or is stopped, so that callers waiting for one can check again.
+        self._condition = threading.Condition()
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Run `code` in a worker, like `codejail.safe_exec.safe_exec`.
+
+        Changes that `code` makes to the globals are visible in `globals_dict`
+        when this function returns.  Raises SafeExecException if `code` raises
+        an exception, or can't be run.
+        """
+        homedir = tempfile.mkdtemp(prefix="codejail-")
+        try:
+            # The sandbox user needs to read the directory, and write to its
+            # temp directory.
+            os.chmod(homedir, 0775)
+            tmpdir = os.path.join(homedir, "tmp")
+            os.mkdir(tmpdir)
+            os.chmod(tmpdir, 0777)
+
+            python_path = python_path or ()
+            for pydir in python_path:
+                dest = os.path.join(homedir, os.path.basename(pydir))
+                if os.path.isdir(pydir):
+                    shutil.copytree(pydir, dest)
+                else:
+                    shutil.copyfile(pydir, dest)
+            for filename, contents in extra_files or ():
+                with open(os.path.join(homedir, filename), "wb") as extra_file:
+                    extra_file.write(contents)
+
+            job = {
+                'code': code,
+                'globals': json_safe(globals_dict),
+                'dir': homedir,
+                'python_path': [os.path.basename(pydir) for pydir in python_path],
+                'cpu': jail_code.LIMITS.get("CPU", 1),
+            }
+            result = self._run(job, slug)
+        finally:
+            shutil.rmtree(homedir, ignore_errors=True)
+
+        if 'error' in result:
+            raise SafeExecException("Couldn't execute jailed code: %s" % result['error'])
+        globals_dict.update(result['globals'])
+
+    def _run(self, job, slug):
+        """
+        Run `job` in an idle worker and return its result.
+        """
+        worker = self._checkout()
+        start = time.time()
+        try:
+            result = worker.run(job, self.timeout)
+        except Exception:
+            worker.stop()
+            self._release()
+            raise
+        dog_stats_api.histogram('capa.safe_exec.worker_pool.job_time', time.time() - start)
+
+        if result is None:
+            log.warning("Sandbox worker failed or timed out running %s", slug)
+            dog_stats_api.increment('capa.safe_exec.worker_pool.failed')
+            worker.stop()
+            self._release()
+            return {'error': "Worker failed or timed out."}
+
+        if worker.jobs >= self.max_jobs:
+            worker.stop()
+            self._release()
+        else:
+            self._checkin(worker)
+        return result
+
+    def _checkout(self):
+        """
+        Return an idle worker, starting one if the pool isn't full, and
+        otherwise waiting for one.
+        """
+        with self._condition:
+            while not self._idle and self._started >= self.size:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._started += 1
+
+        dog_stats_api.increment('capa.safe_exec.worker_pool.started')
+        try:
+            return Worker(self.preload_modules)
+        except Exception:
+            self._release()
+            raise
+
+    def _checkin(self, worker):
+        """
+        Return `worker` to the pool of idle workers.
+        """
+        with self._condition:
+            self._idle.append(worker)
+            self._condition.notify()
+
+    def _release(self):
+        """
+        Record that a worker was stopped, so another can be started.
+        """
+        with self._condition:
+            self._started -= 1
+            self._condition.notify()
+
+    def stop(self):
+        """
+        Stop the idle workers.
+        """
+        with self._condition:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
+            self._release()
+
+
+# The pool used by safe_exec, if any.
+_pool = None
+
+
+def configure(size, max_jobs=100, timeout=10, preload_modules=()):
+    """
+    Run safe_exec's sandboxed code in a pool of `size` workers.  A `size` of
+    0 turns the pool off.  See `WorkerPool` for the other arguments.
+    """
+    global _pool  # pylint: disable=global-statement
+    if _pool is not None:
+        _pool.stop()
+    if size:
+        _pool = WorkerPool(size, max_jobs, timeout, preload_modules)
+    else:
+        _pool = None
+
+
+def get_pool():
+    """
+    Return the configured WorkerPool, or None if there isn't one or the
+    python sandbox isn't configured.
+    """
+    if _pool is not None and jail_code.is_configured("python"):
+        return _pool
+    return None
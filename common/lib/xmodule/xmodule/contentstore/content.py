@@ -14,6 +14,7 @@ VERSIONED_ASSETS_PATTERN = r'/assets/courseware/(v[\d]/)?([a-f0-9]{32})'
 import os
 import logging
 import StringIO
+from collections import namedtuple
 from urlparse import urlparse, urlunparse, parse_qsl
 from urllib import urlencode, quote_plus
 
@@ -222,7 +223,7 @@ class StaticContent(object):
         return any(path.lower().endswith(excluded_ext.lower()) for excluded_ext in excluded_exts)
 
     @staticmethod
-    def get_canonicalized_asset_path(course_key, path, base_url, excluded_exts, encode=True):
+    def get_canonicalized_asset_path(course_key, path, base_url, excluded_exts, encode=True, asset_manifest=None):
         """
         Returns a fully-qualified path to a piece of static content.
 
@@ -232,6 +233,8 @@ class StaticContent(object):
         Args:
             course_key: key to the course which owns this asset
             path: the path to said content
+            asset_manifest: an optional AssetManifest of the course, used instead
+                of looking up the asset in the contentstore when it covers the asset
 
         Returns:
             string: fully-qualified path to asset
@@ -246,13 +249,19 @@ class StaticContent(object):
         # Check the status of the asset to see if this can be served via CDN aka publicly.
         serve_from_cdn = False
         content_digest = None
-        try:
-            content = AssetManager.find(asset_key, as_stream=True)
-            serve_from_cdn = not getattr(content, "locked", True)
-            content_digest = getattr(content, "content_digest", None)
-        except (ItemNotFoundError, NotFoundError):
-            # If we can't find the item, just treat it as if it's locked.
-            serve_from_cdn = False
+        if asset_manifest is not None and asset_manifest.covers(asset_key):
+            asset = asset_manifest.get(asset_key)
+            if asset is not None:
+                serve_from_cdn = not asset.locked
+                content_digest = asset.content_digest
+        else:
+            try:
+                content = AssetManager.find(asset_key, as_stream=True)
+                serve_from_cdn = not getattr(content, "locked", True)
+                content_digest = getattr(content, "content_digest", None)
+            except (ItemNotFoundError, NotFoundError):
+                # If we can't find the item, just treat it as if it's locked.
+                serve_from_cdn = False
 
         # Do a generic check to see if anything about this asset disqualifies it from being CDN'd.
         is_excluded = False
@@ -268,7 +277,7 @@ class StaticContent(object):
         for query_name, query_val in query_params:
             if query_val.startswith("/static/"):
                 new_val = StaticContent.get_canonicalized_asset_path(
-                    course_key, query_val, base_url, excluded_exts, encode=False)
+                    course_key, query_val, base_url, excluded_exts, encode=False, asset_manifest=asset_manifest)
                 updated_query_params.append((query_name, new_val))
             else:
                 # Make sure we're encoding Unicode strings down to their byte string
@@ -348,6 +357,36 @@ class StaticContentStream(StaticContent):
         return content
 
 
+ManifestEntry = namedtuple('ManifestEntry', ['content_digest', 'locked', 'length'])
+
+
+class AssetManifest(object):
+    """
+    The digest, lock status and length of each of a course's assets, so that
+    the URLs of many of its assets can be rewritten without looking each one up.
+    """
+    def __init__(self, course_key, entries):
+        """
+        Args:
+            course_key: key to the course which owns the assets
+            entries: a dict of ManifestEntry by asset name
+        """
+        self.course_key = course_key.for_branch(None)
+        self.entries = entries
+
+    def covers(self, asset_key):
+        """
+        Returns whether the manifest can tell if the asset with asset_key exists.
+        """
+        return asset_key.block_type == 'asset' and asset_key.course_key.for_branch(None) == self.course_key
+
+    def get(self, asset_key):
+        """
+        Returns the ManifestEntry of the asset with asset_key, or None if it doesn't exist.
+        """
+        return self.entries.get(asset_key.block_id)
+
+
 class ContentStore(object):
     '''
     Abstraction for all ContentStore providers (e.g. MongoDB)
@@ -373,6 +412,12 @@ class ContentStore(object):
         '''
         raise NotImplementedError
 
+    def get_asset_manifest(self, course_key):
+        """
+        Returns an AssetManifest of all of the assets of the course.
+        """
+        raise NotImplementedError
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all of the assets which use this course_key as an identifier
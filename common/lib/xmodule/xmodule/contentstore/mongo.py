@@ -16,7 +16,7 @@ from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
 from xmodule.util.misc import escape_invalid_characters
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
-from .content import StaticContent, ContentStore, StaticContentStream
+from .content import AssetManifest, ManifestEntry, StaticContent, ContentStore, StaticContentStream
 
 
 class MongoContentStore(ContentStore):
@@ -209,6 +209,18 @@ class MongoContentStore(ContentStore):
             course_key, start=start, maxresults=maxresults, get_thumbnails=False, sort=sort, filter_params=filter_params
         )
 
+    def get_asset_manifest(self, course_key):
+        """
+        See :meth:`.ContentStore.get_asset_manifest`
+        """
+        assets, __ = self._get_all_content_for_course(course_key)
+        return AssetManifest(course_key, {
+            asset['asset_key'].block_id: ManifestEntry(
+                asset.get('md5'), asset.get('locked', False), asset.get('length'),
+            )
+            for asset in assets
+        })
+
     def remove_redundant_content_for_courses(self):
         """
         Finds and removes all redundant files (Mac OS metadata files with filename ".DS_Store"
@@ -121,5 +121,158 @@
                 });
             });
         });
+
+        describe('Loading units', function() {
+            var scriptResource = function(url) {
+                return {mimetype: 'application/javascript', kind: 'url', data: url, placement: 'foot'};
+            };
+
+            beforeEach(function() {
+                window.loadedXBlockResources = ['loaded'];
+            });
+
+            afterEach(function() {
+                delete window.loadedXBlockResources;
+                $('.sequence-spec-resource').remove();
+            });
+
+            it('loads scripts one after another', function() {
+                var first = $.Deferred(),
+                    second = $.Deferred(),
+                    loaded = jasmine.createSpy('loaded');
+                spyOn($, 'ajax').and.returnValues(first.promise(), second.promise());
+
+                this.sequence.loadResources([
+                    ['first', scriptResource('/first.js')],
+                    ['second', scriptResource('/second.js')]
+                ]).done(loaded);
+
+                expect($.ajax.calls.count()).toBe(1);
+                expect($.ajax.calls.argsFor(0)[0].url).toBe('/first.js');
+                first.resolve();
+                expect($.ajax.calls.count()).toBe(2);
+                expect($.ajax.calls.argsFor(1)[0].url).toBe('/second.js');
+                expect(loaded).not.toHaveBeenCalled();
+                second.resolve();
+                expect(loaded).toHaveBeenCalled();
+                expect(window.loadedXBlockResources).toEqual(['loaded', 'first', 'second']);
+            });
+
+            it('does not load the resources already on the page', function() {
+                spyOn($, 'ajax');
+                this.sequence.loadResources([['loaded', scriptResource('/loaded.js')]]);
+                expect($.ajax).not.toHaveBeenCalled();
+            });
+
+            it('adds html resources to the head or the foot of the page', function() {
+                this.sequence.loadResources([
+                    ['head', {
+                        mimetype: 'text/html',
+                        kind: 'text',
+                        data: '<meta class="sequence-spec-resource head-resource">',
+                        placement: 'head'
+                    }],
+                    ['foot', {
+                        mimetype: 'text/html',
+                        kind: 'text',
+                        data: '<div class="sequence-spec-resource foot-resource"></div>',
+                        placement: 'foot'
+                    }]
+                ]);
+                expect($('head > .head-resource').length).toBe(1);
+                expect($('body > .foot-resource').length).toBe(1);
+            });
+
+            it('fetches the content of a unit when it is displayed', function() {
+                var tab = $('<div class="seq_contents" data-content-url="/unit"></div>');
+                spyOn($, 'getJSON').and.returnValue($.Deferred().resolve({
+                    html: '<p>Unit content</p>',
+                    resources: []
+                }).promise());
+
+                this.sequence.loadContent(tab);
+
+                expect($.getJSON).toHaveBeenCalledWith('/unit');
+                expect(tab.text()).toBe('<p>Unit content</p>');
+                expect(tab.data('content-url')).toBeUndefined();
+            });
+
+            it('initializes the blocks of a fetched unit with their own request token', function() {
+                var html = '<div class="xblock" data-request-token="unit-token">Unit content</div>';
+                this.sequence.content_container.before(
+                    '<div class="seq_contents" data-content-url="/unit"></div>'
+                );
+                this.sequence.contents = this.sequence.$('.seq_contents');
+                spyOn($, 'getJSON').and.returnValue($.Deferred().resolve({html: html, resources: []}).promise());
+
+                this.sequence.render(1);
+
+                expect(this.sequence.content_container.find('.xblock').data('request-token')).toBe('unit-token');
+                expect(window.XBlock.initializeBlocks.calls.mostRecent().args).toEqual(
+                    [this.sequence.content_container]
+                );
+            });
+
+            it('fetches the content of a unit again after an error', function() {
+                var tab = $('<div class="seq_contents" data-content-url="/unit"></div>');
+                spyOn($, 'getJSON').and.returnValue($.Deferred().reject().promise());
+
+                this.sequence.loadContent(tab);
+
+                expect(tab.data('content-url')).toBe('/unit');
+            });
+
+            describe('while navigating', function() {
+                beforeEach(function() {
+                    this.sequence.content_container.before(
+                        '<div class="seq_contents">Unit 1</div>' +
+                        '<div class="seq_contents" data-content-url="/unit2"></div>' +
+                        '<div class="seq_contents" data-content-url="/unit3"></div>'
+                    );
+                    this.sequence.contents = this.sequence.$('.seq_contents');
+                    this.sequence.num_contents = this.sequence.contents.length;
+                    spyOn($, 'postWithPrefix');
+                    spyOn(window.Logger, 'log').and.returnValue($.Deferred().promise());
+                    this.sequence.render(1);
+                });
+
+                it('can select any unit after a unit fails to load', function() {
+                    spyOn($, 'getJSON').and.returnValue($.Deferred().reject().promise());
+
+                    this.sequence.render(2);
+                    expect(this.sequence.content_container.text()).toContain('There was an error');
+
+                    this.sequence.render(1);
+                    expect(this.sequence.content_container.text()).toBe('Unit 1');
+                    expect(this.sequence.position).toBe(1);
+
+                    this.sequence.render(2);
+                    this.sequence.render(2);
+                    expect($.getJSON.calls.count()).toBe(3);
+                });
+
+                it('does not display a unit once another one is selected', function() {
+                    var unit = $.Deferred();
+                    spyOn($, 'getJSON').and.returnValue(unit.promise());
+
+                    this.sequence.render(2);
+                    this.sequence.render(1);
+                    unit.resolve({html: 'Unit 2', resources: []});
+
+                    expect(this.sequence.content_container.text()).toBe('Unit 1');
+                    expect(this.sequence.position).toBe(1);
+                });
+
+                it('moves on from the unit that is loading', function() {
+                    var event = {preventDefault: function() {}, target: this.sequence.$('.button-next')[0]};
+                    spyOn($, 'getJSON').and.returnValue($.Deferred().promise());
+
+                    this.sequence.selectNext(event);
+                    this.sequence.selectNext(event);
+
+                    expect($.getJSON.calls.allArgs()).toEqual([['/unit2'], ['/unit3']]);
+                });
+            });
+        });
     });
 }).call(this);
@@ -1,13 +1,16 @@
 """
 Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
 """
+import copy
 import datetime
 import cPickle as pickle
 import math
+import threading
 import zlib
 import pymongo
 import pytz
 import re
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
@@ -15,6 +18,7 @@ from time import time
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -225,13 +229,112 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+def copy_structure(structure):
+    """
+    Return a copy of a structure whose blocks can be changed the way the split
+    modulestore changes the blocks of the structures it loads (by loading their
+    definitions into their fields, and by updating their edit info), without
+    changing the blocks of `structure`.
+    """
+    new_structure = dict(structure)
+    new_blocks = {}
+    for block_key, block in structure['blocks'].iteritems():
+        new_block = copy.copy(block)
+        new_block.fields = dict(block.fields)
+        new_block.edit_info = copy.copy(block.edit_info)
+        new_blocks[block_key] = new_block
+    new_structure['blocks'] = new_blocks
+    return new_structure
+
+
+class LocalStructureCache(object):
+    """
+    An in-process cache of decoded course structures, shared by all the threads
+    of the process, that holds structures up to a total size of `max_size`.  The
+    size of a structure is the size of its pickle.
+
+    Structures are never changed once they are saved, so they can be kept for
+    as long as there is room for them.  Structures are copied with
+    :func:`copy_structure` when they are added to and read from the cache.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._size = 0
+        self._structures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return a copy of the structure with id `key`, or None if it isn't cached.
+        """
+        with self._lock:
+            entry = self._structures.pop(key, None)
+            if entry is None:
+                return None
+            # Move the structure to the most recently used end.
+            self._structures[key] = entry
+        return copy_structure(entry[0])
+
+    def set(self, key, structure, size):
+        """
+        Cache a copy of `structure`, whose pickle is `size` bytes, as the
+        structure with id `key`, evicting the least recently used structures
+        to make room for it.
+        """
+        if size > self.max_size:
+            return
+        structure = copy_structure(structure)
+        with self._lock:
+            old_entry = self._structures.pop(key, None)
+            if old_entry is not None:
+                self._size -= old_entry[1]
+            self._structures[key] = (structure, size)
+            self._size += size
+            while self._size > self.max_size:
+                __, (__, evicted_size) = self._structures.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self):
+        """
+        Remove all the structures from the cache.
+        """
+        with self._lock:
+            self._structures.clear()
+            self._size = 0
+
+
+_local_structure_cache = None
+_local_structure_cache_lock = threading.Lock()
+
+
+def get_local_structure_cache():
+    """
+    Return the process's LocalStructureCache, or None if the
+    COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE setting doesn't turn it on.
+    """
+    global _local_structure_cache  # pylint: disable=global-statement
+    if not DJANGO_AVAILABLE or not settings.configured:
+        return None
+    max_size = getattr(settings, 'COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE', 0)
+    if not max_size:
+        return None
+    if _local_structure_cache is None or _local_structure_cache.max_size != max_size:
+        with _local_structure_cache_lock:
+            if _local_structure_cache is None or _local_structure_cache.max_size != max_size:
+                _local_structure_cache = LocalStructureCache(max_size)
+    return _local_structure_cache
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
-    If the 'course_structure_cache' doesn't exist, then don't do anything for
-    for set and get.
+    Decoded structures are also kept in the process's LocalStructureCache,
+    if it is turned on, so that they aren't fetched and unpickled again.
+
+    If neither the 'course_structure_cache' nor the local cache exist, then
+    don't do anything for set and get.
     """
     def __init__(self):
         self.cache = None
@@ -240,13 +343,22 @@ class CourseStructureCache(object):
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
+        self.local_cache = get_local_structure_cache()
 
     def get(self, key, course_context=None):
         """Pull the compressed, pickled struct data from cache and deserialize."""
-        if self.cache is None:
+        if self.cache is None and self.local_cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            if self.local_cache is not None:
+                structure = self.local_cache.get(key)
+                tagger.tag(from_local_cache=str(structure is not None).lower())
+                if structure is not None:
+                    return structure
+                if self.cache is None:
+                    return None
+
             compressed_pickled_data = self.cache.get(key)
             tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
 
@@ -260,17 +372,28 @@ class CourseStructureCache(object):
             pickled_data = zlib.decompress(compressed_pickled_data)
             tagger.measure('uncompressed_size', len(pickled_data))
 
-            return pickle.loads(pickled_data)
+            start = time()
+            structure = pickle.loads(pickled_data)
+            tagger.measure('decode_time', time() - start)
+
+            if self.local_cache is not None:
+                self.local_cache.set(key, structure, len(pickled_data))
+            return structure
 
     def set(self, key, structure, course_context=None):
         """Given a structure, will pickle, compress, and write to cache."""
-        if self.cache is None:
+        if self.cache is None and self.local_cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
             pickled_data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
             tagger.measure('uncompressed_size', len(pickled_data))
 
+            if self.local_cache is not None:
+                self.local_cache.set(key, structure, len(pickled_data))
+            if self.cache is None:
+                return
+
             # 1 = Fastest (slightly larger results)
             compressed_pickled_data = zlib.compress(pickled_data, 1)
             tagger.measure('compressed_size', len(compressed_pickled_data))
@@ -578,6 +701,17 @@ class MongoConnection(object):
             tagger.tag(block_type=definition['block_type'])
             self.definitions.insert(definition)
 
+    def insert_definitions(self, definitions, course_context=None):
+        """
+        Create the definitions in the db with a single batched insert.
+
+        All of the definitions are inserted even if some of them are already in
+        the db, in which case a DuplicateKeyError is raised afterwards.
+        """
+        with TIMER.timer("insert_definitions", course_context) as tagger:
+            tagger.measure('definitions', len(definitions))
+            self.definitions.insert(definitions, continue_on_error=True)
+
     def ensure_indexes(self):
         """
         Ensure that all appropriate indexes are created that are needed by this modulestore, or raise
@@ -0,0 +1,78 @@
+"""
+An index of the parents of the blocks of a split mongo structure.
+
+Finding the parents of a block, or whether it has a path to the course root,
+takes a walk over every block of the structure.  A ParentIndex does that walk
+once, and since saved structures never change, the index of a saved structure
+is kept in a process-wide cache keyed by the structure's id.
+"""
+import threading
+from collections import OrderedDict, defaultdict, deque
+
+# The number of structures whose ParentIndex is kept by get_parent_index.
+PARENT_INDEX_CACHE_SIZE = 16
+
+_parent_indexes = OrderedDict()
+_parent_indexes_lock = threading.Lock()
+
+
+class ParentIndex(object):
+    """
+    The parents of each block of a structure, and the blocks that have a path
+    to the root of the structure.
+    """
+    def __init__(self, structure):
+        parents = defaultdict(list)
+        for parent_key, block in structure['blocks'].iteritems():
+            for child_key in block.fields.get('children', []):
+                parents[child_key].append(parent_key)
+        self._parents = dict(parents)
+
+        # A block has a path to the root if it is a course or library without
+        # parents, or if any of its parents has a path to the root.
+        rooted = set(
+            block_key for block_key in structure['blocks']
+            if block_key.type in ('course', 'library') and block_key not in self._parents
+        )
+        queue = deque(rooted)
+        while queue:
+            block = structure['blocks'].get(queue.popleft())
+            if block is None:
+                continue
+            for child_key in block.fields.get('children', []):
+                if child_key not in rooted:
+                    rooted.add(child_key)
+                    queue.append(child_key)
+        self._rooted = frozenset(rooted)
+
+    def get_parents(self, block_key):
+        """
+        Return the list of the keys of the parents of `block_key`.
+        """
+        return self._parents.get(block_key, [])
+
+    def has_path_to_root(self, block_key):
+        """
+        Return whether `block_key` has a path to the root of the structure.
+        """
+        return block_key in self._rooted
+
+
+def get_parent_index(structure):
+    """
+    Return the ParentIndex of `structure`, which must have been saved, since
+    its index is cached by its id.
+    """
+    structure_id = structure['_id']
+    with _parent_indexes_lock:
+        parent_index = _parent_indexes.pop(structure_id, None)
+        if parent_index is not None:
+            _parent_indexes[structure_id] = parent_index
+            return parent_index
+
+    parent_index = ParentIndex(structure)
+    with _parent_indexes_lock:
+        _parent_indexes[structure_id] = parent_index
+        while len(_parent_indexes) > PARENT_INDEX_CACHE_SIZE:
+            _parent_indexes.popitem(last=False)
+    return parent_index
@@ -88,6 +88,7 @@ from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo.parent_index import ParentIndex, get_parent_index
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
@@ -195,6 +196,9 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
     """
     _bulk_ops_record_type = SplitBulkWriteRecord
 
+    # The number of new definitions to hold in a bulk operation before writing them
+    definition_batch_size = 1000
+
     def _get_bulk_ops_record(self, course_key, ignore_case=False):
         """
         Return the :class:`.SplitBulkWriteRecord` for this course.
@@ -258,17 +262,9 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                 # append only, so if it's already been written, we can just keep going.
                 log.debug("Attempted to insert duplicate structure %s", _id)
 
-        for _id in bulk_write_record.definitions.viewkeys() - bulk_write_record.definitions_in_db:
+        if self._flush_definitions(bulk_write_record):
             dirty = True
 
-            try:
-                self.db_connection.insert_definition(bulk_write_record.definitions[_id], bulk_write_record.course_key)
-            except DuplicateKeyError:
-                # We may not have looked up this definition inside this bulk operation, and thus
-                # didn't realize that it was already in the database. That's OK, the store is
-                # append only, so if it's already been written, we can just keep going.
-                log.debug("Attempted to insert duplicate definition %s", _id)
-
         if bulk_write_record.index is not None and bulk_write_record.index != bulk_write_record.initial_index:
             dirty = True
 
@@ -283,6 +279,35 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
 
         return dirty
 
+    def _flush_definitions(self, bulk_write_record):
+        """
+        Insert the definitions created during the bulk operation that aren't in the
+        database yet, and drop them from the bulk operation's cache.
+
+        Return True if any definitions were inserted.
+        """
+        # Insert the new definitions in one batch, rather than one at a time,
+        # since there is one for each block created during the bulk operation.
+        new_ids = bulk_write_record.definitions.viewkeys() - bulk_write_record.definitions_in_db
+        if not new_ids:
+            return False
+
+        try:
+            self.db_connection.insert_definitions(
+                [bulk_write_record.definitions[_id] for _id in new_ids], bulk_write_record.course_key
+            )
+        except DuplicateKeyError:
+            # We may not have looked up some of these definitions inside this bulk operation, and
+            # thus didn't realize that they were already in the database. That's OK, the store is
+            # append only, and the rest of the definitions are still inserted, so we can just keep going.
+            log.debug("Attempted to insert duplicate definitions for %s", bulk_write_record.course_key)
+
+        # Definitions are never changed once created, so they can be read back from the
+        # database if they're needed again during the bulk operation.
+        for _id in new_ids:
+            del bulk_write_record.definitions[_id]
+        return True
+
     def get_course_index(self, course_key, ignore_case=False):
         """
         Return the index for course_key.
@@ -452,6 +477,11 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         bulk_write_record = self._get_bulk_ops_record(course_key)
         if bulk_write_record.active:
             bulk_write_record.definitions[definition['_id']] = definition
+            # Write the new definitions in batches, so that a bulk operation which creates
+            # a lot of blocks, like an import, doesn't keep all of them in memory.
+            new_count = len(bulk_write_record.definitions) - len(bulk_write_record.definitions_in_db)
+            if new_count >= self.definition_batch_size:
+                self._flush_definitions(bulk_write_record)
         else:
             self.db_connection.insert_definition(definition, course_key)
 
@@ -759,7 +789,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         self.db_connection._drop_database(database, collections, connections)  # pylint: disable=protected-access
 
-    def cache_items(self, system, base_block_ids, course_key, depth=0, lazy=True):
+    def cache_items(self, system, base_block_ids, course_key, depth=0, lazy=True, prefetch_fields=None):
         """
         Handles caching of items once inheritance and any other one time
         per course per fetch operations are done.
@@ -770,6 +800,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             course_key: the destination course providing the context
             depth: how deep below these to prefetch
             lazy: whether to load definitions now or later
+            prefetch_fields: if lazy, the names of the fields about to be read; the
+                definitions that hold any of them are loaded now
         """
         with self.bulk_operations(course_key, emit_signals=False):
             new_module_data = {}
@@ -784,28 +816,59 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             # This method supports lazy loading, where the descendent definitions aren't loaded
             # until they're actually needed.
             if not lazy:
-                # Non-lazy loading: Load all descendants by id.
-                descendent_definitions = self.get_definitions(
-                    course_key,
-                    [
-                        block.definition
-                        for block in new_module_data.itervalues()
-                    ]
-                )
-                # Turn definitions into a map.
-                definitions = {definition['_id']: definition
-                               for definition in descendent_definitions}
-
-                for block in new_module_data.itervalues():
-                    if block.definition in definitions:
-                        definition = definitions[block.definition]
-                        # convert_fields gets done later in the runtime's xblock_from_json
-                        block.fields.update(definition.get('fields'))
-                        block.definition_loaded = True
+                # Non-lazy loading: Load all descendants' definitions.
+                self._prefetch_definitions(system, course_key, new_module_data.itervalues())
+            elif prefetch_fields:
+                self._prefetch_definitions(system, course_key, new_module_data.itervalues(), prefetch_fields)
 
             system.module_data.update(new_module_data)
             return system.module_data
 
+    def _prefetch_definitions(self, system, course_key, blocks, fields=None):
+        """
+        Load the definitions of `blocks` that aren't loaded yet in one query, and
+        merge them into the blocks' fields, so that the XBlocks constructed from
+        the blocks don't load them one at a time.
+
+        Arguments:
+            system: a CachingDescriptorSystem
+            course_key: the course that the definitions are being loaded for
+            blocks: the BlockData of the blocks
+            fields: if not None, only load the definitions of blocks that have a
+                Scope.content field named in `fields`
+        """
+        blocks = [block for block in blocks if block.definition is not None and not block.definition_loaded]
+        if fields is not None:
+            fields = set(fields)
+            blocks = [
+                block for block in blocks
+                if self._has_content_field(system.load_block_type(block.block_type), fields)
+            ]
+        if not blocks:
+            return
+
+        # Turn definitions into a map.
+        definitions = {
+            definition['_id']: definition
+            for definition in self.get_definitions(course_key, [block.definition for block in blocks])
+        }
+        for block in blocks:
+            if block.definition in definitions:
+                definition = definitions[block.definition]
+                # convert_fields gets done later in the runtime's xblock_from_json
+                block.fields.update(definition.get('fields'))
+                block.definition_loaded = True
+
+    @staticmethod
+    def _has_content_field(block_class, field_names):
+        """
+        Return whether `block_class` has a Scope.content field named in `field_names`.
+        """
+        return any(
+            field_name in block_class.fields and block_class.fields[field_name].scope == Scope.content
+            for field_name in field_names
+        )
+
     @contract(course_entry=CourseEnvelope, block_keys="list(BlockKey)", depth="int | None")
     def _load_items(self, course_entry, block_keys, depth=0, **kwargs):
         """
@@ -813,9 +876,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         Load the definitions into each block if lazy is in kwargs and is False;
         otherwise, do not load the definitions - they'll be loaded later when needed.
+        If prefetch_fields is in kwargs, the definitions of the blocks that have a
+        Scope.content field named in it are loaded in one query.
         """
         lazy = kwargs.pop('lazy', True)
-        should_cache_items = not lazy
+        prefetch_fields = kwargs.pop('prefetch_fields', None)
+        should_cache_items = not lazy or bool(prefetch_fields)
 
         runtime = self._get_cache(course_entry.structure['_id'])
         if runtime is None:
@@ -824,7 +890,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             should_cache_items = True
 
         if should_cache_items:
-            self.cache_items(runtime, block_keys, course_entry.course_key, depth, lazy)
+            self.cache_items(runtime, block_keys, course_entry.course_key, depth, lazy, prefetch_fields)
 
         with self.bulk_operations(course_entry.course_key, emit_signals=False):
             return [runtime.load_item(block_key, course_entry, **kwargs) for block_key in block_keys]
@@ -1211,6 +1277,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             in the request. The depth is counted in the number of
             calls to get_children() to cache. None indicates to cache all
             descendants.
+        prefetch_fields (list): The names of the fields that are about to be
+            read from the cached descendants. Their definitions are loaded
+            together, instead of one at a time when each is first read.
         raises InsufficientSpecificationError or ItemNotFoundError
         """
         if not isinstance(usage_key, BlockUsageLocator) or usage_key.deprecated:
@@ -1304,20 +1373,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
 
-        # No need of these caches unless include_orphans is set to False
-        path_cache = None
-        parents_cache = None
-
-        if not include_orphans:
-            path_cache = {}
-            parents_cache = self.build_block_key_to_parents_mapping(course.structure)
+        # No need of the parent index unless include_orphans is set to False
+        parent_index = None if include_orphans else self._get_parent_index(course)
 
         for block_id, value in course.structure['blocks'].iteritems():
             if _block_matches_all(value):
                 if not include_orphans:
                     if (  # pylint: disable=bad-continuation
                         block_id.type in DETACHED_XBLOCK_TYPES or
-                        self.has_path_to_root(block_id, course, path_cache, parents_cache)
+                        parent_index.has_path_to_root(block_id)
                     ):
                         items.append(block_id)
                 else:
@@ -1383,6 +1447,20 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         return has_path
 
+    def _get_parent_index(self, course):
+        """
+        Return the ParentIndex of the structure of `course` (a CourseEnvelope).
+
+        The index of a structure that was loaded from the database is cached.
+        Structures created by the active bulk operation may still change, so
+        their index is built each time.
+        """
+        structure = course.structure
+        bulk_write_record = self._get_bulk_ops_record(course.course_key)
+        if bulk_write_record.active and structure['_id'] not in bulk_write_record.structures_in_db:
+            return ParentIndex(structure)
+        return get_parent_index(structure)
+
     def get_parent_location(self, locator, **kwargs):
         """
         Return the location (Locators w/ block_ids) for the parent of this location in this
@@ -1396,14 +1474,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        parent_index = self._get_parent_index(course)
+        all_parent_ids = parent_index.get_parents(BlockKey.from_usage_key(locator))
 
         # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
         # to the course root
         parent_ids = [
             valid_parent
             for valid_parent in all_parent_ids
-            if self.has_path_to_root(valid_parent, course)
+            if parent_index.has_path_to_root(valid_parent)
         ]
 
         if len(parent_ids) == 0:
@@ -1427,16 +1506,14 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         detached_categories = [name for name, __ in XBlock.load_tagged_classes("detached")]
         course = self._lookup_course(course_key)
-        items = set(course.structure['blocks'].keys())
-        items.remove(course.structure['root'])
-        blocks = course.structure['blocks']
-        for block_id, block_data in blocks.iteritems():
-            items.difference_update(BlockKey(*child) for child in block_data.fields.get('children', []))
-            if block_data.block_type in detached_categories:
-                items.discard(block_id)
+        parent_index = self._get_parent_index(course)
+        root = course.structure['root']
         return [
             course_key.make_usage_key(block_type=block_id.type, block_id=block_id.id)
-            for block_id in items
+            for block_id, block_data in course.structure['blocks'].iteritems()
+            if block_id != root and
+            not parent_index.get_parents(block_id) and
+            block_data.block_type not in detached_categories
         ]
 
     def get_course_index_info(self, course_key):
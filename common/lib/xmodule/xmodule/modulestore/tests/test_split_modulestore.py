@@ -14,6 +14,7 @@ import ddt
 from contracts import contract
 from nose.plugins.attrib import attr
 from django.core.cache import caches, InvalidCacheBackendError
+from django.test.utils import override_settings
 
 from openedx.core.lib import tempdir
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
@@ -32,6 +33,7 @@ from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import LocalStructureCache, get_local_structure_cache
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -999,6 +1001,43 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @override_settings(COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE=10 * 1024 * 1024)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_local_structure_cache(self, mock_get_cache):
+        mock_get_cache.side_effect = InvalidCacheBackendError
+        self.addCleanup(get_local_structure_cache().clear)
+
+        with check_mongo_calls(1):
+            not_cached_structure = self._get_structure(self.new_course)
+
+        # Changes to the blocks of a loaded structure don't change the cached structure.
+        root_block = not_cached_structure['blocks'][not_cached_structure['root']]
+        root_block.fields['display_name'] = 'changed'
+
+        with check_mongo_calls(0):
+            cached_structure = self._get_structure(self.new_course)
+
+        self.assertNotEqual(cached_structure['blocks'][cached_structure['root']].fields.get('display_name'), 'changed')
+        self.assertEqual(cached_structure['_id'], not_cached_structure['_id'])
+        self.assertEqual(set(cached_structure['blocks']), set(not_cached_structure['blocks']))
+
+    def test_local_structure_cache_eviction(self):
+        cache = LocalStructureCache(max_size=100)
+        structure = {'_id': 'structure', 'blocks': {}}
+        cache.set('a', structure, 60)
+        cache.set('b', structure, 30)
+        cache.get('a')
+
+        # The least recently used structure is evicted to make room.
+        cache.set('c', structure, 30)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), structure)
+        self.assertEqual(cache.get('c'), structure)
+
+        # Structures larger than the cache aren't cached.
+        cache.set('d', structure, 101)
+        self.assertIsNone(cache.get('d'))
+
     def _get_structure(self, course):
         """
         Helper function to get a structure from a course.
@@ -1078,6 +1117,29 @@ class SplitModuleItemTests(SplitModuleTest):
         )
         self.assertFalse(modulestore().has_item(locator))
 
+    def test_get_item_prefetch_fields(self):
+        """
+        get_item(prefetch_fields) loads the definitions that hold those fields together
+        """
+        store = modulestore()
+        store._clear_cache()  # pylint: disable=protected-access
+        locator = BlockUsageLocator(
+            CourseLocator(org='testx', course='GreekHero', run='run', branch=BRANCH_NAME_DRAFT), 'chapter', 'chapter3'
+        )
+        db_connection = store.db_connection
+        with patch.object(db_connection, 'get_definition', wraps=db_connection.get_definition) as mock_get_definition:
+            with patch.object(
+                db_connection, 'get_definitions', wraps=db_connection.get_definitions
+            ) as mock_get_definitions:
+                chapter = store.get_item(locator, depth=None, prefetch_fields=['data'])
+                problems = chapter.get_children()
+                self.assertEqual(len(problems), 3)
+                for problem in problems:
+                    self.assertIsNotNone(problem.data)
+
+        self.assertEqual(mock_get_definitions.call_count, 1)
+        self.assertFalse(mock_get_definition.called)
+
     @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
     def test_get_item(self, _from_json):
         '''
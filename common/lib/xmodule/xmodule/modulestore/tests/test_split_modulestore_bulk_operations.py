@@ -34,6 +34,15 @@ class TestBulkWriteMixin(unittest.TestCase):
     def assertCacheNotCleared(self):
         self.assertFalse(self.clear_cache.called)
 
+    def assertInsertedDefinitions(self, definitions):
+        """
+        Assert that `definitions` were inserted, in any order, in a single batch.
+        """
+        self.assertEqual(self.conn.insert_definitions.call_count, 1)
+        inserted_definitions, course_context = self.conn.insert_definitions.call_args[0]
+        self.assertItemsEqual(definitions, inserted_definitions)
+        self.assertEqual(course_context, self.course_key)
+
 
 class TestBulkWriteMixinPreviousTransaction(TestBulkWriteMixin):
     """
@@ -172,7 +181,7 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.assertConnCalls()
         self.bulk._end_bulk_operation(self.course_key)
         self.assertConnCalls(
-            call.insert_definition(self.definition, self.course_key),
+            call.insert_definitions([self.definition], self.course_key),
             call.update_course_index(
                 {'versions': {self.course_key.branch: self.definition['_id']}},
                 from_index=original_index,
@@ -190,17 +199,11 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.bulk.update_definition(self.course_key.replace(branch='b'), other_definition)
         self.bulk.insert_course_index(self.course_key, {'versions': {'a': self.definition['_id'], 'b': other_definition['_id']}})
         self.bulk._end_bulk_operation(self.course_key)
-        self.assertItemsEqual(
-            [
-                call.insert_definition(self.definition, self.course_key),
-                call.insert_definition(other_definition, self.course_key),
-                call.update_course_index(
-                    {'versions': {'a': self.definition['_id'], 'b': other_definition['_id']}},
-                    from_index=original_index,
-                    course_context=self.course_key,
-                )
-            ],
-            self.conn.mock_calls
+        self.assertInsertedDefinitions([self.definition, other_definition])
+        self.conn.update_course_index.assert_called_once_with(
+            {'versions': {'a': self.definition['_id'], 'b': other_definition['_id']}},
+            from_index=original_index,
+            course_context=self.course_key,
         )
 
     def test_write_definition_on_close(self):
@@ -210,7 +213,7 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.bulk.update_definition(self.course_key, self.definition)
         self.assertConnCalls()
         self.bulk._end_bulk_operation(self.course_key)
-        self.assertConnCalls(call.insert_definition(self.definition, self.course_key))
+        self.assertConnCalls(call.insert_definitions([self.definition], self.course_key))
 
     def test_write_multiple_definitions_on_close(self):
         self.conn.get_course_index.return_value = None
@@ -221,12 +224,30 @@ class TestBulkWriteMixinClosed(TestBulkWriteMixin):
         self.bulk.update_definition(self.course_key.replace(branch='b'), other_definition)
         self.assertConnCalls()
         self.bulk._end_bulk_operation(self.course_key)
-        self.assertItemsEqual(
-            [
-                call.insert_definition(self.definition, self.course_key),
-                call.insert_definition(other_definition, self.course_key)
-            ],
-            self.conn.mock_calls
+        self.assertEqual(len(self.conn.mock_calls), 1)
+        self.assertInsertedDefinitions([self.definition, other_definition])
+
+    def test_write_definitions_in_batches(self):
+        self.bulk.definition_batch_size = 2
+        self.conn.get_course_index.return_value = None
+        self.bulk._begin_bulk_operation(self.course_key)
+        self.conn.reset_mock()
+        other_definition = {'another': 'definition', '_id': ObjectId()}
+        last_definition = {'last': 'definition', '_id': ObjectId()}
+        self.bulk.update_definition(self.course_key, self.definition)
+        self.assertConnCalls()
+        self.bulk.update_definition(self.course_key, other_definition)
+        self.assertInsertedDefinitions([self.definition, other_definition])
+
+        # The written definitions are read back from the db, and aren't written again.
+        self.conn.reset_mock()
+        self.conn.get_definition.return_value = self.definition
+        self.assertEqual(self.bulk.get_definition(self.course_key, self.definition['_id']), self.definition)
+        self.bulk.update_definition(self.course_key, last_definition)
+        self.bulk._end_bulk_operation(self.course_key)
+        self.assertConnCalls(
+            call.get_definition(self.definition['_id'], self.course_key),
+            call.insert_definitions([last_definition], self.course_key),
         )
 
     def test_write_index_and_structure_on_close(self):
@@ -463,7 +484,7 @@ class TestBulkWriteMixinFindMethods(TestBulkWriteMixin):
         self.bulk._begin_bulk_operation(self.course_key)
         self.bulk.get_definitions(self.course_key, test_ids)
         self.bulk._end_bulk_operation(self.course_key)
-        self.assertFalse(self.conn.insert_definition.called)
+        self.assertFalse(self.conn.insert_definitions.called)
 
     def test_no_bulk_find_structures_derived_from(self):
         ids = [Mock(name='id')]
@@ -0,0 +1,70 @@
+"""
+Tests for the parent index of split mongo structures.
+"""
+import unittest
+
+from bson.objectid import ObjectId
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.parent_index import ParentIndex, get_parent_index
+
+COURSE = BlockKey('course', 'course')
+CHAPTER = BlockKey('chapter', 'chapter')
+HTML = BlockKey('html', 'html')
+ORPHAN = BlockKey('vertical', 'orphan')
+ORPHAN_CHILD = BlockKey('html', 'orphan_child')
+
+
+def make_structure(children):
+    """
+    Return a structure with blocks that have the given `children`.
+    """
+    return {
+        '_id': ObjectId(),
+        'root': COURSE,
+        'blocks': {
+            block_key: BlockData(block_type=block_key.type, fields={'children': block_children})
+            for block_key, block_children in children.iteritems()
+        },
+    }
+
+
+class TestParentIndex(unittest.TestCase):
+    """
+    Tests for ParentIndex.
+    """
+    def setUp(self):
+        super(TestParentIndex, self).setUp()
+        self.structure = make_structure({
+            COURSE: [CHAPTER],
+            CHAPTER: [HTML],
+            HTML: [],
+            ORPHAN: [ORPHAN_CHILD, HTML],
+            ORPHAN_CHILD: [],
+        })
+
+    def test_parents(self):
+        parent_index = ParentIndex(self.structure)
+        self.assertEqual(parent_index.get_parents(COURSE), [])
+        self.assertEqual(parent_index.get_parents(CHAPTER), [COURSE])
+        self.assertItemsEqual(parent_index.get_parents(HTML), [CHAPTER, ORPHAN])
+        self.assertEqual(parent_index.get_parents(ORPHAN_CHILD), [ORPHAN])
+
+    def test_has_path_to_root(self):
+        parent_index = ParentIndex(self.structure)
+        for block_key in (COURSE, CHAPTER, HTML):
+            self.assertTrue(parent_index.has_path_to_root(block_key))
+        for block_key in (ORPHAN, ORPHAN_CHILD):
+            self.assertFalse(parent_index.has_path_to_root(block_key))
+
+    def test_cycle(self):
+        structure = make_structure({COURSE: [], ORPHAN: [ORPHAN_CHILD], ORPHAN_CHILD: [ORPHAN]})
+        parent_index = ParentIndex(structure)
+        self.assertFalse(parent_index.has_path_to_root(ORPHAN))
+        self.assertFalse(parent_index.has_path_to_root(ORPHAN_CHILD))
+
+    def test_get_parent_index(self):
+        parent_index = get_parent_index(self.structure)
+        self.assertIs(get_parent_index(self.structure), parent_index)
+        self.assertIsNot(get_parent_index(make_structure({COURSE: []})), parent_index)
@@ -9,6 +9,7 @@ from xmodule.x_module import XModuleMixin
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.modulestore.xml_importer import (
+    ImportPhaseTimer,
     StaticContentImporter,
     _update_and_import_module,
     _update_module_location
@@ -385,3 +386,27 @@ class StaticContentImporterTest(unittest.TestCase):
             )
             mock_file.assert_called_with(full_file_path, 'rb')
             self.mocked_content_store.assert_called_once()
+
+
+class ImportPhaseTimerTest(unittest.TestCase):
+    """
+    Tests for ImportPhaseTimer.
+    """
+    @mock.patch('xmodule.modulestore.xml_importer.time.time')
+    def test_nested_phases(self, mock_time):
+        mock_time.side_effect = [0, 1, 4, 10, 11, 12]
+        timer = ImportPhaseTimer()
+        with timer.phase('write'):
+            with timer.phase('assets'):
+                pass
+        with timer.phase('write'):
+            pass
+        self.assertEqual(timer.durations, {'write': 8, 'assets': 3})
+
+    @mock.patch('xmodule.modulestore.xml_importer.dog_stats_api.histogram')
+    def test_report(self, mock_histogram):
+        timer = ImportPhaseTimer()
+        timer.durations['parse'] = 2
+        timer.report(CourseLocator('org', 'course', 'run'))
+        mock_histogram.assert_called_once_with(u'courselike_import.phase.time', 2, tags=[u'phase:parse'])
+        self.assertEqual(timer.durations, {})
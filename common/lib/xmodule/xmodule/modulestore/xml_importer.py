@@ -21,7 +21,10 @@ Modulestore virtual   |          XML physical (draft, published)
              (a, b)   |  (a, b) | (x, b) | (x, x) | (x, y) | (a, x)
 """
 import logging
+import time
 from abc import abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
 from opaque_keys.edx.locator import LibraryLocator
 import os
 import mimetypes
@@ -30,6 +33,8 @@ import json
 import re
 from lxml import etree
 
+import dogstats_wrapper as dog_stats_api
+
 from xmodule.library_tools import LibraryToolsService
 from xmodule.modulestore.xml import XMLModuleStore, LibraryXMLModuleStore, ImportSystem
 from xblock.runtime import KvsFieldData, DictKeyValueStore
@@ -154,6 +159,49 @@ class StaticContentImporter:
         return file_subpath, asset_key
 
 
+class ImportPhaseTimer(object):
+    """
+    Times the phases of an import, such as parsing the xml or writing the
+    blocks to the modulestore.
+
+    The time of a phase doesn't include the time of the phases nested in it,
+    so the times of all of the phases add up to the time of the import.
+    """
+    def __init__(self):
+        self.durations = OrderedDict()
+        self._nested_durations = []
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Add the time taken by the block of the with statement to phase `name`.
+        """
+        start = time.time()
+        self._nested_durations.append(0)
+        try:
+            yield
+        finally:
+            duration = time.time() - start
+            nested_duration = self._nested_durations.pop()
+            self.durations[name] = self.durations.get(name, 0) + duration - nested_duration
+            if self._nested_durations:
+                self._nested_durations[-1] += duration
+
+    def report(self, courselike_key):
+        """
+        Log and send to datadog the time of each phase of the import of
+        `courselike_key`, and start timing from scratch.
+        """
+        for name, duration in self.durations.iteritems():
+            dog_stats_api.histogram(u'courselike_import.phase.time', duration, tags=[u'phase:{}'.format(name)])
+        log.info(
+            u'Course import %s: phase times %s',
+            courselike_key,
+            u', '.join(u'{}={:.3f}s'.format(name, duration) for name, duration in self.durations.iteritems()),
+        )
+        self.durations.clear()
+
+
 class ImportManager(object):
     """
     Import xml-based courselikes from data_dir into modulestore.
@@ -223,15 +271,17 @@ class ImportManager(object):
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
-        self.xml_module_store = self.store_class(
-            data_dir,
-            default_class=default_class,
-            source_dirs=source_dirs,
-            load_error_modules=load_error_modules,
-            xblock_mixins=store.xblock_mixins,
-            xblock_select=store.xblock_select,
-            target_course_id=target_id,
-        )
+        self.timer = ImportPhaseTimer()
+        with self.timer.phase('parse'):
+            self.xml_module_store = self.store_class(
+                data_dir,
+                default_class=default_class,
+                source_dirs=source_dirs,
+                load_error_modules=load_error_modules,
+                xblock_mixins=store.xblock_mixins,
+                xblock_select=store.xblock_select,
+                target_course_id=target_id,
+            )
         self.logger, self.errors = make_error_tracker()
 
     def preflight(self):
@@ -473,29 +523,34 @@ class ImportManager(object):
             except DuplicateCourseError:
                 continue
 
-            # This bulk operation wraps all the operations to populate the published branch.
-            with self.store.bulk_operations(dest_id):
-                # Retrieve the course itself.
-                source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
-
-                # Import all static pieces.
-                self.import_static(data_path, dest_id)
-
-                # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
-
-                # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
-
-            # This bulk operation wraps all the operations to populate the draft branch with any items
-            # from the /drafts subdirectory.
-            # Drafts must be imported in a separate bulk operation from published items to import properly,
-            # due to the recursive_build() above creating a draft item for each course block
-            # and then publishing it.
-            with self.store.bulk_operations(dest_id):
-                # Import all draft items into the courselike.
-                courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
-
+            # The write phase includes writing the blocks and definitions to the database
+            # at the end of each bulk operation.
+            with self.timer.phase('write'):
+                # This bulk operation wraps all the operations to populate the published branch.
+                with self.store.bulk_operations(dest_id):
+                    # Retrieve the course itself.
+                    source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
+
+                    with self.timer.phase('assets'):
+                        # Import all static pieces.
+                        self.import_static(data_path, dest_id)
+
+                        # Import asset metadata stored in XML.
+                        self.import_asset_metadata(data_path, dest_id)
+
+                    # Import all children
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
+
+                # This bulk operation wraps all the operations to populate the draft branch with any items
+                # from the /drafts subdirectory.
+                # Drafts must be imported in a separate bulk operation from published items to import properly,
+                # due to the recursive_build() above creating a draft item for each course block
+                # and then publishing it.
+                with self.store.bulk_operations(dest_id):
+                    # Import all draft items into the courselike.
+                    courselike = self.import_drafts(courselike, courselike_key, data_path, dest_id)
+
+            self.timer.report(dest_id)
             yield courselike
 
 
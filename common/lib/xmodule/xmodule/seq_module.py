@@ -36,6 +36,10 @@ except ImportError:
 # OBSOLETE: This obsoletes 'type'
 class_priority = ['video', 'problem']
 
+# Replaced with the usage id of a unit in the `unit_view_url` of the student
+# view context.
+UNIT_VIEW_URL_USAGE_ID = '__USAGE_ID__'
+
 # Make '_' a no-op so we can scrape strings. Using lambda instead of
 #  `django.utils.translation.ugettext_noop` because Django cannot be imported in this file
 _ = lambda text: text
@@ -427,8 +431,13 @@ class SequenceModule(SequenceFields, ProctoringFields, XModule):
         Updates the given fragment with rendered student views of the given
         display_items.  Returns a list of dict objects with information about
         the given display_items.
+
+        If the context has a `unit_view_url`, only the item at the current
+        position is rendered, and the others have the `content_url` that the
+        browser fetches their content from when they are displayed.
         """
         is_user_authenticated = self.is_user_authenticated(context)
+        unit_view_url = context.get('unit_view_url')
         bookmarks_service = self.runtime.service(self, 'bookmarks')
         completion_service = self.runtime.service(self, 'completion')
         context['username'] = self.runtime.service(self, 'user').get_current_user().opt_attrs.get(
@@ -460,11 +469,18 @@ class SequenceModule(SequenceFields, ProctoringFields, XModule):
             context['show_bookmark_button'] = show_bookmark_button
             context['bookmarked'] = is_bookmarked
 
-            rendered_item = item.render(STUDENT_VIEW, context)
-            fragment.add_fragment_resources(rendered_item)
+            content_url = None
+            if unit_view_url and len(contents) != self.position - 1:
+                content = ''
+                content_url = unit_view_url.replace(UNIT_VIEW_URL_USAGE_ID, text_type(usage_id))
+            else:
+                rendered_item = item.render(STUDENT_VIEW, context)
+                fragment.add_fragment_resources(rendered_item)
+                content = rendered_item.content
 
             iteminfo = {
-                'content': rendered_item.content,
+                'content': content,
+                'content_url': content_url,
                 'page_title': getattr(item, 'tooltip_title', ''),
                 'type': item_type,
                 'id': text_type(usage_id),
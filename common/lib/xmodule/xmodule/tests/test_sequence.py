@@ -8,7 +8,7 @@ from datetime import timedelta
 from django.utils.timezone import now
 from freezegun import freeze_time
 from mock import Mock, patch
-from xmodule.seq_module import SequenceModule
+from xmodule.seq_module import UNIT_VIEW_URL_USAGE_ID, SequenceModule
 from xmodule.tests import get_test_system
 from xmodule.tests.helpers import StubUserService
 from xmodule.tests.xml import factories as xml, XModuleXmlImportTest
@@ -141,6 +141,19 @@ class SequenceBlockTestCase(XModuleXmlImportTest):
         for child in self.sequence_3_1.children:
             self.assertIn("'page_title': '{}'".format(child.block_id), html)
 
+    def test_render_active_unit_only(self):
+        html = self._get_rendered_student_view(
+            self.sequence_3_1,
+            requested_child='last',
+            extra_context=dict(unit_view_url='/view/{}'.format(UNIT_VIEW_URL_USAGE_ID)),
+        )
+        self._assert_view_at_position(html, expected_position=3)
+        children = self.sequence_3_1.children
+        for child in children[:2]:
+            self.assertIn("'content_url': u'/view/{}'".format(child), html)
+        self.assertNotIn("/view/{}".format(children[2]), html)
+        self.assertEqual(html.count("'content': ''"), 2)
+
     def test_hidden_content_before_due(self):
         html = self._get_rendered_student_view(self.sequence_4_1)
         self.assertIn("seq_module.html", html)
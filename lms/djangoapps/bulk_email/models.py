@@ -320,6 +320,65 @@ class Optout(models.Model):
 # the location where the email message body is to be inserted.
 COURSE_EMAIL_MESSAGE_BODY_TAG = '{{message_body}}'
 
+# The keys of the context values that differ between the recipients of an
+# email.  'anonymous_user_id' is substituted for the %%USER_ID%% keyword.
+RECIPIENT_CONTEXT_KEYS = ('name', 'email', 'user_id', 'anonymous_user_id')
+
+
+def _recipient_placeholder(key):
+    """
+    Returns the placeholder for the recipient value `key` in a compiled message.
+    """
+    return u'\x00{}\x00'.format(key)
+
+
+class CompiledEmailMessage(object):
+    """
+    An email message rendered once for all of its recipients, with
+    placeholders for the values that differ between them.
+
+    Lines are wrapped one at a time, so only the lines that hold placeholders
+    need to be filled in and wrapped again for each recipient.
+    """
+    def __init__(self, message, escape_values):
+        self.escape_values = escape_values
+        self.uses_anonymous_user_id = _recipient_placeholder('anonymous_user_id') in message
+        # Wrapped text, and lines with placeholders.
+        self._segments = []
+        fixed_lines = []
+        for line in message.split('\n'):
+            if u'\x00' in line:
+                if fixed_lines:
+                    self._segments.append((False, wrap_message('\n'.join(fixed_lines))))
+                    fixed_lines = []
+                self._segments.append((True, line))
+            else:
+                fixed_lines.append(line)
+        if fixed_lines:
+            self._segments.append((False, wrap_message('\n'.join(fixed_lines))))
+
+    def render(self, recipient_context):
+        """
+        Returns the message for the recipient with the values of `recipient_context`.
+        """
+        return '\n'.join(
+            wrap_message(self._fill(segment, recipient_context)) if has_placeholders else segment
+            for has_placeholders, segment in self._segments
+        )
+
+    def _fill(self, line, recipient_context):
+        """
+        Replaces the placeholders in `line` with the values of `recipient_context`.
+        """
+        for key in RECIPIENT_CONTEXT_KEYS:
+            placeholder = _recipient_placeholder(key)
+            if placeholder in line:
+                value = recipient_context[key]
+                if self.escape_values and isinstance(value, basestring):
+                    value = markupsafe.escape(value)
+                line = line.replace(placeholder, text_type(value))
+        return line
+
 
 class CourseEmailTemplate(models.Model):
     """
@@ -383,6 +442,47 @@ class CourseEmailTemplate(models.Model):
         # finally, return the result, after wrapping long lines and without converting to an encoded byte array.
         return wrap_message(result)
 
+    @staticmethod
+    def _compile(format_string, message_body, context, escape_values):
+        """
+        Create a CompiledEmailMessage using a template, message body and context.
+
+        The message is rendered as it is by `_render`, but with placeholders
+        for the RECIPIENT_CONTEXT_KEYS values, which are filled in by the
+        `render` method of the CompiledEmailMessage.  If `escape_values`,
+        string values of the context are HTML-escaped.
+        """
+        context = dict(context)
+        for key in RECIPIENT_CONTEXT_KEYS:
+            context[key] = _recipient_placeholder(key)
+        if escape_values:
+            for key, value in context.iteritems():
+                if isinstance(value, basestring):
+                    context[key] = markupsafe.escape(value)
+
+        if 'course_id' in context:
+            message_body = message_body.replace('%%USER_ID%%', context['anonymous_user_id'])
+            message_body = substitute_keywords_with_data(message_body, context)
+
+        result = format_string.format(**context)
+        message_body_tag = COURSE_EMAIL_MESSAGE_BODY_TAG.format()
+        result = result.replace(message_body_tag, message_body, 1)
+        return CompiledEmailMessage(result, escape_values)
+
+    def compile_plaintext(self, plaintext, context):
+        """
+        Create a CompiledEmailMessage of a plain text message, to render it
+        for many recipients.  See `render_plaintext`.
+        """
+        return CourseEmailTemplate._compile(self.plain_template, plaintext, context, escape_values=False)
+
+    def compile_htmltext(self, htmltext, context):
+        """
+        Create a CompiledEmailMessage of an HTML message, to render it for
+        many recipients.  See `render_htmltext`.
+        """
+        return CourseEmailTemplate._compile(self.html_template, htmltext, context, escape_values=True)
+
     def render_plaintext(self, plaintext, context):
         """
         Create plain text message.
@@ -8,8 +8,9 @@ import logging
 import random
 import re
 from collections import Counter
+from contextlib import contextmanager
 from smtplib import SMTPConnectError, SMTPDataError, SMTPException, SMTPServerDisconnected
-from time import sleep
+from time import sleep, time
 
 from boto.exception import AWSConnectionError
 from boto.ses.exceptions import (
@@ -49,6 +50,7 @@ from lms.djangoapps.instructor_task.subtasks import (
 from openedx.core.djangoapps.site_configuration import helpers as configuration_helpers
 from openedx.core.lib.courses import course_image_url
 from util.date_utils import get_default_time_display
+from util.keyword_substitution import anonymous_id_from_user_id
 
 log = logging.getLogger('edx.celery.task')
 
@@ -352,6 +354,43 @@ def _filter_optouts_from_recipients(to_list, course_id):
     return to_list, num_optout
 
 
+@contextmanager
+def _add_time(times, name):
+    """
+    Adds the time spent in the block to `times[name]`.
+    """
+    start = time()
+    try:
+        yield
+    finally:
+        times[name] += time() - start
+
+
+def _record_send_times(task_id, email_id, num_processed, times, course_title):
+    """
+    Logs and records the number of emails a subtask processed per second,
+    and the time it spent rendering and sending them.
+    """
+    if not num_processed:
+        return
+    tags = [_statsd_tag(course_title)]
+    dog_stats_api.histogram('course_email.single_task.render_time', times['render'], tags=tags)
+    dog_stats_api.histogram('course_email.single_task.send_time', times['send'], tags=tags)
+    send_rate = num_processed / times['total'] if times['total'] else 0
+    dog_stats_api.histogram('course_email.single_task.send_rate', send_rate, tags=tags)
+    log.info(
+        "BulkEmail ==> SubTask: %s, EmailId: %s, Processed %s emails in %.2fs (%.1f/s), "
+        "render time: %.2fs, send time: %.2fs",
+        task_id,
+        email_id,
+        num_processed,
+        times['total'],
+        send_rate,
+        times['render'],
+        times['send'],
+    )
+
+
 def _get_source_address(course_id, course_title, course_language, truncate=True):
     """
     Calculates an email address to be used as the 'from-address' for sent emails.
@@ -495,13 +534,23 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
 
     # use the CourseEmailTemplate that was associated with the CourseEmail
     course_email_template = course_email.get_template()
+    # Time spent rendering and sending the emails, and in total.
+    send_times = Counter()
     try:
         connection = get_connection()
         connection.open()
 
         # Define context values to use in all course emails:
-        email_context = {'name': '', 'email': ''}
-        email_context.update(global_email_context)
+        email_context = dict(global_email_context)
+        email_context['course_id'] = course_email.course_id
+
+        # Render the parts of the messages that are the same for all recipients once,
+        # so that only the values of each recipient are filled in below.
+        with _add_time(send_times, 'render'):
+            plaintext_template = course_email_template.compile_plaintext(course_email.text_message, email_context)
+            html_template = course_email_template.compile_htmltext(course_email.html_message, email_context)
+        uses_anonymous_user_id = plaintext_template.uses_anonymous_user_id or html_template.uses_anonymous_user_id
+        sending_start = time()
 
         while to_list:
             # Update context with user-specific values from the user at the end of the list.
@@ -512,24 +561,29 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             recipient_num += 1
             current_recipient = to_list[-1]
             email = current_recipient['email']
-            email_context['email'] = email
-            email_context['name'] = current_recipient['profile__name']
-            email_context['user_id'] = current_recipient['pk']
-            email_context['course_id'] = course_email.course_id
-
-            # Construct message content using templates and context:
-            plaintext_msg = course_email_template.render_plaintext(course_email.text_message, email_context)
-            html_msg = course_email_template.render_htmltext(course_email.html_message, email_context)
-
-            # Create email:
-            email_msg = EmailMultiAlternatives(
-                course_email.subject,
-                plaintext_msg,
-                from_addr,
-                [email],
-                connection=connection
-            )
-            email_msg.attach_alternative(html_msg, 'text/html')
+            recipient_context = {
+                'email': email,
+                'name': current_recipient['profile__name'],
+                'user_id': current_recipient['pk'],
+            }
+
+            with _add_time(send_times, 'render'):
+                if uses_anonymous_user_id:
+                    recipient_context['anonymous_user_id'] = anonymous_id_from_user_id(current_recipient['pk'])
+
+                # Construct message content using templates and context:
+                plaintext_msg = plaintext_template.render(recipient_context)
+                html_msg = html_template.render(recipient_context)
+
+                # Create email:
+                email_msg = EmailMultiAlternatives(
+                    course_email.subject,
+                    plaintext_msg,
+                    from_addr,
+                    [email],
+                    connection=connection
+                )
+                email_msg.attach_alternative(html_msg, 'text/html')
 
             # Throttle if we have gotten the rate limiter.  This is not very high-tech,
             # but if a task has been retried for rate-limiting reasons, then we sleep
@@ -551,8 +605,9 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
                     current_recipient['profile__name'],
                     email
                 )
-                with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
-                    connection.send_messages([email_msg])
+                with _add_time(send_times, 'send'):
+                    with dog_stats_api.timer('course_email.single_send.time.overall', tags=[_statsd_tag(course_title)]):
+                        connection.send_messages([email_msg])
 
             except SMTPDataError as exc:
                 # According to SMTP spec, we'll retry error codes in the 4xx range.  5xx range indicates hard failure.
@@ -628,6 +683,8 @@ def _send_course_email(entry_id, email_id, to_list, global_email_context, subtas
             recipients_info[email] += 1
             to_list.pop()
 
+        send_times['total'] = time() - sending_start
+        _record_send_times(task_id, email_id, recipient_num, send_times, course_title)
         log.info(
             "BulkEmail ==> Task: %s, SubTask: %s, EmailId: %s, Total Successful Recipients: %s/%s, \
             Failed Recipients: %s/%s",
@@ -224,6 +224,45 @@ class CourseEmailTemplateTest(TestCase):
         self.assertIn(context['course_title'], message)
         self.assertIn(context['name'], message)
 
+    def _assert_compiled_matches_rendered(self, compile_message, render_message, context):
+        """
+        Assert that a compiled message renders the same message for each recipient
+        as rendering the message with the recipient's context.
+        """
+        message = (
+            "Dear %%USER_FULLNAME%%, thanks for enrolling in %%COURSE_DISPLAY_NAME%%. " * 5 +
+            "\nThis line does not change."
+        )
+        compiled = compile_message(message, context)
+        self.assertFalse(compiled.uses_anonymous_user_id)
+        for recipient_context in (
+                {'name': "<script>alert('Profile Name!');</alert>", 'email': 'student@test.com', 'user_id': 12345},
+                {'name': "Another Student", 'email': 'another@test.com', 'user_id': 67890},
+        ):
+            expected_context = dict(context)
+            expected_context.update(recipient_context)
+            self.assertEqual(compiled.render(recipient_context), render_message(message, expected_context))
+
+    def test_compile_html(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._add_xss_fields(self._get_sample_html_context())
+        self._assert_compiled_matches_rendered(template.compile_htmltext, template.render_htmltext, context)
+
+    def test_compile_plain(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._add_xss_fields(self._get_sample_plain_context())
+        self._assert_compiled_matches_rendered(template.compile_plaintext, template.render_plaintext, context)
+
+    def test_compile_anonymous_user_id(self):
+        template = CourseEmailTemplate.get_template()
+        context = self._add_xss_fields(self._get_sample_plain_context())
+        compiled = template.compile_plaintext("Your id is %%USER_ID%%.", context)
+        self.assertTrue(compiled.uses_anonymous_user_id)
+        message = compiled.render(
+            {'name': 'Student', 'email': 'student@test.com', 'user_id': 1, 'anonymous_user_id': 'abc123'}
+        )
+        self.assertIn("Your id is abc123.", message)
+
 
 @attr(shard=1)
 class CourseAuthorizationTest(TestCase):
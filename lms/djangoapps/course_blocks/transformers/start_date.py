@@ -1,11 +1,19 @@
 """
 Start Date Transformer implementation.
 """
-from lms.djangoapps.courseware.access_utils import check_start_date
+from bisect import bisect_left
+from datetime import datetime
+
+from django.conf import settings
+from pytz import UTC
+
+from lms.djangoapps.courseware.access_utils import check_start_date, in_preview_mode
+from lms.djangoapps.courseware.masquerade import is_masquerading_as_student
 from openedx.core.djangoapps.content.block_structure.transformer import (
     BlockStructureTransformer,
     FilteringTransformerMixin
 )
+from student.roles import CourseBetaTesterRole
 from xmodule.course_metadata_utils import DEFAULT_START_DATE
 
 from .utils import collect_merged_date_field
@@ -27,9 +35,10 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
 
     Staff users are exempted from visibility rules.
     """
-    WRITE_VERSION = 1
+    WRITE_VERSION = 2
     READ_VERSION = 1
     MERGED_START_DATE = 'merged_start_date'
+    START_DATES = 'start_dates'
 
     @classmethod
     def name(cls):
@@ -67,6 +76,13 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
             func_merge_ancestors=max,
         )
 
+        # The sorted, distinct merged start dates of all blocks, so the
+        # access signature can tell which of them are past.
+        block_structure.set_transformer_data(cls, cls.START_DATES, sorted(set(
+            cls._get_merged_start_date(block_structure, block_key)
+            for block_key in block_structure
+        )))
+
     def transform_block_filters(self, usage_info, block_structure):
         # Users with staff access bypass the Start Date check.
         if usage_info.has_staff_access:
@@ -79,3 +95,28 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
             usage_info.course_key,
         )
         return [block_structure.create_removal_filter(removal_condition)]
+
+    def access_signature(self, usage_info, block_structure):
+        if usage_info.has_staff_access:
+            return 'staff'
+
+        # Block structures collected before version 2 don't have the start dates.
+        start_dates = block_structure.get_transformer_data(self, self.START_DATES)
+        if start_dates is None:
+            return None
+
+        # Beta testers get access to each block a number of days early
+        # that is set per block.
+        if CourseBetaTesterRole(usage_info.course_key).has_user(usage_info.user):
+            return None
+
+        # Otherwise check_start_date grants access to the blocks whose start
+        # date is past, or to all blocks when start dates are disabled for
+        # the user or in preview mode.
+        return (
+            settings.FEATURES['DISABLE_START_DATES'] and not is_masquerading_as_student(
+                usage_info.user, usage_info.course_key,
+            ),
+            in_preview_mode(),
+            bisect_left(start_dates, datetime.now(UTC)),
+        )
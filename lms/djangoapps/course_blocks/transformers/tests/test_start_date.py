@@ -9,9 +9,12 @@ from mock import patch
 from nose.plugins.attrib import attr
 
 from courseware.tests.factories import BetaTesterFactory
+from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
+from student.tests.factories import UserFactory
 
+from ...usage_info import CourseUsageInfo
 from ..start_date import DEFAULT_START_DATE, StartDateTransformer
-from .helpers import BlockParentsMapTestCase, update_block
+from .helpers import BlockParentsMapTestCase, publish_course, update_block
 
 
 @attr(shard=3)
@@ -121,3 +124,27 @@ class StartDateTransformerTestCase(BlockParentsMapTestCase):
             blocks_with_differing_student_access,
             self.transformers,
         )
+
+    def test_access_signature(self):
+        block = self.get_block(1)
+        block.start = self.StartDateType.NEXT_MONTH
+        update_block(block)
+        publish_course(self.course)
+        block_structure = get_block_structure_manager(self.course.id).get_collected()
+        transformer = StartDateTransformer()
+
+        def access_signature(user):
+            """
+            Returns the access signature of the transformer for the given user.
+            """
+            return transformer.access_signature(CourseUsageInfo(self.course.id, user), block_structure)
+
+        # Students share a signature, since the same blocks have started for them.
+        self.assertIsNotNone(access_signature(self.student))
+        self.assertEqual(access_signature(self.student), access_signature(UserFactory.create()))
+
+        self.assertEqual(access_signature(self.staff), 'staff')
+
+        # Beta testers have no signature, since the number of days early
+        # they get access to a block is set per block.
+        self.assertIsNone(access_signature(self.beta_user))
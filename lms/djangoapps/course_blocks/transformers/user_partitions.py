@@ -88,6 +88,17 @@ class UserPartitionTransformer(FilteringTransformerMixin, BlockStructureTransfor
         result_list.append(group_access_filter)
         return result_list
 
+    def access_signature(self, usage_info, block_structure):
+        # The filters only depend on the user's group in each partition.
+        user_partitions = block_structure.get_transformer_data(self, 'user_partitions')
+        if not user_partitions:
+            return ()
+
+        user_groups = _get_user_partition_groups(
+            usage_info.course_key, user_partitions, usage_info.user
+        )
+        return tuple(sorted((partition_id, group.id) for partition_id, group in user_groups.iteritems()))
+
 
 class _MergedGroupAccess(object):
     """
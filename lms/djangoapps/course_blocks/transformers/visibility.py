@@ -69,3 +69,7 @@ class VisibilityTransformer(FilteringTransformerMixin, BlockStructureTransformer
                 lambda block_key: self._get_visible_to_staff_only(block_structure, block_key),
             )
         ]
+
+    def access_signature(self, usage_info, block_structure):
+        # The filter only depends on whether the user has staff access.
+        return usage_info.has_staff_access
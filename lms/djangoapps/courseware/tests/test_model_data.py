@@ -224,12 +224,12 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
     def test_set_many_failure(self):
         "Test failures when setting many fields that are scoped to Scope.user_state"
         kv_dict = self.construct_kv_dict()
-        # because we're patching the underlying save, we need to ensure the
+        # because we're patching the underlying update, we need to ensure the
         # fields are in the cache
         for key in kv_dict:
             self.kvs.set(key, 'test_value')
 
-        with patch('django.db.models.Model.save', side_effect=DatabaseError):
+        with patch('django.db.models.query.QuerySet.update', side_effect=DatabaseError):
             with self.assertRaises(KeyValueMultiSaveError) as exception_context:
                 self.kvs.set_many(kv_dict)
         self.assertEquals(exception_context.exception.saved_field_names, [])
@@ -8,6 +8,7 @@ from unittest import skip
 
 from django.test import TestCase
 from edx_user_state_client.tests import UserStateClientTestBase
+from opaque_keys.edx.locator import CourseLocator
 
 from courseware.tests.factories import UserFactory
 from courseware.user_state_client import DjangoXBlockUserStateClient
@@ -67,3 +68,45 @@ class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
     @skip("Not supported by DjangoXBlockUserStateClient")
     def test_iter_course_many_users(self):
         pass
+
+
+class TestDjangoUserStateClientBulkWrites(TestCase):
+    """
+    Tests that DjangoUserStateClient.set_many writes many blocks with a
+    constant number of queries.
+    """
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestDjangoUserStateClientBulkWrites, self).setUp()
+        self.user = UserFactory.create()
+        self.client = DjangoXBlockUserStateClient(self.user)
+        course_key = CourseLocator('org', 'course', 'run')
+        self.block_keys = [course_key.make_usage_key('html', 'block{}'.format(index)) for index in range(5)]
+
+    def _get_states(self):
+        """Returns a dict mapping block keys to the stored state of those blocks."""
+        return {
+            block_state.block_key: block_state.state
+            for block_state in self.client.get_many(self.user.username, self.block_keys)
+        }
+
+    def test_set_many_new_blocks(self):
+        # One read of the existing rows, one bulk insert and one read of the new primary keys,
+        # and the savepoint and its release around the insert.
+        with self.assertNumQueries(5, using='default'):
+            self.client.set_many(self.user.username, {key: {'a': index} for index, key in enumerate(self.block_keys)})
+        self.assertEqual(self._get_states(), {key: {'a': index} for index, key in enumerate(self.block_keys)})
+
+    def test_set_many_existing_blocks(self):
+        self.client.set_many(self.user.username, {key: {'a': index} for index, key in enumerate(self.block_keys)})
+
+        # One read of the existing rows and one multi-row update, and the savepoint and its
+        # release around the update.
+        with self.assertNumQueries(4, using='default'):
+            self.client.set_many(self.user.username, {key: {'b': index} for index, key in enumerate(self.block_keys)})
+        self.assertEqual(
+            self._get_states(),
+            {key: {'a': index, 'b': index} for index, key in enumerate(self.block_keys)},
+        )
@@ -9,8 +9,11 @@ from operator import attrgetter
 from time import time
 
 from django.contrib.auth.models import User
-from django.db import transaction
+from django.db import router, transaction
+from django.db.models import Case, TextField, Value, When
+from django.db.models.signals import post_save
 from django.db.utils import IntegrityError
+from django.utils import timezone
 from edx_user_state_client.interface import XBlockUserState, XBlockUserStateClient
 from xblock.fields import Scope
 
@@ -254,10 +257,6 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         # count how many times this function gets called
         self._nr_stat_increment('set_many', 'calls')
 
-        # We do a find_or_create for every block (rather than re-using field objects
-        # that were queried in get_many) so that if the score has
-        # been changed by some other piece of the code, we don't overwrite
-        # that score.
         if self.user is not None and self.user.username == username:
             user = self.user
         else:
@@ -270,41 +269,68 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
 
         evt_time = time()
 
+        # Read every existing row in one query and merge the new state into it in memory,
+        # then write all new rows with one INSERT and all existing rows with one UPDATE.
+        # We re-read the rows (rather than re-using field objects that were queried in
+        # get_many) so that if the score has been changed by some other piece of the
+        # code, we don't overwrite that score.
+        student_modules = {
+            usage_key: student_module
+            for student_module, usage_key in self._get_student_modules(username, block_keys_to_state.keys())
+        }
+        new_modules = []
+        changed_modules = []
+        field_counts = {}
         for usage_key, state in block_keys_to_state.items():
-            student_module, created = StudentModule.objects.get_or_create(
-                student=user,
-                course_id=usage_key.course_key,
-                module_state_key=usage_key,
-                defaults={
-                    'state': json.dumps(state),
-                    'module_type': usage_key.block_type,
-                },
-            )
-
-            num_fields_before = num_fields_after = num_new_fields_set = len(state)
-            num_fields_updated = 0
-            if not created:
+            student_module = student_modules.get(usage_key)
+            if student_module is None:
+                student_module = StudentModule(
+                    student=user,
+                    course_id=usage_key.course_key,
+                    module_state_key=usage_key,
+                    state=json.dumps(state),
+                    module_type=usage_key.block_type,
+                )
+                student_modules[usage_key] = student_module
+                new_modules.append(student_module)
+                field_counts[usage_key] = (len(state), len(state))
+            else:
                 if student_module.state is None:
                     current_state = {}
                 else:
                     current_state = json.loads(student_module.state)
                 num_fields_before = len(current_state)
                 current_state.update(state)
-                num_fields_after = len(current_state)
                 student_module.state = json.dumps(current_state)
-                try:
-                    with transaction.atomic():
-                        # Updating the object - force_update guarantees no INSERT will occur.
-                        student_module.save(force_update=True)
-                except IntegrityError:
-                    # The UPDATE above failed. Log information - but ignore the error.
-                    # See https://openedx.atlassian.net/browse/TNL-5365
-                    log.warning("set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
-                        user, repr(unicode(usage_key.course_key)), usage_key
-                    ))
-                    log.warning("set_many: All {} block keys: {}".format(
-                        len(block_keys_to_state), block_keys_to_state.keys()
-                    ))
+                changed_modules.append(student_module)
+                field_counts[usage_key] = (num_fields_before, len(current_state))
+
+        created_keys = set()
+        if new_modules:
+            try:
+                with transaction.atomic():
+                    self._insert_student_modules(username, new_modules)
+            except IntegrityError:
+                # Some of the rows were created concurrently by another request, so fall
+                # back to creating or updating them one at a time.
+                for student_module in new_modules:
+                    usage_key = student_module.module_state_key
+                    student_module, created, field_counts[usage_key] = self._get_or_create_student_module(
+                        user, usage_key, block_keys_to_state[usage_key], block_keys_to_state,
+                    )
+                    student_modules[usage_key] = student_module
+                    if created:
+                        created_keys.add(usage_key)
+            else:
+                created_keys.update(student_module.module_state_key for student_module in new_modules)
+
+        if changed_modules:
+            self._update_student_modules(user, changed_modules, block_keys_to_state)
+
+        for usage_key, state in block_keys_to_state.items():
+            student_module = student_modules[usage_key]
+            created = usage_key in created_keys
+            num_fields_before, num_fields_after = field_counts[usage_key]
 
             # DataDog and New Relic reporting
 
@@ -337,6 +363,119 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         self._ddog_histogram(evt_time, 'set_many.response_time', duration)
         self._nr_stat_accumulate('set_many', 'duration', duration)
 
+    def _send_post_save(self, student_module, created):
+        """
+        Send the ``post_save`` signal for a ``student_module`` that was written with a
+        bulk query, so that receivers such as the state history recorders behave as
+        they do for rows written with :meth:`~Model.save`.
+        """
+        post_save.send(
+            sender=StudentModule,
+            instance=student_module,
+            created=created,
+            update_fields=None,
+            raw=False,
+            using=router.db_for_write(StudentModule, instance=student_module),
+        )
+
+    def _insert_student_modules(self, username, student_modules):
+        """
+        Insert the new, unsaved ``student_modules`` of the user ``username``.
+        """
+        if len(student_modules) == 1:
+            # A plain INSERT sets the primary key and sends post_save itself.
+            student_modules[0].save(force_insert=True)
+            return
+
+        StudentModule.objects.bulk_create(student_modules)
+
+        # bulk_create does not set primary keys (except on PostgreSQL), so read them back.
+        inserted_ids = {
+            usage_key: student_module.id
+            for student_module, usage_key in self._get_student_modules(
+                username, [student_module.module_state_key for student_module in student_modules]
+            )
+        }
+        for student_module in student_modules:
+            student_module.id = inserted_ids[student_module.module_state_key]
+            self._send_post_save(student_module, created=True)
+
+    def _update_student_modules(self, user, student_modules, block_keys_to_state):
+        """
+        Write the merged state of the existing ``student_modules`` with a single UPDATE.
+        """
+        modified = timezone.now()
+        try:
+            with transaction.atomic():
+                StudentModule.objects.filter(id__in=[student_module.id for student_module in student_modules]).update(
+                    state=Case(
+                        *[
+                            When(id=student_module.id, then=Value(student_module.state))
+                            for student_module in student_modules
+                        ],
+                        output_field=TextField()
+                    ),
+                    modified=modified,
+                )
+        except IntegrityError:
+            # The UPDATE above failed. Log information - but ignore the error.
+            # See https://openedx.atlassian.net/browse/TNL-5365
+            log.warning("set_many: IntegrityError for student {} - usage keys {}".format(
+                user, [unicode(student_module.module_state_key) for student_module in student_modules]
+            ))
+            log.warning("set_many: All {} block keys: {}".format(
+                len(block_keys_to_state), block_keys_to_state.keys()
+            ))
+            return
+
+        for student_module in student_modules:
+            student_module.modified = modified
+            self._send_post_save(student_module, created=False)
+
+    def _get_or_create_student_module(self, user, usage_key, state, block_keys_to_state):
+        """
+        Create or update the row for a single ``usage_key``, overlaying ``state`` on any
+        stored state.  This is the slower path used when a bulk insert races with another
+        writer.
+
+        Returns:
+            (student_module, created, (num_fields_before, num_fields_after))
+        """
+        student_module, created = StudentModule.objects.get_or_create(
+            student=user,
+            course_id=usage_key.course_key,
+            module_state_key=usage_key,
+            defaults={
+                'state': json.dumps(state),
+                'module_type': usage_key.block_type,
+            },
+        )
+
+        num_fields_before = num_fields_after = len(state)
+        if not created:
+            if student_module.state is None:
+                current_state = {}
+            else:
+                current_state = json.loads(student_module.state)
+            num_fields_before = len(current_state)
+            current_state.update(state)
+            num_fields_after = len(current_state)
+            student_module.state = json.dumps(current_state)
+            try:
+                with transaction.atomic():
+                    # Updating the object - force_update guarantees no INSERT will occur.
+                    student_module.save(force_update=True)
+            except IntegrityError:
+                # The UPDATE above failed. Log information - but ignore the error.
+                # See https://openedx.atlassian.net/browse/TNL-5365
+                log.warning("set_many: IntegrityError for student {} - course_id {} - usage key {}".format(
+                    user, repr(unicode(usage_key.course_key)), usage_key
+                ))
+                log.warning("set_many: All {} block keys: {}".format(
+                    len(block_keys_to_state), block_keys_to_state.keys()
+                ))
+        return student_module, created, (num_fields_before, num_fields_after)
+
     def delete_many(self, username, block_keys, scope=Scope.user_state, fields=None):
         """
         Delete the stored XBlock state for a many xblock usages.
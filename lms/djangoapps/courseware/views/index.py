@@ -4,6 +4,7 @@ View for Courseware Index
 
 # pylint: disable=attribute-defined-outside-init
 
+import json
 import logging
 import urllib
 
@@ -41,6 +42,7 @@ from shoppingcart.models import CourseRegistrationCode
 from student.views import is_course_blocked
 from util.views import ensure_valid_course_key
 from xmodule.modulestore.django import modulestore
+from xmodule.seq_module import UNIT_VIEW_URL_USAGE_ID
 from xmodule.x_module import STUDENT_VIEW
 from .views import CourseTabView
 from ..access import has_access
@@ -54,7 +56,7 @@ from ..entrance_exams import (
 )
 from ..masquerade import setup_masquerade
 from ..model_data import FieldDataCache
-from ..module_render import get_module_for_descriptor, toc_for_course
+from ..module_render import get_module_for_descriptor, hash_resource, toc_for_course
 
 log = logging.getLogger("edx.courseware.views.index")
 
@@ -72,6 +74,20 @@ class CoursewareIndex(View):
         waffle_flag = CourseWaffleFlag(WaffleFlagNamespace(name='seo'), 'enable_anonymous_courseware_access')
         return waffle_flag.is_enabled(self.course_key)
 
+    @cached_property
+    def render_active_unit_only(self):
+        """
+        Returns whether sequences render only their active unit, and fetch
+        the others from the xblock_view endpoint when they are displayed.
+        """
+        waffle_flag = CourseWaffleFlag(WaffleFlagNamespace(name='courseware'), 'render_active_unit_only')
+        return (
+            settings.FEATURES.get('ENABLE_XBLOCK_VIEW_ENDPOINT', False) and
+            self.request.user.is_authenticated() and
+            not self._is_masquerading_as_specific_student() and
+            waffle_flag.is_enabled(self.course_key)
+        )
+
     @method_decorator(ensure_csrf_cookie)
     @method_decorator(cache_control(no_cache=True, no_store=True, must_revalidate=True))
     @method_decorator(ensure_valid_course_key)
@@ -436,6 +452,8 @@ class CoursewareIndex(View):
                 table_of_contents['next_of_active_section'],
             )
             courseware_context['fragment'] = self.section.render(STUDENT_VIEW, section_context)
+            if self.render_active_unit_only:
+                self._add_loaded_resources(courseware_context['fragment'])
             if self.section.position and self.section.has_children:
                 display_items = self.section.get_display_items()
                 if display_items:
@@ -466,6 +484,19 @@ class CoursewareIndex(View):
                 get_entrance_exam_usage_key(self.course),
             )
 
+    def _add_loaded_resources(self, fragment):
+        """
+        Adds to the fragment a script that records the hashes of its resources
+        in window.loadedXBlockResources, so that the sequence doesn't load them
+        again with the units it fetches from the xblock_view endpoint.
+        """
+        hashes = [hash_resource(resource) for resource in fragment.resources]
+        fragment.add_javascript(
+            'window.loadedXBlockResources = (window.loadedXBlockResources || []).concat({hashes});'.format(
+                hashes=json.dumps(hashes),
+            )
+        )
+
     def _create_section_context(self, previous_of_active_section, next_of_active_section):
         """
         Returns and creates the rendering context for the section.
@@ -498,6 +529,11 @@ class CoursewareIndex(View):
             section_context['next_url'] = _compute_section_url(next_of_active_section, 'first')
         # sections can hide data that masquerading staff should see when debugging issues with specific students
         section_context['specific_masquerade'] = self._is_masquerading_as_specific_student()
+        if self.render_active_unit_only:
+            section_context['unit_view_url'] = reverse(
+                'xblock_view',
+                args=[unicode(self.course_key), UNIT_VIEW_URL_USAGE_ID, STUDENT_VIEW],
+            )
         return section_context
 
 
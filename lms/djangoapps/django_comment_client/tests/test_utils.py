@@ -33,11 +33,17 @@ from django_comment_common.utils import (
     set_course_discussion_settings
 )
 from lms.djangoapps.teams.tests.factories import CourseTeamFactory
-from lms.lib.comment_client.utils import CommentClientMaintenanceError, perform_request
+from lms.lib.comment_client.utils import (
+    REQUEST_CACHE_NAME,
+    CommentClientMaintenanceError,
+    get_session,
+    perform_request
+)
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from openedx.core.djangoapps.course_groups import cohorts
 from openedx.core.djangoapps.course_groups.cohorts import set_course_cohorted
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, config_course_cohorts
+from openedx.core.djangoapps.request_cache import clear_cache
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase
 from student.roles import CourseStaffRole
 from student.tests.factories import AdminFactory, CourseEnrollmentFactory, UserFactory
@@ -1844,6 +1850,55 @@ class ClientConfigurationTestCase(TestCase):
         self.assertEqual(result, {})
 
 
+class PerformRequestTestCase(TestCase):
+    """Test cases for the connections and caching of perform_request."""
+
+    def setUp(self):
+        super(PerformRequestTestCase, self).setUp()
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+        self.addCleanup(clear_cache, REQUEST_CACHE_NAME)
+
+        patcher = patch('requests.request')
+        self.mock_request = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_request.return_value = Mock(status_code=200, json=lambda: {'body': 'text'})
+
+    @patch('lms.lib.comment_client.utils.POOL_SIZE', 10)
+    def test_session_is_reused(self):
+        session = get_session()
+        self.assertIs(get_session(), session)
+        adapter = session.get_adapter('http://localhost:4567')
+        self.assertEqual(adapter._pool_maxsize, 10)  # pylint: disable=protected-access
+
+        with patch.object(session, 'request') as mock_session_request:
+            mock_session_request.return_value = self.mock_request.return_value
+            perform_request('get', 'http://www.google.com')
+        self.assertTrue(mock_session_request.called)
+        self.assertFalse(self.mock_request.called)
+
+    @patch('lms.lib.comment_client.utils.get_current_request', Mock())
+    def test_identical_gets_coalesced(self):
+        first = perform_request('get', 'http://www.google.com', {'a': 1})
+        first['body'] = 'changed'
+        self.assertEqual(perform_request('get', 'http://www.google.com', {'a': 1}), {'body': 'text'})
+        self.assertEqual(self.mock_request.call_count, 1)
+
+        perform_request('get', 'http://www.google.com', {'a': 2})
+        self.assertEqual(self.mock_request.call_count, 2)
+
+        # Changes to the comments service's data make new requests necessary.
+        perform_request('post', 'http://www.google.com', {'a': 1})
+        perform_request('get', 'http://www.google.com', {'a': 1})
+        self.assertEqual(self.mock_request.call_count, 4)
+
+    def test_not_coalesced_outside_request(self):
+        perform_request('get', 'http://www.google.com')
+        perform_request('get', 'http://www.google.com')
+        self.assertEqual(self.mock_request.call_count, 2)
+
+
 def set_discussion_division_settings(
         course_key, enable_cohorts=False, always_divide_inline_discussions=False,
         divided_discussions=[], division_scheme=CourseDiscussionSettings.COHORT
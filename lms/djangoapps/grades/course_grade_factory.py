@@ -2,6 +2,7 @@
 Course Grade Factory Class
 """
 from collections import namedtuple
+from itertools import islice
 from logging import getLogger
 
 import dogstats_wrapper as dog_stats_api
@@ -12,7 +13,8 @@ from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED, COURSE
 from .config import assume_zero_if_absent, should_persist_grades
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
-from .models import PersistentCourseGrade, prefetch
+from .models import PersistentCourseGrade, bulk_prefetch, prefetch
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -23,6 +25,13 @@ class CourseGradeFactory(object):
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Number of users whose grading data is prefetched together by iter.
+    USER_BATCH_SIZE = 100
+
+    # Smallest batch of users whose grading data iter prefetches.  Smaller
+    # batches are cheaper to grade with the per-user queries.
+    MIN_PREFETCH_BATCH_SIZE = 10
+
     def read(
             self,
             user,
@@ -92,6 +101,10 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        Students are graded in batches of USER_BATCH_SIZE, with the scores
+        and persisted grades of each batch of at least MIN_PREFETCH_BATCH_SIZE
+        students prefetched in bulk.
         """
         # Pre-fetch the collected course_structure (in _iter_grade_result) so:
         # 1. Correctness: the same version of the course is used to
@@ -102,9 +115,27 @@ class CourseGradeFactory(object):
             user=None, course=course, collected_block_structure=collected_block_structure, course_key=course_key,
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
-        for user in users:
-            with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
-                yield self._iter_grade_result(user, course_data, force_update)
+        users = iter(users)
+        while True:
+            batch = list(islice(users, self.USER_BATCH_SIZE))
+            if not batch:
+                break
+            if len(batch) >= self.MIN_PREFETCH_BATCH_SIZE:
+                self._prefetch_batch(batch, course_data)
+            for user in batch:
+                with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
+                    yield self._iter_grade_result(user, course_data, force_update)
+
+    @staticmethod
+    def _prefetch_batch(users, course_data):
+        """
+        Prefetches, with a constant number of queries, the data needed
+        to grade all the given users, so the grades of each user are
+        computed from memory.
+        """
+        if should_persist_grades(course_data.course_key):
+            bulk_prefetch(course_data.course_key, users)
+        SubsectionGradeFactory.prefetch_scores(course_data.course_key, course_data.collected_structure, users)
 
     def _iter_grade_result(self, user, course_data, force_update):
         try:
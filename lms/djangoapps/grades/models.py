@@ -296,6 +296,8 @@ class PersistentSubsectionGrade(TimeStampedModel):
     # track which blocks were visible at the time of grade calculation
     visible_blocks = models.ForeignKey(VisibleBlocks, db_column='visible_blocks_hash', to_field='hashed')
 
+    _CACHE_NAMESPACE = u"grades.models.PersistentSubsectionGrade"
+
     @property
     def full_usage_key(self):
         """
@@ -350,12 +352,34 @@ class PersistentSubsectionGrade(TimeStampedModel):
         Arguments:
             user_id: The user associated with the desired grades
             course_key: The course identifier for the desired grades
+
+        Grades prefetched for the user are returned, and then discarded,
+        instead of being queried.
         """
+        prefetched_grades = get_cache(cls._CACHE_NAMESPACE).get(cls._cache_key(course_key), {})
+        if user_id in prefetched_grades:
+            return prefetched_grades.pop(user_id)
+
         return cls.objects.select_related('visible_blocks', 'override').filter(
             user_id=user_id,
             course_id=course_key,
         )
 
+    @classmethod
+    def prefetch(cls, course_key, users):
+        """
+        Prefetches, with a single query, the grades of the given users
+        for the given course.  Each user's prefetched grades are used
+        by the next call to bulk_read_grades for that user.
+        """
+        prefetched_grades = {user.id: [] for user in users}
+        for grade in cls.objects.select_related('visible_blocks', 'override').filter(
+                user_id__in=list(prefetched_grades),
+                course_id=course_key,
+        ):
+            prefetched_grades[grade.user_id].append(grade)
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(course_key)] = prefetched_grades
+
     @classmethod
     def update_or_create_grade(cls, **params):
         """
@@ -440,6 +464,10 @@ class PersistentSubsectionGrade(TimeStampedModel):
             if override.possible_graded_override is not None:
                 params['possible_graded'] = override.possible_graded_override
 
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"subsection_grades_cache.{}".format(course_key)
+
     @staticmethod
     def _emit_grade_calculated_event(grade):
         events.subsection_grade_calculated(grade)
@@ -596,15 +624,39 @@ class PersistentSubsectionGradeOverride(models.Model):
 
     @classmethod
     def prefetch(cls, user_id, course_key):
-        get_cache(cls._CACHE_NAMESPACE)[(user_id, str(course_key))] = {
-            override.grade.usage_key: override
-            for override in
-            cls.objects.filter(grade__user_id=user_id, grade__course_id=course_key)
-        }
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        bulk_prefetched = cache.get(cls._bulk_cache_key(course_key), {})
+        if user_id in bulk_prefetched:
+            overrides = bulk_prefetched.pop(user_id)
+        else:
+            overrides = {
+                override.grade.usage_key: override
+                for override in
+                cls.objects.select_related('grade').filter(grade__user_id=user_id, grade__course_id=course_key)
+            }
+        cache[(user_id, str(course_key))] = overrides
+
+    @classmethod
+    def bulk_prefetch(cls, course_key, users):
+        """
+        Prefetches, with a single query, the overrides of the given
+        users for the given course.  Each user's prefetched overrides
+        are used by the next call to prefetch for that user.
+        """
+        prefetched_overrides = {user.id: {} for user in users}
+        for override in cls.objects.select_related('grade').filter(
+                grade__user_id__in=list(prefetched_overrides),
+                grade__course_id=course_key,
+        ):
+            prefetched_overrides[override.grade.user_id][override.grade.usage_key] = override
+        get_cache(cls._CACHE_NAMESPACE)[cls._bulk_cache_key(course_key)] = prefetched_overrides
 
     @classmethod
     def get_override(cls, user_id, usage_key):
-        prefetch_values = get_cache(cls._CACHE_NAMESPACE).get((user_id, str(usage_key.course_key)), None)
+        cache = get_cache(cls._CACHE_NAMESPACE)
+        prefetch_values = cache.get((user_id, str(usage_key.course_key)), None)
+        if prefetch_values is None:
+            prefetch_values = cache.get(cls._bulk_cache_key(usage_key.course_key), {}).get(user_id)
         if prefetch_values is not None:
             return prefetch_values.get(usage_key)
         try:
@@ -616,7 +668,22 @@ class PersistentSubsectionGradeOverride(models.Model):
         except PersistentSubsectionGradeOverride.DoesNotExist:
             pass
 
+    @classmethod
+    def _bulk_cache_key(cls, course_key):
+        return u"overrides_cache.{}".format(course_key)
+
 
 def prefetch(user, course_key):
     PersistentSubsectionGradeOverride.prefetch(user.id, course_key)
     VisibleBlocks.bulk_read(course_key)
+
+
+def bulk_prefetch(course_key, users):
+    """
+    Prefetches the persisted grade data of all the given users for the
+    given course, with a constant number of queries.
+    """
+    PersistentCourseGrade.prefetch(course_key, users)
+    PersistentSubsectionGrade.prefetch(course_key, users)
+    PersistentSubsectionGradeOverride.bulk_prefetch(course_key, users)
+    VisibleBlocks.bulk_read(course_key)
@@ -26,7 +26,11 @@ from ..constants import ScoreDatabaseTableEnum
 from ..course_grade_factory import CourseGradeFactory
 from .. import events
 from ..scores import weighted_score
-from ..tasks import RECALCULATE_GRADE_DELAY_SECONDS, recalculate_subsection_grade_v3
+from ..tasks import (
+    RECALCULATE_GRADE_DELAY_SECONDS,
+    recalculate_subsection_grade_v3,
+    schedule_course_grade_recalculation,
+)
 
 log = getLogger(__name__)
 
@@ -229,9 +233,14 @@ def enqueue_subsection_update(sender, **kwargs):  # pylint: disable=unused-argum
 def recalculate_course_grade_only(sender, course, course_structure, user, **kwargs):  # pylint: disable=unused-argument
     """
     Updates a saved course grade, but does not update the subsection
-    grades the user has in this course.
+    grades the user has in this course.  If defer_course_grade is set,
+    the update is enqueued instead, once for a burst of subsection
+    grade changes.
     """
-    CourseGradeFactory().update(user, course=course, course_structure=course_structure)
+    if kwargs.get('defer_course_grade'):
+        schedule_course_grade_recalculation(user.id, course.id)
+    else:
+        CourseGradeFactory().update(user, course=course, course_structure=course_structure)
 
 
 @receiver(ENROLLMENT_TRACK_UPDATED)
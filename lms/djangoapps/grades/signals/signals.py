@@ -79,9 +79,10 @@ SCORE_PUBLISHED = Signal(
 SUBSECTION_SCORE_CHANGED = Signal(
     providing_args=[
         'course',  # Course object
-        'course_structure',  # BlockStructure object
+        'course_structure',  # BlockStructure object, or None if defer_course_grade
         'user',  # User object
         'subsection_grade',  # SubsectionGrade object
+        'defer_course_grade',  # (optional) whether to enqueue the course grade update
     ]
 )
 
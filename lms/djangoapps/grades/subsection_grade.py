@@ -293,3 +293,28 @@ class CreateSubsectionGrade(NonZeroSubsectionGrade):
             for location, score in
             self.problem_scores.iteritems()
         ]
+
+
+class RecalculatedSubsectionGrade(CreateSubsectionGrade):
+    """
+    Class for Subsection grades that are updated from the blocks that
+    were visible when the grade was last persisted, rather than from
+    the user's course structure.
+    """
+    # pylint: disable=super-init-not-called
+    def __init__(self, subsection, model, course_structure, submissions_scores, csm_scores):
+        self.problem_scores = OrderedDict()
+        for block in model.visible_blocks.blocks:
+            problem_score = self._compute_block_score(
+                block.locator,
+                course_structure,
+                submissions_scores,
+                csm_scores,
+                block,
+            )
+            if problem_score:
+                self.problem_scores[block.locator] = problem_score
+
+        all_total, graded_total = graders.aggregate_scores(self.problem_scores.values())
+
+        NonZeroSubsectionGrade.__init__(self, subsection, all_total, graded_total)
@@ -7,12 +7,18 @@ from courseware.model_data import ScoresClient
 from lms.djangoapps.grades.config import assume_zero_if_absent, should_persist_grades
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
+from openedx.core.djangoapps.request_cache import get_cache
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
 from student.models import anonymous_id_for_user
 from submissions import api as submissions_api
 
 from .course_data import CourseData
-from .subsection_grade import CreateSubsectionGrade, ReadSubsectionGrade, ZeroSubsectionGrade
+from .subsection_grade import (
+    CreateSubsectionGrade,
+    ReadSubsectionGrade,
+    RecalculatedSubsectionGrade,
+    ZeroSubsectionGrade,
+)
 
 log = getLogger(__name__)
 
@@ -21,6 +27,8 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
+    _CACHE_NAMESPACE = u"grades.subsection_grade_factory.SubsectionGradeFactory"
+
     def __init__(self, student, course=None, course_structure=None, course_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
@@ -98,12 +106,64 @@ class SubsectionGradeFactory(object):
 
         return calculated_grade
 
+    def update_from_persisted(self, subsection, grade_model, only_if_higher=None, score_deleted=False):
+        """
+        Updates the student's persisted SubsectionGrade for the subsection,
+        given as grade_model, recomputing the scores of only the blocks that
+        were visible when it was persisted.  Unlike update, the student's
+        course structure is not needed, so the factory can be created with
+        just the collected block structure.
+        """
+        self._log_event(log.debug, u"update_from_persisted, subsection: {}".format(subsection.location), subsection)
+
+        visible_block_keys = [block.locator for block in grade_model.visible_blocks.blocks]
+        calculated_grade = RecalculatedSubsectionGrade(
+            subsection,
+            grade_model,
+            self.course_data.effective_structure,
+            self._submissions_scores,
+            ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, visible_block_keys),
+        )
+
+        if only_if_higher:
+            orig_subsection_grade = ReadSubsectionGrade(subsection, grade_model, self)
+            if not is_score_higher_or_equal(
+                    orig_subsection_grade.graded_total.earned,
+                    orig_subsection_grade.graded_total.possible,
+                    calculated_grade.graded_total.earned,
+                    calculated_grade.graded_total.possible,
+            ):
+                return orig_subsection_grade
+
+        grade_model = calculated_grade.update_or_create_model(self.student, score_deleted)
+        self._update_saved_subsection_grade(subsection.location, grade_model)
+        return calculated_grade
+
+    @classmethod
+    def prefetch_scores(cls, course_key, collected_block_structure, users):
+        """
+        Prefetches, with a single query, the CSM scores of the given users
+        for all possibly scored blocks in the given collected block
+        structure.  Each user's prefetched scores are used by the next
+        SubsectionGradeFactory created for that user.
+
+        Submissions API scores are still read per user, since the API
+        has no call that reads the scores of several students.
+        """
+        scorable_locations = [block_key for block_key in collected_block_structure if possibly_scored(block_key)]
+        get_cache(cls._CACHE_NAMESPACE)[cls._cache_key(u'csm', course_key)] = ScoresClient.create_for_users(
+            course_key, [user.id for user in users], scorable_locations,
+        )
+
     @lazy
     def _csm_scores(self):
         """
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        prefetched_scores = self._pop_prefetched_scores(u'csm')
+        if prefetched_scores is not None:
+            return prefetched_scores
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -116,6 +176,19 @@ class SubsectionGradeFactory(object):
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
+    def _pop_prefetched_scores(self, source):
+        """
+        Returns and discards the scores from the given source that were
+        prefetched for the student, or None if they were not prefetched.
+        """
+        prefetched_scores = get_cache(self._CACHE_NAMESPACE).get(self._cache_key(source, self.course_data.course_key))
+        if prefetched_scores is not None:
+            return prefetched_scores.pop(self.student.id, None)
+
+    @classmethod
+    def _cache_key(cls, source, course_key):
+        return u"{}_scores.{}".format(source, course_key)
+
     def _get_bulk_cached_grade(self, subsection):
         """
         Returns the student's SubsectionGrade for the subsection,
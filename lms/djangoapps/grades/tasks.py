@@ -10,23 +10,28 @@ from celery_utils.persist_on_failure import LoggedPersistOnFailureTask
 from courseware.model_data import get_score
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db.utils import DatabaseError
 from lms.djangoapps.course_blocks.api import get_course_blocks
+from lms.djangoapps.grades.config import should_persist_grades
 from lms.djangoapps.grades.config.models import ComputeGradesSetting
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from opaque_keys.edx.locator import CourseLocator
-from openedx.core.djangoapps.monitoring_utils import set_custom_metric, set_custom_metrics_for_course_key
+from openedx.core.djangoapps.content.block_structure.api import get_block_structure_manager
+from openedx.core.djangoapps.monitoring_utils import increment, set_custom_metric, set_custom_metrics_for_course_key
 from student.models import CourseEnrollment
 from submissions import api as sub_api
 from track.event_transaction_utils import set_event_transaction_id, set_event_transaction_type
 from util.date_utils import from_timestamp
 from xmodule.modulestore.django import modulestore
 
-from .config.waffle import DISABLE_REGRADE_ON_POLICY_CHANGE, waffle
+from .config.waffle import DISABLE_REGRADE_ON_POLICY_CHANGE, INCREMENTAL_SUBSECTION_REGRADE, waffle
 from .constants import ScoreDatabaseTableEnum
+from .course_data import CourseData
 from .course_grade_factory import CourseGradeFactory
 from .exceptions import DatabaseNotReadyError
+from .models import PersistentSubsectionGrade
 from .services import GradesService
 from .signals.signals import SUBSECTION_SCORE_CHANGED
 from .subsection_grade_factory import SubsectionGradeFactory
@@ -34,6 +39,7 @@ from .transformer import GradesTransformer
 
 log = getLogger(__name__)
 
+COURSE_GRADE_RECALCULATION_DELAY_SECONDS = 30  # to recalculate a course grade once per burst of score changes
 COURSE_GRADE_TIMEOUT_SECONDS = 1200
 KNOWN_RETRY_ERRORS = (  # Errors we expect occasionally, should be resolved on retry
     DatabaseError,
@@ -251,6 +257,16 @@ def _update_subsection_grades(course_key, scored_block_usage_key, only_if_higher
     student = User.objects.get(id=user_id)
     store = modulestore()
     with store.bulk_operations(course_key):
+        course = store.get_course(course_key, depth=0)
+
+        if should_persist_grades(course_key) and waffle().is_enabled(INCREMENTAL_SUBSECTION_REGRADE):
+            if _update_subsection_grades_incrementally(
+                    course, scored_block_usage_key, only_if_higher, student, score_deleted,
+            ):
+                increment('grades.subsection_update.incremental')
+                return
+            increment('grades.subsection_update.full')
+
         course_structure = get_course_blocks(student, store.make_course_usage_key(course_key))
         subsections_to_update = course_structure.get_transformer_block_field(
             scored_block_usage_key,
@@ -259,7 +275,6 @@ def _update_subsection_grades(course_key, scored_block_usage_key, only_if_higher
             set(),
         )
 
-        course = store.get_course(course_key, depth=0)
         subsection_grade_factory = SubsectionGradeFactory(student, course, course_structure)
 
         for subsection_usage_key in subsections_to_update:
@@ -278,6 +293,111 @@ def _update_subsection_grades(course_key, scored_block_usage_key, only_if_higher
                 )
 
 
+def _update_subsection_grades_incrementally(course, scored_block_usage_key, only_if_higher, student, score_deleted):
+    """
+    Updates the persisted grades of the subsections containing the given
+    block from the blocks that were visible when each grade was persisted,
+    without transforming the course structure for the student.  The course
+    grade is then recalculated once for a burst of such updates.
+
+    Returns False, without updating anything, unless each subsection has a
+    persisted grade that includes the block, and the subsection's content
+    hasn't been edited since.
+    """
+    collected_structure = get_block_structure_manager(course.id).get_collected()
+    subsections_to_update = collected_structure.get_transformer_block_field(
+        scored_block_usage_key,
+        GradesTransformer,
+        'subsections',
+        set(),
+    )
+    if not subsections_to_update:
+        return False
+
+    persisted_grades = {
+        grade.full_usage_key: grade
+        for grade in PersistentSubsectionGrade.bulk_read_grades(student.id, course.id)
+    }
+    grades_to_update = []
+    for subsection_usage_key in subsections_to_update:
+        grade = persisted_grades.get(subsection_usage_key)
+        if grade is None or grade.subtree_edited_timestamp is None:
+            return False
+        if grade.subtree_edited_timestamp != collected_structure.get_xblock_field(
+                subsection_usage_key, 'subtree_edited_on',
+        ):
+            return False
+        if scored_block_usage_key not in (block.locator for block in grade.visible_blocks.blocks):
+            return False
+        grades_to_update.append(grade)
+
+    subsection_grade_factory = SubsectionGradeFactory(
+        student, course_data=CourseData(student, course=course, collected_block_structure=collected_structure),
+    )
+    for grade in grades_to_update:
+        subsection_grade = subsection_grade_factory.update_from_persisted(
+            collected_structure[grade.full_usage_key],
+            grade,
+            only_if_higher,
+            score_deleted,
+        )
+        SUBSECTION_SCORE_CHANGED.send(
+            sender=None,
+            course=course,
+            course_structure=None,
+            user=student,
+            subsection_grade=subsection_grade,
+            defer_course_grade=True,
+        )
+    return True
+
+
+@task(
+    bind=True,
+    base=LoggedPersistOnFailureTask,
+    time_limit=COURSE_GRADE_TIMEOUT_SECONDS,
+    max_retries=2,
+    default_retry_delay=RETRY_DELAY_SECONDS,
+    routing_key=settings.RECALCULATE_GRADES_ROUTING_KEY
+)
+def recalculate_course_grade(self, **kwargs):
+    """
+    Updates a saved course grade from the user's saved subsection grades.
+
+    Keyword Arguments:
+        user_id (int): id of applicable User object
+        course_id (string): identifying the course
+    """
+    course_key = CourseKey.from_string(kwargs['course_id'])
+    # Score changes from here on need another recalculation.
+    cache.delete(_course_grade_recalculation_cache_key(kwargs['user_id'], course_key))
+    try:
+        CourseGradeFactory().update(User.objects.get(id=kwargs['user_id']), course_key=course_key)
+    except Exception as exc:   # pylint: disable=broad-except
+        raise self.retry(kwargs=kwargs, exc=exc)
+
+
+def schedule_course_grade_recalculation(user_id, course_key):
+    """
+    Enqueues a recalculation of the user's course grade, unless one is
+    already enqueued and not yet started, so that a burst of subsection
+    grade updates recalculates the course grade only once.
+    """
+    if cache.add(
+            _course_grade_recalculation_cache_key(user_id, course_key),
+            True,
+            COURSE_GRADE_RECALCULATION_DELAY_SECONDS * 10,
+    ):
+        recalculate_course_grade.apply_async(
+            kwargs=dict(user_id=user_id, course_id=unicode(course_key)),
+            countdown=COURSE_GRADE_RECALCULATION_DELAY_SECONDS,
+        )
+
+
+def _course_grade_recalculation_cache_key(user_id, course_key):
+    return u"grades.recalculate_course_grade.{}.{}".format(user_id, course_key)
+
+
 def _course_task_args(course_key, **kwargs):
     """
     Helper function to generate course-grade task args.
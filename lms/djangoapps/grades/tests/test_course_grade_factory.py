@@ -18,6 +18,7 @@ from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, waffle
 from ..course_grade import CourseGrade, ZeroCourseGrade
 from ..course_grade_factory import CourseGradeFactory
 from ..subsection_grade import ReadSubsectionGrade, ZeroSubsectionGrade
+from ..subsection_grade_factory import SubsectionGradeFactory
 from .base import GradeTestBase
 from .utils import mock_get_score
 
@@ -269,6 +270,7 @@ class TestCourseGradeFactory(GradeTestBase):
 
 
 @attr(shard=1)
+@ddt.ddt
 class TestGradeIteration(SharedModuleStoreTestCase):
     """
     Test iteration through student course grades.
@@ -363,6 +365,17 @@ class TestGradeIteration(SharedModuleStoreTestCase):
         self.assertIsNotNone(all_course_grades[student2])
         self.assertIsNotNone(all_course_grades[student5])
 
+    @ddt.data(
+        (5, True),
+        (6, False),
+    )
+    @ddt.unpack
+    def test_prefetch_threshold(self, min_prefetch_batch_size, expect_prefetch):
+        with patch.object(CourseGradeFactory, 'MIN_PREFETCH_BATCH_SIZE', min_prefetch_batch_size):
+            with patch.object(SubsectionGradeFactory, 'prefetch_scores') as mock_prefetch_scores:
+                self._course_grades_and_errors_for(self.course, self.students)
+        self.assertEqual(mock_prefetch_scores.called, expect_prefetch)
+
     def _course_grades_and_errors_for(self, course, students):
         """
         Simple helper method to iterate through student grades and give us
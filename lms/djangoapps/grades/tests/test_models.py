@@ -13,7 +13,7 @@ from django.db.utils import IntegrityError
 from django.test import TestCase
 from django.utils.timezone import now
 from freezegun import freeze_time
-from mock import patch
+from mock import Mock, patch
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 
 from lms.djangoapps.grades.models import (
@@ -25,6 +25,7 @@ from lms.djangoapps.grades.models import (
     PersistentSubsectionGradeOverride,
     VisibleBlocks
 )
+from openedx.core.djangoapps.request_cache.middleware import RequestCache
 from track.event_transaction_utils import get_event_transaction_id, get_event_transaction_type
 
 
@@ -294,6 +295,27 @@ class PersistentSubsectionGradeTest(GradesModelTestCase):
         self.assertEqual(grade.earned_all, 0.0)
         self.assertEqual(grade.earned_graded, 0.0)
 
+    def test_prefetch(self):
+        grade = PersistentSubsectionGrade.update_or_create_grade(**self.params)
+        override = PersistentSubsectionGradeOverride(grade=grade, earned_all_override=0.0)
+        override.save()
+        user, other_user = Mock(id=self.params['user_id']), Mock(id=54321)
+        self.addCleanup(RequestCache.clear_request_cache)
+
+        with self.assertNumQueries(2):
+            PersistentSubsectionGrade.prefetch(self.course_key, [user, other_user])
+            PersistentSubsectionGradeOverride.bulk_prefetch(self.course_key, [user, other_user])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(list(PersistentSubsectionGrade.bulk_read_grades(user.id, self.course_key)), [grade])
+            self.assertEqual(list(PersistentSubsectionGrade.bulk_read_grades(other_user.id, self.course_key)), [])
+            self.assertEqual(PersistentSubsectionGradeOverride.get_override(user.id, self.usage_key), override)
+            self.assertIsNone(PersistentSubsectionGradeOverride.get_override(other_user.id, self.usage_key))
+
+        # Prefetched grades are only used once.
+        with self.assertNumQueries(1):
+            self.assertEqual(list(PersistentSubsectionGrade.bulk_read_grades(user.id, self.course_key)), [grade])
+
     def _assert_tracker_emitted_event(self, tracker_mock, grade):
         """
         Helper function to ensure that the mocked event tracker
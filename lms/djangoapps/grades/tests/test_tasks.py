@@ -16,15 +16,18 @@ from django.db.utils import IntegrityError
 from mock import MagicMock, patch
 
 from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
+from lms.djangoapps.grades.config.waffle import INCREMENTAL_SUBSECTION_REGRADE, waffle
 from lms.djangoapps.grades.constants import ScoreDatabaseTableEnum
 from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
 from lms.djangoapps.grades.services import GradesService
 from lms.djangoapps.grades.signals.signals import PROBLEM_WEIGHTED_SCORE_CHANGED
 from lms.djangoapps.grades.tasks import (
+    COURSE_GRADE_RECALCULATION_DELAY_SECONDS,
     RECALCULATE_GRADE_DELAY_SECONDS,
     _course_task_args,
     compute_grades_for_course_v2,
-    recalculate_subsection_grade_v3
+    recalculate_subsection_grade_v3,
+    schedule_course_grade_recalculation
 )
 from openedx.core.djangoapps.content.block_structure.exceptions import BlockStructureNotFound
 from student.models import CourseEnrollment, anonymous_id_for_user
@@ -114,9 +117,9 @@ class HasCourseWithProblemsMixin(object):
 # Get rid of this logic post-upgrade.
 def _recalc_expected_query_counts():
     if django.VERSION >= (1, 11):
-        return 27
+        return 28
     else:
-        return 23
+        return 24
 
 
 # TODO: Remove Django 1.11 upgrade shim
@@ -125,9 +128,9 @@ def _recalc_expected_query_counts():
 # Get rid of this logic post-upgrade.
 def _recalc_persistent_expected_query_counts():
     if django.VERSION >= (1, 11):
-        return 28
+        return 29
     else:
-        return 24
+        return 25
 
 
 @patch.dict(settings.FEATURES, {'PERSISTENT_GRADES_ENABLED_FOR_ALL_TESTS': False})
@@ -276,6 +279,55 @@ class RecalculateSubsectionGradeTest(HasCourseWithProblemsMixin, ModuleStoreTest
             self.assertIsNotNone(PersistentCourseGrade.read(self.user.id, self.course.id))
             self.assertGreater(len(PersistentSubsectionGrade.bulk_read_grades(self.user.id, self.course.id)), 0)
 
+    @patch('lms.djangoapps.grades.signals.handlers.schedule_course_grade_recalculation')
+    def test_incremental_update(self, mock_schedule_course_grade):
+        self.set_up_course()
+        self._apply_recalculate_subsection_grade()
+        grade = PersistentSubsectionGrade.read_grade(self.user.id, self.sequential.location)
+        self.assertEqual((grade.earned_all, grade.possible_all), (1, 2))
+
+        with waffle().override(INCREMENTAL_SUBSECTION_REGRADE, active=True):
+            with patch('lms.djangoapps.grades.tasks.get_course_blocks') as mock_get_course_blocks:
+                with self.mock_csm_get_score():
+                    with mock_get_score(2, 2):
+                        recalculate_subsection_grade_v3.apply(kwargs=self.recalculate_subsection_grade_kwargs)
+
+        self.assertFalse(mock_get_course_blocks.called)
+        grade = PersistentSubsectionGrade.read_grade(self.user.id, self.sequential.location)
+        self.assertEqual((grade.earned_all, grade.possible_all), (2, 2))
+        mock_schedule_course_grade.assert_called_once_with(self.user.id, self.course.id)
+
+    @patch('lms.djangoapps.grades.signals.handlers.schedule_course_grade_recalculation')
+    def test_incremental_update_without_persisted_grade(self, mock_schedule_course_grade):
+        self.set_up_course()
+        with waffle().override(INCREMENTAL_SUBSECTION_REGRADE, active=True):
+            self._apply_recalculate_subsection_grade()
+
+        # The grade was computed from the course structure instead.
+        self.assertFalse(mock_schedule_course_grade.called)
+        self.assertIsNotNone(PersistentSubsectionGrade.read_grade(self.user.id, self.sequential.location))
+        self.assertIsNotNone(PersistentCourseGrade.read(self.user.id, self.course.id))
+
+    @patch('lms.djangoapps.grades.signals.handlers.schedule_course_grade_recalculation')
+    def test_incremental_update_after_content_change(self, mock_schedule_course_grade):
+        self.set_up_course()
+        self._apply_recalculate_subsection_grade()
+
+        ItemFactory.create(parent=self.sequential, category='problem')
+        with waffle().override(INCREMENTAL_SUBSECTION_REGRADE, active=True):
+            self._apply_recalculate_subsection_grade()
+        self.assertFalse(mock_schedule_course_grade.called)
+
+    @patch('lms.djangoapps.grades.tasks.recalculate_course_grade.apply_async')
+    def test_schedule_course_grade_recalculation(self, mock_task_apply):
+        self.set_up_course()
+        for _ in range(3):
+            schedule_course_grade_recalculation(self.user.id, self.course.id)
+        mock_task_apply.assert_called_once_with(
+            kwargs=dict(user_id=self.user.id, course_id=unicode(self.course.id)),
+            countdown=COURSE_GRADE_RECALCULATION_DELAY_SECONDS,
+        )
+
     @patch('lms.djangoapps.grades.signals.signals.SUBSECTION_SCORE_CHANGED.send')
     @patch('lms.djangoapps.grades.subsection_grade_factory.SubsectionGradeFactory.update')
     def test_retry_first_time_only(self, mock_update, mock_course_signal):
@@ -9,6 +9,7 @@ from django.utils.translation import ugettext as _
 from django.utils.translation import ungettext
 
 from bulk_email.models import CourseEmail
+from lms.djangoapps.instructor_task.subtasks import update_task_output_from_subtasks
 from lms.djangoapps.instructor_task.views import get_task_completion_info
 from util.date_utils import get_default_time_display
 
@@ -109,6 +110,9 @@ def extract_task_features(task):
     * created (datetime, when the task was completed)
     * task_output (optional)
     """
+    # Add up the progress of subtasks that store their status in rows of their own
+    update_task_output_from_subtasks(task)
+
     # Pull out information from the task
     features = ['task_type', 'task_input', 'task_id', 'requester', 'task_state']
     task_feature_dict = {feature: str(getattr(task, feature)) for feature in features}
@@ -17,6 +17,7 @@ from six import text_type
 from courseware.courses import get_problems_in_section
 from courseware.module_render import get_xqueue_callback_url_prefix
 from lms.djangoapps.instructor_task.models import PROGRESS, InstructorTask
+from lms.djangoapps.instructor_task.subtasks import update_task_output_from_subtasks
 from util.db import outer_atomic
 from xmodule.modulestore.django import modulestore
 
@@ -178,7 +179,8 @@ def _update_instructor_task(instructor_task, task_result):
     to the task's AsyncResult object.  When subtasks are running, the
     InstructorTask object itself is updated with the subtasks' progress,
     not any AsyncResult object.  In this case, the InstructorTask is
-    not updated at all.
+    not updated, except for subtasks that store their status in rows of
+    their own, whose progress is added up into its "task_output".
 
     Calculates json to store in "task_output" field of the `instructor_task`,
     as well as updating the task_state.
@@ -210,6 +212,7 @@ def _update_instructor_task(instructor_task, task_result):
         # We want to ignore the parent SUCCESS if subtasks are still running, and just trust the
         # contents of the InstructorTask.
         entry_needs_updating = False
+        update_task_output_from_subtasks(instructor_task)
     elif result_state in [PROGRESS, SUCCESS]:
         # construct a status message directly from the task result's result:
         # it needs to go back with the entry passed in.
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor_task', '0002_gradereportsetting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstructorSubtask',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('task_id', models.CharField(max_length=255)),
+                ('task_state', models.CharField(max_length=50, db_index=True)),
+                ('attempted', models.IntegerField(default=0)),
+                ('succeeded', models.IntegerField(default=0)),
+                ('failed', models.IntegerField(default=0)),
+                ('skipped', models.IntegerField(default=0)),
+                ('retried_nomax', models.IntegerField(default=0)),
+                ('retried_withmax', models.IntegerField(default=0)),
+                ('instructor_task', models.ForeignKey(to='instructor_task.InstructorTask')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='instructorsubtask',
+            unique_together=set([('instructor_task', 'task_id')]),
+        ),
+    ]
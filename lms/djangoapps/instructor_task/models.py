@@ -17,12 +17,14 @@ import hashlib
 import json
 import logging
 import os.path
+import shutil
+from tempfile import TemporaryFile
 from uuid import uuid4
 
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files import File
 from django.db import models, transaction
 from opaque_keys.edx.django.models import CourseKeyField
 from six import text_type
@@ -179,6 +181,41 @@ class InstructorTask(models.Model):
         return json.dumps({'message': 'Task revoked before running'})
 
 
+class InstructorSubtask(models.Model):
+    """
+    Stores the status of a subtask of an InstructorTask, with the values of
+    its SubtaskStatus.
+
+    The subtasks of InstructorTasks that were created while the
+    `instructor_task.subtask_status_rows` switch was enabled store their
+    status here rather than in the `subtasks` column of the InstructorTask,
+    so that subtasks don't all update the same row as they complete.
+    """
+    class Meta(object):
+        app_label = "instructor_task"
+        unique_together = ('instructor_task', 'task_id')
+
+    instructor_task = models.ForeignKey(InstructorTask)
+    task_id = models.CharField(max_length=255)
+    task_state = models.CharField(max_length=50, db_index=True)
+    attempted = models.IntegerField(default=0)
+    succeeded = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+    retried_nomax = models.IntegerField(default=0)
+    retried_withmax = models.IntegerField(default=0)
+
+    def __repr__(self):
+        return 'InstructorSubtask<%r>' % ({
+            'instructor_task_id': self.instructor_task_id,
+            'task_id': self.task_id,
+            'task_state': self.task_state,
+        },)
+
+    def __unicode__(self):
+        return unicode(repr(self))
+
+
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
@@ -268,12 +305,56 @@ class DjangoStorageReportStore(ReportStore):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+
+        `rows` may be a generator; rows are spooled to a temporary file
+        as they are produced, so the full report is never held in memory.
+        """
+        with TemporaryFile() as output_buffer:
+            csvwriter = csv.writer(output_buffer)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+            output_buffer.seek(0)
+            self.store(course_id, filename, File(output_buffer))
+
+    def store_concatenated(self, course_id, filename, header, part_filenames):
+        """
+        Store a csv file named `filename` made of the `header` row followed
+        by the contents of each of the already stored (headerless) csv files
+        in `part_filenames`, in order.  The parts are copied without being
+        re-parsed.
+        """
+        with TemporaryFile() as output_buffer:
+            csv.writer(output_buffer).writerows(self._get_utf8_encoded_rows([header]))
+            for part_filename in part_filenames:
+                with self.storage.open(self.path_to(course_id, part_filename)) as part_file:
+                    shutil.copyfileobj(part_file, output_buffer)
+            output_buffer.seek(0)
+            self.store(course_id, filename, File(output_buffer))
+
+    def read_rows(self, course_id, filename):
+        """
+        Return the rows of the csv file named `filename` for the given course,
+        as lists of unicode strings.
+        """
+        with self.storage.open(self.path_to(course_id, filename)) as csv_file:
+            return [[item.decode('utf-8') for item in row] for row in csv.reader(csv_file)]
+
+    def list_files(self, course_id, dirname):
+        """
+        Return the sorted names of the files stored under the `dirname`
+        subdirectory for the given course.  Subdirectories are not listed
+        by `links_for`, which makes them suitable for intermediate files.
+        """
+        try:
+            _, filenames = self.storage.listdir(self.path_to(course_id, dirname))
+        except OSError:
+            return []
+        return sorted(filenames)
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file named `filename` for the given course.
         """
-        output_buffer = ContentFile('')
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        self.storage.delete(self.path_to(course_id, filename))
 
     def links_for(self, course_id):
         """
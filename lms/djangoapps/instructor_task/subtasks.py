@@ -3,6 +3,7 @@ This module contains celery task functions for handling the management of subtas
 """
 import json
 import logging
+from collections import Counter
 from contextlib import contextmanager
 from time import time
 from uuid import uuid4
@@ -11,12 +12,14 @@ import psutil
 from celery.states import READY_STATES, RETRY, SUCCESS
 from django.core.cache import cache
 from django.db import DatabaseError, transaction
+from django.utils import timezone
 
 import dogstats_wrapper as dog_stats_api
+from openedx.core.djangoapps.waffle_utils import WaffleSwitch
 from util.db import outer_atomic
 
 from .exceptions import DuplicateTaskException
-from .models import PROGRESS, QUEUING, InstructorTask
+from .models import PROGRESS, QUEUING, InstructorSubtask, InstructorTask
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -26,6 +29,23 @@ SUBTASK_LOCK_EXPIRE = 60 * 10  # Lock expires in 10 minutes
 # (These are recursive retries, so don't make this number too large.)
 MAX_DATABASE_LOCK_RETRIES = 5
 
+# When enabled, the subtasks of new InstructorTasks store their status in
+# InstructorSubtask rows, so that they don't wait on the lock of the
+# InstructorTask row as they complete.  Their progress is then added up
+# when the status of the InstructorTask is requested.
+SUBTASK_STATUS_ROWS_SWITCH = WaffleSwitch(u'instructor_task', u'subtask_status_rows')
+
+# Key set in the "subtasks" dict of an InstructorTask whose subtasks store
+# their status in InstructorSubtask rows.
+STATUS_IN_ROWS = 'status_in_rows'
+
+# The counts of the items of the completed subtasks that are accumulated in
+# the task progress of their InstructorTask.
+TASK_PROGRESS_COUNTS = ('attempted', 'succeeded', 'failed', 'skipped')
+
+# The counts of a SubtaskStatus.
+SUBTASK_STATUS_COUNTS = TASK_PROGRESS_COUNTS + ('retried_nomax', 'retried_withmax')
+
 
 def _get_number_of_subtasks(total_num_items, items_per_task):
     """
@@ -230,7 +250,9 @@ def initialize_subtask_info(entry, action_name, total_num, subtask_id_list):
 
     The "subtasks" field also contains a 'status' key, that contains a dict that stores status
     information for each subtask.  The value for each subtask (keyed by its task_id)
-    is its subtask status, as defined by SubtaskStatus.to_dict().
+    is its subtask status, as defined by SubtaskStatus.to_dict().  If SUBTASK_STATUS_ROWS_SWITCH
+    is enabled, the status of each subtask is instead stored in an InstructorSubtask row, and
+    the "subtasks" field contains a STATUS_IN_ROWS key.
 
     This information needs to be set up in the InstructorTask before any of the subtasks start
     running.  If not, there is a chance that the subtasks could complete before the parent task
@@ -256,19 +278,32 @@ def initialize_subtask_info(entry, action_name, total_num, subtask_id_list):
 
     # Write out the subtasks information.
     num_subtasks = len(subtask_id_list)
-    # Note that may not be necessary to store initial value with all those zeroes!
-    # Write out as a dict, so it will go more smoothly into json.
-    subtask_status = {subtask_id: (SubtaskStatus.create(subtask_id)).to_dict() for subtask_id in subtask_id_list}
+    status_in_rows = SUBTASK_STATUS_ROWS_SWITCH.is_enabled()
     subtask_dict = {
         'total': num_subtasks,
         'succeeded': 0,
         'failed': 0,
-        'status': subtask_status
     }
+    if status_in_rows:
+        subtask_dict[STATUS_IN_ROWS] = True
+    else:
+        # Note that may not be necessary to store initial value with all those zeroes!
+        # Write out as a dict, so it will go more smoothly into json.
+        subtask_dict['status'] = {
+            subtask_id: (SubtaskStatus.create(subtask_id)).to_dict() for subtask_id in subtask_id_list
+        }
     entry.subtasks = json.dumps(subtask_dict)
 
     # and save the entry immediately, before any subtasks actually start work:
     entry.save_now()
+    if status_in_rows:
+        InstructorSubtask.objects.bulk_create(
+            [
+                InstructorSubtask(instructor_task=entry, task_id=subtask_id, task_state=QUEUING)
+                for subtask_id in subtask_id_list
+            ],
+            batch_size=1000,
+        )
     return task_progress
 
 
@@ -414,9 +449,8 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
         raise DuplicateTaskException(msg)
 
     # Confirm that the InstructorTask knows about this particular subtask.
-    subtask_dict = json.loads(entry.subtasks)
-    subtask_status_info = subtask_dict['status']
-    if current_task_id not in subtask_status_info:
+    subtask_status = _get_stored_subtask_status(entry, current_task_id)
+    if subtask_status is None:
         format_str = "Unexpected task_id '{}': unable to find status for subtask of instructor task '{}': rejecting task {}"
         msg = format_str.format(current_task_id, entry, new_subtask_status)
         TASK_LOG.warning(msg)
@@ -425,7 +459,6 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
 
     # Confirm that the InstructorTask doesn't think that this subtask has already been
     # performed successfully.
-    subtask_status = SubtaskStatus.from_dict(subtask_status_info[current_task_id])
     subtask_state = subtask_status.state
     if subtask_state in READY_STATES:
         format_str = "Unexpected task_id '{}': already completed - status {} for subtask of instructor task '{}': rejecting task {}"
@@ -459,20 +492,50 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
         raise DuplicateTaskException(msg)
 
 
-def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0):
+def _get_stored_subtask_status(entry, subtask_id):
+    """
+    Returns the SubtaskStatus stored for the subtask `subtask_id` of the InstructorTask `entry`,
+    or None if `entry` doesn't define that subtask.
+    """
+    subtask_dict = json.loads(entry.subtasks)
+    if subtask_dict.get(STATUS_IN_ROWS):
+        try:
+            subtask = InstructorSubtask.objects.get(instructor_task=entry, task_id=subtask_id)
+        except InstructorSubtask.DoesNotExist:
+            return None
+        counts = {statname: getattr(subtask, statname) for statname in SUBTASK_STATUS_COUNTS}
+        return SubtaskStatus.create(subtask_id, state=subtask.task_state, **counts)
+
+    subtask_status_info = subtask_dict['status'].get(subtask_id)
+    if subtask_status_info is None:
+        return None
+    return SubtaskStatus.from_dict(subtask_status_info)
+
+
+def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0, complete_task=True):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
-    Because select_for_update is used to lock the InstructorTask object while it is being updated,
-    multiple subtasks updating at the same time may time out while waiting for the lock.
+    If the subtasks of the InstructorTask store their status in InstructorSubtask rows, only the
+    row of this subtask is updated, and the InstructorTask is only updated by the last subtask
+    to complete.  Otherwise, because select_for_update is used to lock the InstructorTask object
+    while it is being updated, multiple subtasks updating at the same time may time out while
+    waiting for the lock.
     The actual update operation is surrounded by a try/except/else that permits the update to be
     retried if the transaction times out.
 
     The subtask lock acquired in the call to check_subtask_is_valid() is released here, only when
     the attempting of retries has concluded.
+
+    Returns the number of subtasks of the parent task that have not yet completed.  Exactly one
+    subtask observes a return value of zero, so it can be used to trigger any final processing.
+    Unless `complete_task` is True, the parent task is then left in progress, for that final
+    processing to mark it as having succeeded or failed.
     """
     try:
-        _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        if _update_subtask_status_row(entry_id, current_task_id, new_subtask_status):
+            return _get_num_remaining_subtasks(entry_id, complete_task)
+        return _update_subtask_status(entry_id, current_task_id, new_subtask_status, complete_task)
     except DatabaseError:
         # If we fail, try again recursively.
         retry_count += 1
@@ -480,7 +543,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
             TASK_LOG.info("Retrying to update status for subtask %s of instructor task %d with status %s:  retry %d",
                           current_task_id, entry_id, new_subtask_status, retry_count)
             dog_stats_api.increment('instructor_task.subtask.retry_after_failed_update')
-            update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count)
+            return update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count, complete_task)
         else:
             TASK_LOG.info("Failed to update status after %d retries for subtask %s of instructor task %d with status %s",
                           retry_count, current_task_id, entry_id, new_subtask_status)
@@ -493,8 +556,125 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
         _release_subtask_lock(current_task_id)
 
 
+def _update_subtask_status_row(entry_id, current_task_id, new_subtask_status):
+    """
+    Update the InstructorSubtask row of the subtask with `new_subtask_status`, unless the
+    subtask has already completed.
+
+    Returns whether a row was updated.  No row is updated when the InstructorTask stores
+    the status of its subtasks in its "subtasks" field.
+    """
+    counts = {statname: getattr(new_subtask_status, statname) for statname in SUBTASK_STATUS_COUNTS}
+    num_updated = InstructorSubtask.objects.filter(
+        instructor_task_id=entry_id,
+        task_id=current_task_id,
+    ).exclude(
+        task_state__in=READY_STATES,
+    ).update(task_state=new_subtask_status.state, **counts)
+    return num_updated > 0
+
+
+def _get_num_remaining_subtasks(entry_id, complete_task):
+    """
+    Returns the number of subtasks of the InstructorTask that remain to be completed, after
+    the InstructorSubtask row of one of its subtasks has been updated.
+
+    Once no subtasks remain, the InstructorTask is updated with the progress of its subtasks,
+    and if `complete_task`, marked as having succeeded.  Only the subtask that does so gets
+    zero as the number of remaining subtasks, even if other subtasks complete at the same time.
+    """
+    subtask_progress = _get_subtask_progress(entry_id)
+    num_remaining = subtask_progress['remaining']
+    if num_remaining > 0:
+        return num_remaining
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_dict = json.loads(entry.subtasks)
+    if subtask_dict['succeeded'] + subtask_dict['failed'] >= subtask_dict['total']:
+        # Another subtask has already updated the InstructorTask, and got zero as the
+        # number of remaining subtasks.  The task state isn't checked, since it is left
+        # in progress unless `complete_task`.
+        return 1
+    subtask_dict['succeeded'] = subtask_progress['subtasks_succeeded']
+    subtask_dict['failed'] = subtask_progress['subtasks_failed']
+    task_progress = _get_task_progress(entry, subtask_progress)
+    updated_fields = {
+        'task_output': InstructorTask.create_output_for_success(task_progress),
+        'subtasks': json.dumps(subtask_dict),
+        'updated': timezone.now(),
+    }
+    if complete_task:
+        updated_fields['task_state'] = SUCCESS
+    # The subtask counts of the "subtasks" field are only set here, so comparing the field
+    # makes sure that no other subtask has updated the InstructorTask since it was read.
+    num_updated = InstructorTask.objects.filter(
+        pk=entry_id,
+        task_state=PROGRESS,
+        subtasks=entry.subtasks,
+    ).update(**updated_fields)
+    if num_updated == 0:
+        # A subtask that completed at the same time has already updated the InstructorTask,
+        # and got zero as the number of remaining subtasks.
+        return 1
+    TASK_LOG.info("Task output updated to %s for last subtask of instructor task %d", task_progress, entry_id)
+    return 0
+
+
+def _get_subtask_progress(entry_id):
+    """
+    Returns a Counter of the TASK_PROGRESS_COUNTS of the completed InstructorSubtasks of the
+    InstructorTask, together with the number of its subtasks that 'remain', and of those that
+    have completed, as 'subtasks_succeeded' and 'subtasks_failed'.
+    """
+    subtask_progress = Counter()
+    subtasks = InstructorSubtask.objects.filter(
+        instructor_task_id=entry_id,
+    ).values_list('task_state', *TASK_PROGRESS_COUNTS)
+    for subtask in subtasks:
+        state = subtask[0]
+        if state == SUCCESS:
+            subtask_progress['subtasks_succeeded'] += 1
+        elif state in READY_STATES:
+            subtask_progress['subtasks_failed'] += 1
+        else:
+            subtask_progress['remaining'] += 1
+            continue
+        subtask_progress.update(dict(zip(TASK_PROGRESS_COUNTS, subtask[1:])))
+    return subtask_progress
+
+
+def _get_task_progress(entry, subtask_progress):
+    """
+    Returns the task progress of the InstructorTask `entry`, with the counts of `subtask_progress`
+    and the current duration.
+    """
+    task_progress = json.loads(entry.task_output)
+    for statname in TASK_PROGRESS_COUNTS:
+        task_progress[statname] = subtask_progress[statname]
+    # Clock skew between machines may result in non-monotonic values for duration.
+    new_duration = int((time() - task_progress['start_time']) * 1000)
+    task_progress['duration_ms'] = max(task_progress['duration_ms'], new_duration)
+    return task_progress
+
+
+def update_task_output_from_subtasks(entry):
+    """
+    Update the "task_output" of the running InstructorTask `entry` with the progress of its
+    subtasks, if they store their status in InstructorSubtask rows.
+
+    The `entry` is updated in-place, but is not saved: its "task_output" is only saved by the
+    last subtask to complete.
+    """
+    if entry.task_state != PROGRESS or not entry.subtasks or not entry.task_output:
+        return
+    if not json.loads(entry.subtasks).get(STATUS_IN_ROWS):
+        return
+    task_progress = _get_task_progress(entry, _get_subtask_progress(entry.id))
+    entry.task_output = InstructorTask.create_output_for_success(task_progress)
+
+
 @transaction.atomic
-def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
+def _update_subtask_status(entry_id, current_task_id, new_subtask_status, complete_task=True):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
@@ -513,13 +693,15 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     Keys include 'total', 'succeeded', 'retried', 'failed', which are counters for the number of
     subtasks.  'Total' is expected to have been set at the time the subtasks were created.
     The other three counters are incremented depending on the value of `status`.  Once the counters
-    for 'succeeded' and 'failed' match the 'total', the subtasks are done and the InstructorTask's
-    "status" is changed to SUCCESS.
+    for 'succeeded' and 'failed' match the 'total', the subtasks are done and, if `complete_task`,
+    the InstructorTask's "status" is changed to SUCCESS.
 
     The "subtasks" field also contains a 'status' key, that contains a dict that stores status
     information for each subtask.  At the moment, the value for each subtask (keyed by its task_id)
     is the value of the SubtaskStatus.to_dict(), but could be expanded in future to store information
     about failure messages, progress made, etc.
+
+    Returns the number of subtasks that remain to be completed.
     """
     TASK_LOG.info("Preparing to update status for subtask %s for instructor task %d with status %s",
                   current_task_id, entry_id, new_subtask_status)
@@ -527,7 +709,16 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     try:
         entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
         subtask_dict = json.loads(entry.subtasks)
-        subtask_status_info = subtask_dict['status']
+        if subtask_dict.get(STATUS_IN_ROWS):
+            # The row of the subtask was not updated, because the subtask is unknown, or has
+            # already completed (e.g. when retrying after a database error).
+            subtask_exists = InstructorSubtask.objects.filter(
+                instructor_task_id=entry_id,
+                task_id=current_task_id,
+            ).exists()
+            if subtask_exists:
+                return _get_num_remaining_subtasks(entry_id, complete_task)
+        subtask_status_info = subtask_dict.get('status', {})
         if current_task_id not in subtask_status_info:
             # unexpected error -- raise an exception
             format_str = "Unexpected task_id '{}': unable to update status for subtask of instructor task '{}'"
@@ -554,7 +745,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         # retry.
         new_state = new_subtask_status.state
         if new_subtask_status is not None and new_state in READY_STATES:
-            for statname in ['attempted', 'succeeded', 'failed', 'skipped']:
+            for statname in TASK_PROGRESS_COUNTS:
                 task_progress[statname] += getattr(new_subtask_status, statname)
 
         # Figure out if we're actually done (i.e. this is the last task to complete).
@@ -570,7 +761,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         # At present, we mark the task as having succeeded.  In future, we should see
         # if there was a catastrophic failure that occurred, and figure out how to
         # report that here.
-        if num_remaining <= 0:
+        if num_remaining <= 0 and complete_task:
             entry.task_state = SUCCESS
         entry.subtasks = json.dumps(subtask_dict)
         entry.task_output = InstructorTask.create_output_for_success(task_progress)
@@ -579,6 +770,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         entry.save()
         TASK_LOG.info("Task output updated to %s for subtask %s of instructor task %d",
                       entry.task_output, current_task_id, entry_id)
+        return num_remaining
     except Exception:
         TASK_LOG.exception("Unexpected error while updating InstructorTask.")
         dog_stats_api.increment('instructor_task.subtask.update_exception')
@@ -19,14 +19,21 @@ a problem URL and optionally a student.  These are used to set up the initial va
 of the query for traversing StudentModule objects.
 
 """
+import json
 import logging
+import traceback
 from functools import partial
+from time import time
 
 from celery import task
+from celery.states import FAILURE, READY_STATES, SUCCESS
 from django.conf import settings
 from django.utils.translation import ugettext_noop
 
 from bulk_email.tasks import perform_delegate_email_batches
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
+from lms.djangoapps.instructor_task.models import InstructorTask
+from lms.djangoapps.instructor_task.subtasks import SubtaskStatus, check_subtask_is_valid, update_subtask_status
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
@@ -183,10 +190,93 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
         xmodule_instance_args.get('task_id'), entry_id, action_name
     )
 
-    task_fn = partial(CourseGradeReport.generate, xmodule_instance_args)
+    if GradeReportSetting.current().enabled:
+        task_fn = partial(CourseGradeReport.queue_shards, calculate_grades_csv_shard, xmodule_instance_args)
+    else:
+        task_fn = partial(CourseGradeReport.generate, xmodule_instance_args)
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def calculate_grades_csv_shard(
+        entry_id, xmodule_instance_args, action_name, user_ids, report_time, subtask_status_dict,
+):
+    """
+    Grade one shard of the users enrolled in a course for a parallel grade
+    report, storing the resulting rows in partial CSV files.  If the shard
+    can't be graded, error rows are stored for all of its users instead.
+
+    The last shard to complete queues the merge of the partial files into the
+    report, which then marks the InstructorTask as having succeeded or failed.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    shard_error = None
+    try:
+        task_progress = CourseGradeReport.generate_shard(xmodule_instance_args, entry_id, action_name, user_ids)
+    except Exception as exc:  # pylint: disable=broad-except
+        TASK_LOG.exception(
+            u"Task: %s, InstructorTask ID: %s, Failed to grade shard of %d users",
+            current_task_id, entry_id, len(user_ids)
+        )
+        try:
+            CourseGradeReport.store_failed_shard(entry_id, user_ids, exc)
+        except Exception as store_exc:  # pylint: disable=broad-except
+            # The merge fails the InstructorTask, rather than leave these users out of the report.
+            TASK_LOG.exception(
+                u"Task: %s, InstructorTask ID: %s, Failed to store error rows of shard of %d users",
+                current_task_id, entry_id, len(user_ids)
+            )
+            shard_error = store_exc
+            subtask_status.increment(failed=len(user_ids), state=FAILURE)
+        else:
+            subtask_status.increment(failed=len(user_ids), state=SUCCESS)
+    else:
+        subtask_status.increment(
+            succeeded=task_progress['succeeded'],
+            failed=task_progress['failed'],
+            state=SUCCESS,
+        )
+
+    num_remaining = update_subtask_status(entry_id, current_task_id, subtask_status, complete_task=False)
+    if num_remaining == 0:
+        merge_grades_csv_shards.delay(entry_id, xmodule_instance_args, action_name, report_time)
+    if shard_error is not None:
+        raise shard_error
+    return subtask_status.to_dict()
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def merge_grades_csv_shards(entry_id, xmodule_instance_args, action_name, report_time):
+    """
+    Concatenate the partial CSV files of a parallel grade report, push the
+    resulting report to an S3 bucket for download, and only then mark the
+    InstructorTask as having succeeded.  The InstructorTask is marked as
+    having failed if the report can't be merged.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    if entry.task_state in READY_STATES:
+        TASK_LOG.warning(u"InstructorTask ID: %s, Grade report shards have already been merged", entry_id)
+        return
+
+    try:
+        CourseGradeReport.merge_shards(xmodule_instance_args, entry_id, action_name, report_time)
+    except Exception as exc:
+        TASK_LOG.exception(u"InstructorTask ID: %s, Failed to merge grade report shards", entry_id)
+        entry.task_output = InstructorTask.create_output_for_failure(exc, traceback.format_exc())
+        entry.task_state = FAILURE
+        entry.save_now()
+        raise
+
+    task_progress = json.loads(entry.task_output)
+    task_progress['duration_ms'] = max(task_progress['duration_ms'], int((time() - task_progress['start_time']) * 1000))
+    entry.task_output = InstructorTask.create_output_for_success(task_progress)
+    entry.task_state = SUCCESS
+    entry.save_now()
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     """
@@ -1,13 +1,16 @@
 """
 Functionality for generating grade reports.
 """
+import json
 import logging
+import os.path
 import re
 from collections import OrderedDict
 from datetime import datetime
-from itertools import chain, izip, izip_longest
+from itertools import chain, izip_longest
 from time import time
 
+from django.contrib.auth.models import User
 from lazy import lazy
 from pytz import UTC
 from six import text_type
@@ -19,6 +22,10 @@ from lms.djangoapps.certificates.models import CertificateWhitelist, GeneratedCe
 from lms.djangoapps.grades.context import grading_context, grading_context_for_course
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.instructor_task.config.models import GradeReportSetting
+from lms.djangoapps.instructor_task.exceptions import GradeReportShardError
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_query
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -31,7 +38,7 @@ from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import upload_csv_parts_to_report_store, upload_csv_to_report_store
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -55,6 +62,26 @@ def _flatten(iterable):
     return list(chain.from_iterable(iterable))
 
 
+def _shard_dirname(entry_id):
+    """
+    Returns the name of the report store subdirectory holding the partial
+    csv files of a sharded grade report.
+    """
+    return u'grade_report_shards_{}'.format(entry_id)
+
+
+def _shard_filename(entry_id, rows_type, first_user_id):
+    """
+    Returns the name of a partial csv file of a sharded grade report.  Shards
+    are named after the first user they contain so that sorting the names
+    restores the order of the enrollment query.
+    """
+    return os.path.join(
+        _shard_dirname(entry_id),
+        u'{rows_type}_{first_user_id:012d}.csv'.format(rows_type=rows_type, first_user_id=first_user_id),
+    )
+
+
 class _CourseGradeReportContext(object):
     """
     Internal class that provides a common context to use for a single grade
@@ -202,6 +229,162 @@ class CourseGradeReport(object):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
             return CourseGradeReport()._generate(context)
 
+    @classmethod
+    def queue_shards(cls, shard_task, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+        """
+        Public method to generate a grade report in parallel.
+
+        The enrolled users are split into shards of `GradeReportSetting.batch_size`
+        users, each of which is graded by a `shard_task` subtask that stores its
+        header and rows in partial csv files.  The last shard to complete queues
+        the merge of the partial files into the final report (see `merge_shards`),
+        which completes the task.
+        """
+        entry = InstructorTask.objects.get(pk=_entry_id)
+        # Shards may already have been queued if this task was requeued by Celery.
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            TASK_LOG.warning(u'Task %s has already queued grade report shards for course %s', entry.task_id, course_id)
+            return json.loads(entry.task_output)
+
+        users = CourseEnrollment.objects.users_enrolled_in(course_id, include_inactive=True).order_by('id')
+        total_num_users = users.count()
+        if total_num_users == 0:
+            return cls.generate(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
+
+        report_time = time()
+
+        def _create_shard_subtask(user_list, initial_subtask_status):
+            """Creates a subtask to grade the given users."""
+            return shard_task.subtask(
+                (
+                    _entry_id,
+                    _xmodule_instance_args,
+                    action_name,
+                    [user['pk'] for user in user_list],
+                    report_time,
+                    initial_subtask_status.to_dict(),
+                ),
+                task_id=initial_subtask_status.task_id,
+            )
+
+        return queue_subtasks_for_query(
+            entry,
+            action_name,
+            _create_shard_subtask,
+            [users],
+            [],
+            GradeReportSetting.current().batch_size,
+            total_num_users,
+        )
+
+    @classmethod
+    def generate_shard(cls, _xmodule_instance_args, _entry_id, action_name, user_ids):
+        """
+        Public method to grade a single shard of a parallel grade report.
+
+        The success and error rows of the given users are stored as headerless
+        partial csv files, which are written as each batch of users is graded,
+        and the header of the success rows is stored in a partial csv file of
+        its own.  Returns the progress dict of the shard.
+        """
+        entry = InstructorTask.objects.get(pk=_entry_id)
+        course_id = entry.course_id
+        with modulestore().bulk_operations(course_id):
+            context = _CourseGradeReportContext(
+                _xmodule_instance_args, _entry_id, course_id, json.loads(entry.task_input), action_name,
+            )
+            context.task_progress.total = len(user_ids)
+            context.update_status(u'Starting grades shard')
+            report = CourseGradeReport()
+            users = User.objects.filter(id__in=user_ids).order_by('id')
+            error_rows = []
+            success_rows = report._success_rows(context, report._batch_users(context, users), error_rows)
+
+            report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+            report_store.store_rows(
+                course_id, _shard_filename(_entry_id, 'header', user_ids[0]), [report._success_headers(context)],
+            )
+            report_store.store_rows(course_id, _shard_filename(_entry_id, 'success', user_ids[0]), success_rows)
+            if len(error_rows) > 0:
+                report_store.store_rows(course_id, _shard_filename(_entry_id, 'error', user_ids[0]), error_rows)
+
+            return context.update_status(u'Completed grades shard')
+
+    @classmethod
+    def store_failed_shard(cls, _entry_id, user_ids, error):
+        """
+        Public method to store error rows for all the users of a shard of a
+        parallel grade report that could not be graded, so that they appear
+        in the report's errors.
+        """
+        entry = InstructorTask.objects.get(pk=_entry_id)
+        users = User.objects.filter(id__in=user_ids).order_by('id')
+        error_rows = ([user.id, user.username, text_type(error)] for user in users)
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        report_store.store_rows(entry.course_id, _shard_filename(_entry_id, 'error', user_ids[0]), error_rows)
+
+    @classmethod
+    def merge_shards(cls, _xmodule_instance_args, _entry_id, action_name, report_time):
+        """
+        Public method to concatenate the partial csv files of a parallel grade
+        report into the final report, and then remove the partial files.
+
+        The header of the report is the one stored by the shards.  Raises a
+        GradeReportShardError if a shard failed without storing error rows for
+        its users, or if the shards stored different headers, since the
+        columns of their rows would then not line up.
+        """
+        entry = InstructorTask.objects.get(pk=_entry_id)
+        course_id = entry.course_id
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        dirname = _shard_dirname(_entry_id)
+        part_filenames = [
+            os.path.join(dirname, filename) for filename in report_store.list_files(course_id, dirname)
+        ]
+        try:
+            num_failed_shards = json.loads(entry.subtasks)['failed']
+            if num_failed_shards > 0:
+                raise GradeReportShardError(
+                    u'{} grade report shards failed to store their rows'.format(num_failed_shards)
+                )
+
+            parts_by_type = {'header': [], 'success': [], 'error': []}
+            for part_filename in part_filenames:
+                rows_type = os.path.basename(part_filename).split('_', 1)[0]
+                parts_by_type[rows_type].append(part_filename)
+
+            headers = [report_store.read_rows(course_id, name)[0] for name in parts_by_type['header']]
+            if any(header != headers[0] for header in headers):
+                raise GradeReportShardError(u'Grade report shards stored different headers')
+
+            with modulestore().bulk_operations(course_id):
+                context = _CourseGradeReportContext(
+                    _xmodule_instance_args, _entry_id, course_id, json.loads(entry.task_input), action_name,
+                )
+                report = CourseGradeReport()
+                if headers:
+                    success_headers = headers[0]
+                else:
+                    # No shard graded any users, so there are no rows to line up with.
+                    success_headers = report._success_headers(context)
+
+                date = datetime.fromtimestamp(report_time, UTC)
+                upload_csv_parts_to_report_store(
+                    success_headers, parts_by_type['success'], 'grade_report', course_id, date,
+                )
+                if len(parts_by_type['error']) > 0:
+                    upload_csv_parts_to_report_store(
+                        report._error_headers(), parts_by_type['error'], 'grade_report_err', course_id, date,
+                    )
+        finally:
+            for part_filename in part_filenames:
+                report_store.delete(course_id, part_filename)
+
+        TASK_LOG.info(
+            u'%s, Task type: %s, Merged %d grade report shards', context.task_info_string, action_name,
+            len(parts_by_type['success']),
+        )
+
     def _generate(self, context):
         """
         Internal method for generating a grade report for the given context.
@@ -209,12 +392,10 @@ class CourseGradeReport(object):
         context.update_status(u'Starting grades')
         success_headers = self._success_headers(context)
         error_headers = self._error_headers()
-        batched_rows = self._batched_rows(context)
-
-        context.update_status(u'Compiling grades')
-        success_rows, error_rows = self._compile(context, batched_rows)
+        error_rows = []
+        success_rows = self._success_rows(context, self._batch_users(context), error_rows)
 
-        context.update_status(u'Uploading grades')
+        context.update_status(u'Compiling and uploading grades')
         self._upload(context, success_headers, success_rows, error_headers, error_rows)
 
         return context.update_status(u'Completed grades')
@@ -240,37 +421,37 @@ class CourseGradeReport(object):
         """
         return ["Student ID", "Username", "Error"]
 
-    def _batched_rows(self, context):
+    def _success_rows(self, context, batched_users, error_rows):
         """
-        A generator of batches of (success_rows, error_rows) for this report.
+        A generator of the success rows for this report, grading one batch of
+        users at a time so that only a single batch is held in memory.  Error
+        rows are appended to `error_rows`, and the task progress is updated as
+        each batch completes.
         """
-        for users in self._batch_users(context):
+        task_progress = context.task_progress
+        for users in batched_users:
             users = filter(lambda u: u is not None, users)
-            yield self._rows_for_users(context, users)
+            success_rows, batch_error_rows = self._rows_for_users(context, users)
+            error_rows.extend(batch_error_rows)
 
-    def _compile(self, context, batched_rows):
-        """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
-        """
-        # partition and chain successes and errors
-        success_rows, error_rows = izip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
+            # update metrics on task status
+            task_progress.succeeded += len(success_rows)
+            task_progress.failed += len(batch_error_rows)
+            task_progress.attempted = task_progress.succeeded + task_progress.failed
+            task_progress.update_task_state(extra_meta={'step': u'Compiling grades'})
+
+            for row in success_rows:
+                yield row
 
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
-        context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
-        context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
+        if task_progress.total is None:
+            task_progress.total = task_progress.attempted
 
     def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
         """
         Creates and uploads a CSV for the given headers and rows.
         """
         date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
+        upload_csv_to_report_store(chain([success_headers], success_rows), 'grade_report', context.course_id, date)
         if len(error_rows) > 0:
             error_rows = [error_headers] + error_rows
             upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
@@ -287,15 +468,17 @@ class CourseGradeReport(object):
             grades_header.append(assignment_info['average_header'])
         return grades_header
 
-    def _batch_users(self, context):
+    def _batch_users(self, context, users=None):
         """
-        Returns a generator of batches of users.
+        Returns a generator of batches of users, drawn from the given `users`
+        queryset or, by default, from all users enrolled in the course.
         """
         def grouper(iterable, chunk_size=self.USER_BATCH_SIZE, fillvalue=None):
             args = [iter(iterable)] * chunk_size
             return izip_longest(*args, fillvalue=fillvalue)
 
-        users = CourseEnrollment.objects.users_enrolled_in(context.course_id, include_inactive=True)
+        if users is None:
+            users = CourseEnrollment.objects.users_enrolled_in(context.course_id, include_inactive=True)
         users = users.select_related('profile')
         return grouper(users)
 
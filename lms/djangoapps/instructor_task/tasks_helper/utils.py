@@ -30,16 +30,40 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
     report_store = ReportStore.from_config(config_name)
     report_store.store_rows(
         course_id,
-        u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-            course_prefix=course_filename_prefix_generator(course_id),
-            csv_name=csv_name,
-            timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-        ),
+        _report_filename(csv_name, course_id, timestamp),
         rows
     )
     tracker_emit(csv_name)
 
 
+def upload_csv_parts_to_report_store(header, part_filenames, csv_name, course_id, timestamp,
+                                     config_name='GRADES_DOWNLOAD'):
+    """
+    Upload a CSV using ReportStore, made of the `header` row followed by the
+    contents of the headerless CSV files `part_filenames` already stored for
+    the course in the same ReportStore.
+    """
+    report_store = ReportStore.from_config(config_name)
+    report_store.store_concatenated(
+        course_id,
+        _report_filename(csv_name, course_id, timestamp),
+        header,
+        part_filenames,
+    )
+    tracker_emit(csv_name)
+
+
+def _report_filename(csv_name, course_id, timestamp):
+    """
+    Returns the name of the CSV report `csv_name` generated at `timestamp`.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def tracker_emit(report_name):
     """
     Emits a 'report.requested' event for the given report.
@@ -1,11 +1,26 @@
 """
 Unit tests for instructor_task subtasks.
 """
+import json
 from uuid import uuid4
 
+from celery.states import FAILURE, RETRY, SUCCESS
+from django.test import TestCase
 from mock import Mock, patch
-
-from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_query
+from waffle.testutils import override_switch
+
+from lms.djangoapps.instructor_task.exceptions import DuplicateTaskException
+from lms.djangoapps.instructor_task.models import PROGRESS, InstructorSubtask, InstructorTask
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    _get_num_remaining_subtasks,
+    _update_subtask_status_row,
+    check_subtask_is_valid,
+    initialize_subtask_info,
+    queue_subtasks_for_query,
+    update_subtask_status,
+    update_task_output_from_subtasks
+)
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskCourseTestCase
 from student.models import CourseEnrollment
@@ -79,3 +94,114 @@ class TestSubtasks(InstructorTaskCourseTestCase):
         self.assertEqual(len(mock_create_subtask_fcn_args[0][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[1][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[2][0][0]), 5)
+
+
+@override_switch('instructor_task.subtask_status_rows', True)
+class TestSubtaskStatusRows(TestCase):
+    """Tests for subtasks that store their status in InstructorSubtask rows."""
+
+    def setUp(self):
+        super(TestSubtaskStatusRows, self).setUp()
+        self.entry = InstructorTaskFactory.create(
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='bulk_course_email',
+        )
+        self.subtask_ids = [str(uuid4()) for _ in range(3)]
+        initialize_subtask_info(self.entry, 'emailed', 30, self.subtask_ids)
+
+    def _complete_subtask(self, subtask_id, succeeded, state=SUCCESS):
+        """Update the status of a subtask that has completed, and return the number of remaining subtasks."""
+        subtask_status = SubtaskStatus.create(subtask_id)
+        check_subtask_is_valid(self.entry.id, subtask_id, subtask_status)
+        subtask_status.increment(succeeded=succeeded, failed=10 - succeeded, state=state)
+        return update_subtask_status(self.entry.id, subtask_id, subtask_status)
+
+    def _get_task_progress(self):
+        """Return the task progress of the InstructorTask, as shown when its status is requested."""
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        update_task_output_from_subtasks(entry)
+        return json.loads(entry.task_output)
+
+    def test_initialize(self):
+        self.assertEqual(InstructorSubtask.objects.filter(instructor_task=self.entry).count(), 3)
+        self.assertNotIn('status', json.loads(self.entry.subtasks))
+
+    def test_update_subtask_status(self):
+        self.assertEqual(self._complete_subtask(self.subtask_ids[0], 10), 2)
+        self.assertEqual(self._complete_subtask(self.subtask_ids[1], 7, state=FAILURE), 1)
+
+        task_progress = self._get_task_progress()
+        self.assertEqual(task_progress['attempted'], 20)
+        self.assertEqual(task_progress['succeeded'], 17)
+        self.assertEqual(task_progress['failed'], 3)
+        self.assertEqual(InstructorTask.objects.get(pk=self.entry.id).task_state, PROGRESS)
+
+        self.assertEqual(self._complete_subtask(self.subtask_ids[2], 10), 0)
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.task_output)['succeeded'], 27)
+        subtask_dict = json.loads(entry.subtasks)
+        self.assertEqual(subtask_dict['succeeded'], 2)
+        self.assertEqual(subtask_dict['failed'], 1)
+
+    def test_retried_subtask(self):
+        subtask_status = SubtaskStatus.create(self.subtask_ids[0])
+        check_subtask_is_valid(self.entry.id, self.subtask_ids[0], subtask_status)
+        subtask_status.increment(succeeded=5, retried_nomax=1, state=RETRY)
+        self.assertEqual(update_subtask_status(self.entry.id, self.subtask_ids[0], subtask_status), 3)
+        self.assertEqual(self._get_task_progress()['attempted'], 0)
+
+        # An earlier version of the retried subtask is rejected.
+        with self.assertRaises(DuplicateTaskException):
+            check_subtask_is_valid(self.entry.id, self.subtask_ids[0], SubtaskStatus.create(self.subtask_ids[0]))
+
+    def test_completed_subtask(self):
+        self._complete_subtask(self.subtask_ids[0], 10)
+        with self.assertRaises(DuplicateTaskException):
+            check_subtask_is_valid(self.entry.id, self.subtask_ids[0], SubtaskStatus.create(self.subtask_ids[0]))
+
+    def test_last_subtask_completes_task_once(self):
+        for subtask_id in self.subtask_ids:
+            self._complete_subtask(subtask_id, 10)
+        # Updating a completed subtask again neither counts it twice nor completes the task again.
+        subtask_status = SubtaskStatus.create(self.subtask_ids[2], succeeded=10, state=SUCCESS)
+        self.assertEqual(update_subtask_status(self.entry.id, self.subtask_ids[2], subtask_status), 1)
+        self.assertEqual(json.loads(InstructorTask.objects.get(pk=self.entry.id).task_output)['succeeded'], 30)
+
+    def test_leave_task_in_progress(self):
+        for subtask_id in self.subtask_ids:
+            subtask_status = SubtaskStatus.create(subtask_id, succeeded=10, state=SUCCESS)
+            num_remaining = update_subtask_status(self.entry.id, subtask_id, subtask_status, complete_task=False)
+        self.assertEqual(num_remaining, 0)
+
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, PROGRESS)
+        self.assertEqual(json.loads(entry.task_output)['succeeded'], 30)
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], 3)
+
+        # The InstructorTask is only updated by one subtask.
+        subtask_status = SubtaskStatus.create(self.subtask_ids[0], succeeded=10, state=SUCCESS)
+        self.assertEqual(
+            update_subtask_status(self.entry.id, self.subtask_ids[0], subtask_status, complete_task=False), 1
+        )
+
+    def test_subtasks_completing_together(self):
+        # Each subtask updates its row, and only then counts the remaining subtasks.
+        for subtask_id in self.subtask_ids:
+            subtask_status = SubtaskStatus.create(subtask_id, succeeded=10, state=SUCCESS)
+            _update_subtask_status_row(self.entry.id, subtask_id, subtask_status)
+        self.assertEqual(
+            [_get_num_remaining_subtasks(self.entry.id, complete_task=False) for _ in self.subtask_ids],
+            [0, 1, 1]
+        )
+        entry = InstructorTask.objects.get(pk=self.entry.id)
+        self.assertEqual(entry.task_state, PROGRESS)
+        self.assertEqual(json.loads(entry.subtasks)['succeeded'], 3)
+
+    def test_unknown_subtask(self):
+        subtask_id = str(uuid4())
+        with self.assertRaises(DuplicateTaskException):
+            check_subtask_is_valid(self.entry.id, subtask_id, SubtaskStatus.create(subtask_id))
+        with self.assertRaises(ValueError):
+            update_subtask_status(self.entry.id, subtask_id, SubtaskStatus.create(subtask_id, state=SUCCESS))
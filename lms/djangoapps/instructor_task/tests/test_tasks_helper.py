@@ -8,14 +8,17 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 import tempfile
 import urllib
 from datetime import datetime
+from time import time
 
 import ddt
 import unicodecsv
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
@@ -35,6 +38,8 @@ from courseware.tests.factories import InstructorFactory
 from instructor_analytics.basic import UNAVAILABLE
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
+from lms.djangoapps.instructor_task.exceptions import GradeReportShardError
+from lms.djangoapps.instructor_task.tasks import merge_grades_csv_shards
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_enrollment_report,
@@ -54,6 +59,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_course_survey_report,
     upload_ora2_data
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -84,7 +90,7 @@ from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, check_mongo_calls
 from xmodule.partitions.partitions import Group, UserPartition
 
-from ..models import ReportStore
+from ..models import PROGRESS, InstructorTask, ReportStore
 from ..tasks_helper.utils import UPDATE_STATUS_FAILED, UPDATE_STATUS_SUCCEEDED
 
 
@@ -151,6 +157,115 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
         self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
 
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_report(self, _mock_current_task):
+        """
+        Test that a grade report graded in shards is merged into a single
+        report containing every user in enrollment order.
+        """
+        users = [self.create_student('student{}'.format(index)) for index in range(3)]
+        entry = self._create_sharded_task()
+
+        for shard in ([users[0].id, users[1].id], [users[2].id]):
+            result = CourseGradeReport.generate_shard(None, entry.id, 'graded', shard)
+            self.assertDictContainsSubset({'attempted': len(shard), 'succeeded': len(shard), 'failed': 0}, result)
+        CourseGradeReport.merge_shards(None, entry.id, 'graded', time())
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        self.assertEqual(report_store.list_files(self.course.id, 'grade_report_shards_{}'.format(entry.id)), [])
+        self.verify_rows_in_csv(
+            [{'Username': user.username} for user in users],
+            ignore_other_columns=True,
+        )
+
+    def _create_sharded_task(self, num_failed_shards=0):
+        """
+        Create the InstructorTask of a parallel grade report whose shards have completed.
+        """
+        return InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_type='grade_course',
+            task_state=PROGRESS,
+            task_output=json.dumps({'action_name': 'graded', 'start_time': time(), 'duration_ms': 0}),
+            subtasks=json.dumps({'total': 2, 'succeeded': 2 - num_failed_shards, 'failed': num_failed_shards}),
+        )
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_report_with_ungraded_shard(self, _mock_current_task):
+        """
+        Test that the users of a shard that could not be graded are in the
+        errors of a grade report graded in shards.
+        """
+        users = [self.create_student('student{}'.format(index)) for index in range(3)]
+        entry = self._create_sharded_task()
+
+        CourseGradeReport.generate_shard(None, entry.id, 'graded', [users[0].id])
+        CourseGradeReport.store_failed_shard(entry.id, [users[1].id, users[2].id], ValueError('Shard failed'))
+        CourseGradeReport.merge_shards(None, entry.id, 'graded', time())
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 2)
+        self.verify_rows_in_csv(
+            [{'Username': user.username, 'Error': 'Shard failed'} for user in users[1:]],
+            file_index=[index for index, (name, _) in enumerate(links) if 'grade_report_err' in name][0],
+            ignore_other_columns=True,
+        )
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_report_with_different_headers(self, _mock_current_task):
+        """
+        Test that shards that stored different headers are not merged.
+        """
+        users = [self.create_student('student{}'.format(index)) for index in range(2)]
+        entry = self._create_sharded_task()
+
+        CourseGradeReport.generate_shard(None, entry.id, 'graded', [users[0].id])
+        CourseGradeReport.generate_shard(None, entry.id, 'graded', [users[1].id])
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        report_store.store_rows(
+            self.course.id,
+            'grade_report_shards_{}/header_{:012d}.csv'.format(entry.id, users[1].id),
+            [['Student ID', 'Email', 'Username', 'Grade', 'Homework 1']],
+        )
+        with self.assertRaises(GradeReportShardError):
+            CourseGradeReport.merge_shards(None, entry.id, 'graded', time())
+
+        self.assertEqual(report_store.links_for(self.course.id), [])
+        self.assertEqual(report_store.list_files(self.course.id, 'grade_report_shards_{}'.format(entry.id)), [])
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_merge_task_completes_task(self, _mock_current_task):
+        """
+        Test that the InstructorTask of a parallel grade report only succeeds once its report is stored.
+        """
+        user = self.create_student('student')
+        entry = self._create_sharded_task()
+        CourseGradeReport.generate_shard(None, entry.id, 'graded', [user.id])
+        self.assertEqual(InstructorTask.objects.get(pk=entry.id).task_state, PROGRESS)
+
+        merge_grades_csv_shards(entry.id, None, 'graded', time())
+
+        self.assertEqual(InstructorTask.objects.get(pk=entry.id).task_state, SUCCESS)
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+
+    def test_merge_task_fails_task(self):
+        """
+        Test that the InstructorTask of a parallel grade report fails if a shard failed to store its rows.
+        """
+        entry = self._create_sharded_task(num_failed_shards=1)
+
+        with self.assertRaises(GradeReportShardError):
+            merge_grades_csv_shards(entry.id, None, 'graded', time())
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['exception'], 'GradeReportShardError')
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(report_store.links_for(self.course.id), [])
+
     def test_cohort_data_in_grading(self):
         """
         Test that cohort data is included in grades csv if cohort configuration is enabled for course.
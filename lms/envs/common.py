@@ -62,6 +62,12 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# Number of kept-alive connections to the comments service in each process,
+# or 0 to open a new connection for each request, and the number of times to
+# retry failed connection attempts.
+COMMENTS_SERVICE_POOL_SIZE = 0
+COMMENTS_SERVICE_MAX_RETRIES = 0
+
 LMS_ROOT_URL = "http://localhost:8000"
 LMS_INTERNAL_ROOT_URL = LMS_ROOT_URL
 LMS_ENROLLMENT_API_PATH = "/api/enrollment/v1/"
@@ -866,6 +872,23 @@ XBLOCK_FIELD_DATA_WRAPPERS = ()
 
 MODULESTORE_BRANCH = 'published-only'
 CONTENTSTORE = None
+
+# Local tiers of the course asset cache used by the contentserver.  Small assets can be kept
+# in each process for TIMEOUT seconds, and the data of assets too large for the
+# "course_assets" cache can be kept in files in DIRECTORY.  Both are turned off by default.
+COURSE_ASSETS_LOCAL_CACHE = {
+    'MAX_SIZE': 0,
+    'MAX_ITEM_SIZE': 32 * 1024,
+    'TIMEOUT': 60,
+}
+COURSE_ASSETS_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_SIZE': 1024 * 1024 * 1024,
+}
+
+# Size in bytes (of their pickles) of the decoded course structures that each process keeps
+# in memory, in front of the "course_structure_cache" cache.  0 turns this off.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_SIZE = 0
 DOC_STORE_CONFIG = {
     'host': 'localhost',
     'db': 'xmodule',
@@ -918,6 +941,16 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pool of pre-started sandboxed Python interpreters used by capa's safe_exec.
+    'worker_pool': {
+        # How many interpreters to run at most?  0 means don't use a pool.
+        'size': 0,
+        # How many jobs can an interpreter run before it is replaced?
+        'max_jobs': 100,
+        # How many seconds can a job take before its interpreter is killed?
+        'timeout': 10,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -1321,6 +1354,7 @@ MIDDLEWARE_CLASSES = [
 
     'django_comment_client.utils.ViewNameMiddleware',
     'codejail.django_integration.ConfigureCodeJailMiddleware',
+    'util.sandboxing.ConfigureSandboxWorkerPoolMiddleware',
 
     # catches any uncaught RateLimitExceptions and returns a 403 instead of a 500
     'ratelimitbackend.middleware.RateLimitMiddleware',
@@ -1982,6 +2016,17 @@ BLOCK_STRUCTURES_SETTINGS = dict(
     # Maximum number of retries per task.
     TASK_MAX_RETRIES=5,
 
+    # Maximum size, in bytes, of the collected block structures held in
+    # the process-local cache of each worker.  Only used when the
+    # block_structure.local_cache waffle switch is enabled.
+    LOCAL_CACHE_MAX_SIZE=64 * 1024 * 1024,
+
+    # Maximum size, in bytes, of the block structures, filtered for a
+    # user's access, held in the process-local cache of each worker.
+    # Only used when the block_structure.transformed_cache waffle
+    # switch is enabled.
+    TRANSFORMED_CACHE_MAX_SIZE=64 * 1024 * 1024,
+
     # Backend storage
     # STORAGE_CLASS='storages.backends.s3boto.S3BotoStorage',
     # STORAGE_KWARGS=dict(bucket='nim-beryl-test'),
@@ -6,3 +6,6 @@ else:
     SERVICE_HOST = 'http://localhost:4567'
 
 PREFIX = SERVICE_HOST + '/api/v1'
+
+POOL_SIZE = getattr(settings, "COMMENTS_SERVICE_POOL_SIZE", 0)
+MAX_RETRIES = getattr(settings, "COMMENTS_SERVICE_MAX_RETRIES", 0)
@@ -1,17 +1,31 @@
 """" Common utilities for comment client wrapper """
+import cookielib
 import logging
+import os
 from contextlib import contextmanager
+from copy import deepcopy
 from time import time
 from uuid import uuid4
 
 import requests
+from crum import get_current_request
 from django.utils.translation import get_language
+from requests.adapters import HTTPAdapter
 
 import dogstats_wrapper as dog_stats_api
-from .settings import SERVICE_HOST as COMMENTS_SERVICE
+from openedx.core.djangoapps.request_cache import get_cache
+from .settings import MAX_RETRIES, POOL_SIZE, SERVICE_HOST as COMMENTS_SERVICE
 
 log = logging.getLogger(__name__)
 
+# The request cache of responses to GET requests, which are returned for
+# identical GET requests in the same Django request, until a request changes
+# the comments service's data.
+REQUEST_CACHE_NAME = 'comment_client.perform_request'
+
+_session = None
+_session_pid = None
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -53,6 +67,34 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
+def get_session():
+    """
+    Return this process's Session for requests to the comments service,
+    which keeps up to POOL_SIZE connections to it alive.  Only used when
+    POOL_SIZE is set.
+    """
+    global _session, _session_pid  # pylint: disable=global-statement
+    if _session is None or _session_pid != os.getpid():
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=MAX_RETRIES)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        # The session is shared by all users, so it mustn't keep cookies.
+        session.cookies.set_policy(cookielib.DefaultCookiePolicy(allowed_domains=[]))
+        _session, _session_pid = session, os.getpid()
+    return _session
+
+
+def request(method, url, **kwargs):
+    """
+    Send a request to the comments service like `requests.request`, using
+    the pooled connections of `get_session` if POOL_SIZE is set.
+    """
+    if POOL_SIZE:
+        return get_session().request(method, url, **kwargs)
+    return requests.request(method, url, **kwargs)
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
                     metric_action=None, metric_tags=None, paged_results=False):
     # To avoid dependency conflict
@@ -75,6 +117,17 @@ def perform_request(method, url, data_or_params=None, raw=False,
         'X-Edx-Api-Key': config.api_key,
         'Accept-Language': get_language(),
     }
+
+    response_cache = get_cache(REQUEST_CACHE_NAME)
+    cache_key = None
+    if method.lower() != 'get':
+        response_cache.clear()
+    elif get_current_request() is not None:
+        cache_key = (url, repr(sorted(data_or_params.items())), headers['Accept-Language'], raw)
+        if cache_key in response_cache:
+            dog_stats_api.increment('comment_client.request.coalesced', tags=metric_tags)
+            return deepcopy(response_cache[cache_key])
+
     request_id = uuid4()
     request_id_dict = {'request_id': request_id}
 
@@ -85,7 +138,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = request(
             method,
             url,
             data=data,
@@ -111,7 +164,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         raise CommentClient500Error(response.text)
     else:
         if raw:
-            return response.text
+            data = response.text
         else:
             try:
                 data = response.json()
@@ -138,7 +191,9 @@ def perform_request(method, url, data_or_params=None, raw=False,
                     value=data.get('num_pages', 1),
                     tags=metric_tags
                 )
-            return data
+        if cache_key is not None:
+            response_cache[cache_key] = deepcopy(data)
+        return data
 
 
 class CommentClientError(Exception):
@@ -0,0 +1,594 @@
+"""
+Module with a compact, column-oriented representation of a collected
+block structure.
+
+    CompactBlockStructure - read-only view of a collected block structure
+        that is loaded from a single flat buffer.
+
+The following internal data structure is implemented:
+    _LazyBlockMap - Map of the per-block objects of a copy of a
+        CompactBlockStructure, created as the blocks are accessed.
+
+BlockStructureBlockData keeps one _BlockRelations, BlockData and
+TransformerData object per block, all of which have to be rebuilt when a
+pickled block structure is loaded.  CompactBlockStructure instead refers
+to blocks by integer index, keeps parent and child relations in flat
+adjacency arrays and keeps collected values in one column per field.
+
+Serialized layout (after the MAGIC prefix, zlib compressed):
+
+    uint32 length of the header | pickled header | sections
+
+The header maps each section name to its (offset, length) in the
+sections area.  The adjacency arrays are loaded with a single copy each,
+usage keys are only parsed when they are returned, and each field column
+is only unpickled when it is first read.
+"""
+import cPickle as pickle
+import struct
+import sys
+import zlib
+from array import array
+from copy import deepcopy
+from itertools import chain
+
+from opaque_keys.edx.keys import UsageKey
+
+from openedx.core.lib.graph_traversals import traverse_post_order, traverse_topologically
+
+from .block_structure import (
+    TRANSFORMER_VERSION_KEY,
+    BlockData,
+    TransformerData,
+    TransformerDataMap,
+    _BlockRelations,
+)
+
+
+# Prefix identifying serialized CompactBlockStructures.  Pickled block
+# structures are zlib streams, which never start with these bytes.
+MAGIC = 'BSC1'
+
+_HEADER_LENGTH = struct.Struct('<I')
+
+# Section names.
+_KEYS = 'keys'
+_BLOCK_DATA = 'block_data'
+_CHILDREN = 'children'
+_CHILDREN_OFFSETS = 'children_offsets'
+_PARENTS = 'parents'
+_PARENTS_OFFSETS = 'parents_offsets'
+_TRANSFORMER_DATA = 'transformer_data'
+
+# Kinds of field columns.
+_XBLOCK_FIELD = 'xblock'
+_TRANSFORMER_BLOCK_FIELD = 'transformer'
+
+
+def _transformer_name(transformer):
+    """
+    Returns the name of the given transformer class or name.
+    """
+    try:
+        return transformer.name()
+    except AttributeError:
+        return transformer
+
+
+def _adjacency_arrays(index_lists):
+    """
+    Returns (offsets, values) arrays for the given list of lists of
+    block indices, such that the indices related to the block at
+    position i are values[offsets[i]:offsets[i + 1]].
+    """
+    offsets = array('i', [0])
+    values = array('i')
+    for indices in index_lists:
+        values.extend(indices)
+        offsets.append(len(values))
+    return offsets, values
+
+
+class _LazyBlockMap(object):
+    """
+    Map of usage key to a per-block object (a _BlockRelations or a
+    BlockData) of a copy of a CompactBlockStructure.  The object of a
+    block is only created, from the compact block structure, when the
+    block is first accessed, so a copy that is only partly read or
+    mutated doesn't pay for the rest of the blocks.
+
+    Provides the parts of the dict interface used by BlockStructure and
+    BlockStructureBlockData.  Iterating over the items or values creates
+    the objects of all remaining blocks.
+    """
+    def __init__(self, compact, indices, create_block):
+        self._compact = compact
+        # Indices of the blocks whose objects are not created yet.
+        self._pending_indices = indices
+        self._create_block = create_block
+        self._blocks = {}
+
+    def _pending_index(self, usage_key):
+        """
+        Returns the index of the given block if its object is not
+        created yet, or None.
+        """
+        index = self._compact._index(usage_key)  # pylint: disable=protected-access
+        return index if index in self._pending_indices else None
+
+    def _create_pending(self):
+        """
+        Creates the objects of all the blocks whose objects are not
+        created yet.
+        """
+        for index in self._pending_indices:
+            usage_key = self._compact._usage_key(index)  # pylint: disable=protected-access
+            self._blocks[usage_key] = self._create_block(index)
+        self._pending_indices = set()
+
+    def __contains__(self, usage_key):
+        return usage_key in self._blocks or self._pending_index(usage_key) is not None
+
+    def __len__(self):
+        return len(self._blocks) + len(self._pending_indices)
+
+    def __getitem__(self, usage_key):
+        try:
+            return self._blocks[usage_key]
+        except KeyError:
+            index = self._pending_index(usage_key)
+            if index is None:
+                raise
+            self._pending_indices.discard(index)
+            block = self._blocks[usage_key] = self._create_block(index)
+            return block
+
+    def __setitem__(self, usage_key, block):
+        self._pending_indices.discard(self._compact._index(usage_key))  # pylint: disable=protected-access
+        self._blocks[usage_key] = block
+
+    def __delitem__(self, usage_key):
+        index = self._pending_index(usage_key)
+        if index is None:
+            del self._blocks[usage_key]
+        else:
+            self._pending_indices.discard(index)
+
+    def __iter__(self):
+        return self.iterkeys()
+
+    def __deepcopy__(self, memo):
+        return deepcopy(dict(self.iteritems()), memo)
+
+    def __reduce__(self):
+        # Pickled as a plain dict, without the compact block structure.
+        return dict, (self.items(),)
+
+    def get(self, usage_key, default=None):
+        try:
+            return self[usage_key]
+        except KeyError:
+            return default
+
+    def pop(self, usage_key, *default):
+        try:
+            block = self[usage_key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self._blocks[usage_key]
+        return block
+
+    def iterkeys(self):
+        return chain(
+            self._blocks.keys(),
+            [self._compact._usage_key(index) for index in self._pending_indices],  # pylint: disable=protected-access
+        )
+
+    def keys(self):
+        return list(self.iterkeys())
+
+    def iteritems(self):
+        self._create_pending()
+        return self._blocks.iteritems()
+
+    def items(self):
+        return list(self.iteritems())
+
+    def itervalues(self):
+        self._create_pending()
+        return self._blocks.itervalues()
+
+    def values(self):
+        return list(self.itervalues())
+
+
+class CompactBlockStructure(object):
+    """
+    A read-only, column-oriented view of a collected block structure.
+
+    Provides the read accessors of BlockStructureBlockData, so it can be
+    used wherever a collected block structure is only read.  Use `copy`
+    to get a mutable BlockStructureBlockData, for example to transform it.
+    """
+    def __init__(self, root_block_usage_key, body):
+        header_length = _HEADER_LENGTH.unpack_from(body)[0]
+        header = pickle.loads(body[_HEADER_LENGTH.size:_HEADER_LENGTH.size + header_length])
+
+        self.root_block_usage_key = root_block_usage_key
+        self._body = body
+        self._sections_start = _HEADER_LENGTH.size + header_length
+        self._sections = header['sections']
+        self._byteorder = header['byteorder']
+        self._column_names = header['columns']
+
+        # Block keys, by index.  Usage keys are parsed lazily.
+        self._key_strings = self._read_section(_KEYS).decode('utf-8').split(u'\n')
+        self._indices = {key_string: index for index, key_string in enumerate(self._key_strings)}
+        self._usage_keys = [None] * len(self._key_strings)
+
+        self._children_offsets = self._read_array(_CHILDREN_OFFSETS)
+        self._children = self._read_array(_CHILDREN)
+        self._parents_offsets = self._read_array(_PARENTS_OFFSETS)
+        self._parents = self._read_array(_PARENTS)
+
+        # Decoded columns, keyed by column name.
+        self._columns = {}
+        self._block_data_index_set = None
+        self._transformer_data = None
+
+    #--- Serialization ---#
+
+    @classmethod
+    def serialize(cls, block_structure):
+        """
+        Returns the compact serialization of the given collected
+        BlockStructureBlockData.
+        """
+        block_keys = list(block_structure.get_block_keys())
+        block_keys.extend(key for key, _ in block_structure.iteritems() if key not in block_structure)
+        indices = {block_key: index for index, block_key in enumerate(block_keys)}
+
+        children_offsets, children = _adjacency_arrays(
+            [indices[child] for child in block_structure.get_children(block_key)] for block_key in block_keys
+        )
+        parents_offsets, parents = _adjacency_arrays(
+            [indices[parent] for parent in block_structure.get_parents(block_key)] for block_key in block_keys
+        )
+
+        columns = {}
+        for block_key, block_data in block_structure.iteritems():
+            index = indices[block_key]
+            for field_name, value in block_data.fields.iteritems():
+                columns.setdefault((_XBLOCK_FIELD, field_name), {})[index] = value
+            for transformer_name, transformer_block_data in block_data.transformer_data.iteritems():
+                for key, value in transformer_block_data.fields.iteritems():
+                    columns.setdefault((_TRANSFORMER_BLOCK_FIELD, transformer_name, key), {})[index] = value
+
+        sections = [
+            (_KEYS, u'\n'.join(unicode(block_key) for block_key in block_keys).encode('utf-8')),
+            (_BLOCK_DATA, array('i', sorted(indices[key] for key, _ in block_structure.iteritems())).tostring()),
+            (_CHILDREN_OFFSETS, children_offsets.tostring()),
+            (_CHILDREN, children.tostring()),
+            (_PARENTS_OFFSETS, parents_offsets.tostring()),
+            (_PARENTS, parents.tostring()),
+            (_TRANSFORMER_DATA, pickle.dumps(
+                {name: data.fields for name, data in block_structure.transformer_data.iteritems()},
+                pickle.HIGHEST_PROTOCOL,
+            )),
+        ]
+        sections.extend(
+            (column_name, pickle.dumps(column, pickle.HIGHEST_PROTOCOL))
+            for column_name, column in columns.iteritems()
+        )
+
+        section_offsets = {}
+        offset = 0
+        for name, data in sections:
+            section_offsets[name] = (offset, len(data))
+            offset += len(data)
+
+        header = pickle.dumps(
+            {'sections': section_offsets, 'byteorder': sys.byteorder, 'columns': sorted(columns)},
+            pickle.HIGHEST_PROTOCOL,
+        )
+        body = ''.join([_HEADER_LENGTH.pack(len(header)), header] + [data for _, data in sections])
+        return MAGIC + zlib.compress(body)
+
+    @classmethod
+    def is_serialized(cls, serialized_data):
+        """
+        Returns whether the given data was produced by `serialize`.
+        """
+        return serialized_data[:len(MAGIC)] == MAGIC
+
+    @classmethod
+    def deserialize(cls, serialized_data, root_block_usage_key):
+        """
+        Returns the CompactBlockStructure for the given data produced
+        by `serialize`.
+        """
+        return cls(root_block_usage_key, zlib.decompress(serialized_data[len(MAGIC):]))
+
+    @property
+    def size(self):
+        """
+        Returns the size, in bytes, of the decompressed buffer.
+        """
+        return len(self._body)
+
+    #--- Block structure relation methods ---#
+
+    def __iter__(self):
+        return self.get_block_keys()
+
+    def __len__(self):
+        return len(self._key_strings)
+
+    def __contains__(self, usage_key):
+        return self._index(usage_key) is not None
+
+    def get_block_keys(self):
+        """
+        Returns an iterator of the usage keys of all the blocks in
+        the block structure.
+        """
+        return (self._usage_key(index) for index in xrange(len(self._key_strings)))
+
+    def get_parents(self, usage_key):
+        """
+        Returns the list of usage keys of the parents of the given block.
+        """
+        return self._related_keys(usage_key, self._parents_offsets, self._parents)
+
+    def get_children(self, usage_key):
+        """
+        Returns the list of usage keys of the children of the given block.
+        """
+        return self._related_keys(usage_key, self._children_offsets, self._children)
+
+    def topological_traversal(self, filter_func=None, yield_descendants_of_unyielded=False, start_node=None):
+        """
+        See BlockStructure.topological_traversal.
+        """
+        return traverse_topologically(
+            start_node=start_node or self.root_block_usage_key,
+            get_parents=self.get_parents,
+            get_children=self.get_children,
+            filter_func=filter_func,
+            yield_descendants_of_unyielded=yield_descendants_of_unyielded,
+        )
+
+    def post_order_traversal(self, filter_func=None, start_node=None):
+        """
+        See BlockStructure.post_order_traversal.
+        """
+        return traverse_post_order(
+            start_node=start_node or self.root_block_usage_key,
+            get_children=self.get_children,
+            filter_func=filter_func,
+        )
+
+    #--- Block data methods ---#
+
+    @property
+    def transformer_data(self):
+        """
+        The TransformerDataMap of the non-block-specific transformer data.
+        """
+        if self._transformer_data is None:
+            self._transformer_data = self._load_transformer_data()
+        return self._transformer_data
+
+    def __getitem__(self, usage_key):
+        """
+        Returns a BlockData with the data of the given block.
+        """
+        index = self._index(usage_key)
+        if index is None or index not in self._block_data_indices():
+            raise KeyError(usage_key)
+        block_data = BlockData(self._usage_key(index))
+        for column_name in self._column_names:
+            column = self._column(column_name)
+            if index in column:
+                self._set_block_data_value(block_data, column_name, column[index])
+        return block_data
+
+    def get_xblock_field(self, usage_key, field_name, default=None):
+        """
+        See BlockStructureBlockData.get_xblock_field.
+        """
+        index = self._index(usage_key)
+        if index is None:
+            return default
+        if field_name == 'location':
+            return self._usage_key(index) if index in self._block_data_indices() else default
+        return self._column((_XBLOCK_FIELD, field_name)).get(index, default)
+
+    def get_transformer_data(self, transformer, key, default=None):
+        """
+        See BlockStructureBlockData.get_transformer_data.
+        """
+        try:
+            return getattr(self.transformer_data[transformer], key, default)
+        except KeyError:
+            return default
+
+    def get_transformer_block_data(self, usage_key, transformer):
+        """
+        See BlockStructureBlockData.get_transformer_block_data.
+        """
+        index = self._index(usage_key)
+        transformer_name = _transformer_name(transformer)
+        transformer_block_data = TransformerData()
+        found = False
+        for column_name in self._column_names:
+            if column_name[:2] == (_TRANSFORMER_BLOCK_FIELD, transformer_name):
+                column = self._column(column_name)
+                if index in column:
+                    setattr(transformer_block_data, column_name[2], column[index])
+                    found = True
+        if not found:
+            raise KeyError(usage_key)
+        return transformer_block_data
+
+    def get_transformer_block_field(self, usage_key, transformer, key, default=None):
+        """
+        See BlockStructureBlockData.get_transformer_block_field.
+        """
+        index = self._index(usage_key)
+        if index is None:
+            return default
+        column = self._column((_TRANSFORMER_BLOCK_FIELD, _transformer_name(transformer), key))
+        return column.get(index, default)
+
+    def copy(self):
+        """
+        Returns a new, mutable BlockStructureBlockData with the
+        contents of this block structure.
+
+        The relations and data of each block are only copied from this
+        block structure when the block is first accessed in the copy, so
+        transforming a copy only creates objects for the blocks the
+        transformers reach.  Values are deep-copied as they are copied,
+        so the copy shares no mutable state with this instance.
+        """
+        from .factory import BlockStructureFactory
+
+        return BlockStructureFactory.create_new(
+            self.root_block_usage_key,
+            _LazyBlockMap(self, set(xrange(len(self._key_strings))), self._create_block_relations),
+            self._load_transformer_data(),
+            _LazyBlockMap(self, set(self._block_data_indices()), self._create_block_data),
+        )
+
+    #--- Internal methods ---#
+
+    def _get_transformer_data_version(self, transformer):
+        """
+        Returns the version number stored for the given transformer.
+        """
+        return self.get_transformer_data(transformer, TRANSFORMER_VERSION_KEY, 0)
+
+    def _read_section(self, name):
+        """
+        Returns the raw bytes of the given section.
+        """
+        offset, length = self._sections[name]
+        start = self._sections_start + offset
+        return self._body[start:start + length]
+
+    def _read_array(self, name):
+        """
+        Returns the integer array stored in the given section.
+        """
+        values = array('i')
+        values.fromstring(self._read_section(name))
+        if self._byteorder != sys.byteorder:
+            values.byteswap()
+        return values
+
+    def _block_data_indices(self):
+        """
+        Returns the set of indices of the blocks that have block data.
+        """
+        if self._block_data_index_set is None:
+            self._block_data_index_set = set(self._read_array(_BLOCK_DATA))
+        return self._block_data_index_set
+
+    def _load_column(self, column_name):
+        """
+        Decodes and returns the given column as a dict of block index
+        to value.
+        """
+        if column_name not in self._sections:
+            return {}
+        return pickle.loads(self._read_section(column_name))
+
+    def _column(self, column_name):
+        """
+        Returns the given column, decoding it on first access.
+        """
+        try:
+            return self._columns[column_name]
+        except KeyError:
+            column = self._columns[column_name] = self._load_column(column_name)
+            return column
+
+    def _load_transformer_data(self):
+        """
+        Decodes and returns a new TransformerDataMap of the
+        non-block-specific transformer data.
+        """
+        transformer_data = TransformerDataMap()
+        for transformer_name, fields in pickle.loads(self._read_section(_TRANSFORMER_DATA)).iteritems():
+            transformer_data.get_or_create(transformer_name).fields = fields
+        return transformer_data
+
+    def _create_block_relations(self, index):
+        """
+        Returns a new _BlockRelations for the block at the given index.
+        """
+        relations = _BlockRelations()
+        relations.children = self._related_keys_by_index(index, self._children_offsets, self._children)
+        relations.parents = self._related_keys_by_index(index, self._parents_offsets, self._parents)
+        return relations
+
+    def _create_block_data(self, index):
+        """
+        Returns a new BlockData with deep copies of the values of the
+        block at the given index.
+        """
+        block_data = BlockData(self._usage_key(index))
+        for column_name in self._column_names:
+            column = self._column(column_name)
+            if index in column:
+                self._set_block_data_value(block_data, column_name, deepcopy(column[index]))
+        return block_data
+
+    @staticmethod
+    def _set_block_data_value(block_data, column_name, value):
+        """
+        Sets the value of the given column on the given BlockData.
+        """
+        if column_name[0] == _XBLOCK_FIELD:
+            setattr(block_data, column_name[1], value)
+        else:
+            setattr(block_data.transformer_data.get_or_create(column_name[1]), column_name[2], value)
+
+    def _index(self, usage_key):
+        """
+        Returns the index of the given block, or None if it is not in
+        the block structure.
+        """
+        return self._indices.get(unicode(usage_key))
+
+    def _usage_key(self, index):
+        """
+        Returns the usage key of the block at the given index.
+        """
+        usage_key = self._usage_keys[index]
+        if usage_key is None:
+            usage_key = UsageKey.from_string(self._key_strings[index]).map_into_course(
+                self.root_block_usage_key.course_key
+            )
+            self._usage_keys[index] = usage_key
+        return usage_key
+
+    def _related_keys(self, usage_key, offsets, related):
+        """
+        Returns the usage keys related to the given block in the given
+        adjacency arrays.
+        """
+        index = self._index(usage_key)
+        if index is None:
+            return []
+        return self._related_keys_by_index(index, offsets, related)
+
+    def _related_keys_by_index(self, index, offsets, related):
+        """
+        Returns the usage keys related to the block at the given index in
+        the given adjacency arrays.
+        """
+        return [self._usage_key(related_index) for related_index in related[offsets[index]:offsets[index + 1]]]
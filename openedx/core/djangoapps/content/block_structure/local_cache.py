@@ -0,0 +1,150 @@
+"""
+Module for the process-local tier of the BlockStructure storage.
+"""
+from collections import OrderedDict
+from logging import getLogger
+from threading import Lock
+
+from django.conf import settings
+
+from openedx.core.djangoapps import monitoring_utils
+
+
+logger = getLogger(__name__)  # pylint: disable=C0103
+
+# Default upper bound, in bytes, on the data held in the local cache of
+# each process.
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+class LocalBlockStructureCache(object):
+    """
+    Size-bounded, least-recently-used cache of read-only collected
+    block structures, kept in the memory of the current process.
+
+    Entries are keyed by the usage key of the root block together with
+    the version data of the stored block structure, so a newly collected
+    version of a course is never served from an outdated entry.
+    """
+    def __init__(self, max_size=None, name='local_cache', max_size_setting='LOCAL_CACHE_MAX_SIZE'):
+        """
+        Arguments:
+            max_size (int) - The maximum total size, in bytes, of the
+                cached block structures.  If None, the value of
+                BLOCK_STRUCTURES_SETTINGS[max_size_setting] is used.
+
+            name (str) - The name of the cache in its metrics.
+
+            max_size_setting (str) - The key of the maximum size in
+                BLOCK_STRUCTURES_SETTINGS.
+        """
+        self._max_size = max_size
+        self._name = name
+        self._max_size_setting = max_size_setting
+        self._entries = OrderedDict()
+        self._total_size = 0
+        self._lock = Lock()
+
+    @property
+    def max_size(self):
+        """
+        Returns the maximum total size, in bytes, of the cache.
+        """
+        if self._max_size is None:
+            return settings.BLOCK_STRUCTURES_SETTINGS.get(self._max_size_setting, DEFAULT_MAX_SIZE)
+        return self._max_size
+
+    @property
+    def total_size(self):
+        """
+        Returns the total size, in bytes, of the cached block structures.
+        """
+        return self._total_size
+
+    def get(self, root_block_usage_key, version):
+        """
+        Returns the cached block structure for the given root block and
+        version, or None if it is not cached.
+        """
+        key = (root_block_usage_key, version)
+        with self._lock:
+            try:
+                block_structure, size = self._entries.pop(key)
+            except KeyError:
+                monitoring_utils.increment('block_structure.{}.miss'.format(self._name))
+                return None
+            self._entries[key] = (block_structure, size)
+
+        monitoring_utils.increment('block_structure.{}.hit'.format(self._name))
+        monitoring_utils.accumulate('block_structure.{}.hit_bytes'.format(self._name), size)
+        return block_structure
+
+    def set(self, root_block_usage_key, version, block_structure, size):
+        """
+        Caches the given read-only block structure of the given size,
+        in bytes, evicting the least recently used entries as needed.
+        Block structures larger than the maximum size are not cached.
+        """
+        max_size = self.max_size
+        if size > max_size:
+            logger.info(
+                "BlockStructure: Too large for %s; %s, size: %d", self._name, root_block_usage_key, size,
+            )
+            return
+
+        key = (root_block_usage_key, version)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (block_structure, size)
+            self._total_size += size
+            while self._total_size > max_size:
+                self._remove(next(iter(self._entries)))
+            total_size = self._total_size
+
+        monitoring_utils.set_custom_metric('block_structure.{}.total_bytes'.format(self._name), total_size)
+
+    def evict(self, root_block_usage_key):
+        """
+        Removes all cached versions of the block structure for the
+        given root block.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == root_block_usage_key]:
+                self._remove(key)
+
+    def evict_course(self, course_key):
+        """
+        Removes all cached block structures of the given course.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0].course_key == course_key]:
+                self._remove(key)
+
+    def clear(self):
+        """
+        Removes all cached block structures.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._total_size = 0
+
+    def _remove(self, key):
+        """
+        Removes the entry for the given key, if any.  Must be called
+        with the lock held.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_size -= entry[1]
+
+
+# The cache shared by all BlockStructureStores in this process.
+local_cache = LocalBlockStructureCache()  # pylint: disable=invalid-name
+
+# The cache of block structures that have been transformed by the
+# filtering transformers with an access signature, shared by all
+# BlockStructureManagers in this process.
+transformed_cache = LocalBlockStructureCache(  # pylint: disable=invalid-name
+    name='transformed_cache',
+    max_size_setting='TRANSFORMED_CACHE_MAX_SIZE',
+)
@@ -2,12 +2,15 @@
 Top-level module for the Block Structure framework with a class for managing
 BlockStructures.
 """
+import weakref
 from contextlib import contextmanager
 
 from . import config
+from .compact import CompactBlockStructure
 from .exceptions import UsageKeyNotInBlockStructure, TransformerDataIncompatible, BlockStructureNotFound
 from .factory import BlockStructureFactory
-from .store import BlockStructureStore
+from .local_cache import transformed_cache
+from .store import BlockStructureStore, is_local_cache_enabled
 from .transformers import BlockStructureTransformers
 
 
@@ -60,22 +63,79 @@ class BlockStructureManager(object):
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
-        block_structure = collected_block_structure.copy() if collected_block_structure else self.get_collected()
+        block_structure = collected_block_structure or self.get_collected()
+
+        if starting_block_usage_key and starting_block_usage_key not in block_structure:
+            raise UsageKeyNotInBlockStructure(
+                "The requested usage_key '{0}' is not found in the block_structure with root '{1}'",
+                unicode(starting_block_usage_key),
+                unicode(self.root_block_usage_key),
+            )
+
+        if isinstance(block_structure, CompactBlockStructure):
+            if config.waffle().is_enabled(config.TRANSFORMED_CACHE) and is_local_cache_enabled():
+                # Compact block structures shared through the local cache
+                # are read-only, so their filtered copies can be reused.
+                # Without the local cache, each request loads a new
+                # collected block structure, whose filtered copies would
+                # never be reused.
+                return self._get_transformed_from_cache(
+                    transformers,
+                    starting_block_usage_key or block_structure.root_block_usage_key,
+                    block_structure,
+                )
+            # Compact block structures are read-only, so transform a mutable copy.
+            block_structure = block_structure.copy()
+        elif collected_block_structure:
+            block_structure = block_structure.copy()
 
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
             # requested location.  The rest of the structure will be pruned
             # as part of the transformation.
-            if starting_block_usage_key not in block_structure:
-                raise UsageKeyNotInBlockStructure(
-                    "The requested usage_key '{0}' is not found in the block_structure with root '{1}'",
-                    unicode(starting_block_usage_key),
-                    unicode(self.root_block_usage_key),
-                )
             block_structure.set_root_block(starting_block_usage_key)
         transformers.transform(block_structure)
         return block_structure
 
+    def _get_transformed_from_cache(self, transformers, starting_block_usage_key, collected_block_structure):
+        """
+        Returns the transformed Block Structure for the given read-only
+        collected block structure, starting at starting_block_usage_key.
+
+        The block structure filtered by the transformers that have an
+        access signature is reused from the transformed cache for all
+        usage_infos with the same signature, so only the rest of the
+        transformers are applied for each usage_info.
+        """
+        signature, signed_transformers = transformers.access_signature(collected_block_structure)
+        if not signed_transformers:
+            block_structure = collected_block_structure.copy()
+            block_structure.set_root_block(starting_block_usage_key)
+            transformers.transform(block_structure)
+            return block_structure
+
+        # The filtered block structure is only valid for this collected
+        # block structure.  A weak reference to it is part of the key, so
+        # entries stop matching once it is no longer used.
+        version = (weakref.ref(collected_block_structure), starting_block_usage_key, signature)
+        filtered_block_structure = transformed_cache.get(self.root_block_usage_key, version)
+        if filtered_block_structure is not None:
+            block_structure = filtered_block_structure.copy()
+        else:
+            block_structure = collected_block_structure.copy()
+            block_structure.set_root_block(starting_block_usage_key)
+            transformers.filter(block_structure, signed_transformers)
+            filtered_block_structure = CompactBlockStructure.deserialize(
+                CompactBlockStructure.serialize(block_structure),
+                starting_block_usage_key,
+            )
+            transformed_cache.set(
+                self.root_block_usage_key, version, filtered_block_structure, filtered_block_structure.size,
+            )
+
+        transformers.transform(block_structure, applied_transformers=signed_transformers)
+        return block_structure
+
     def get_collected(self):
         """
         Returns the collected Block Structure for the root_block_usage_key,
@@ -8,8 +8,10 @@ from openedx.core.lib.cache_utils import zpickle, zunpickle
 
 from . import config
 from .block_structure import BlockStructureBlockData
+from .compact import CompactBlockStructure
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
+from .local_cache import local_cache, transformed_cache
 from .models import BlockStructureModel
 from .transformer_registry import TransformerRegistry
 
@@ -65,6 +67,8 @@ class BlockStructureStore(object):
 
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
+        local_cache.evict(block_structure.root_block_usage_key)
+        transformed_cache.evict(block_structure.root_block_usage_key)
 
     def get(self, root_block_usage_key):
         """
@@ -79,6 +83,10 @@ class BlockStructureStore(object):
                 root of the block structure that is to be retrieved
                 from the store.
 
+        When the local cache is enabled, the block structure is returned
+        as a read-only CompactBlockStructure that is shared with other
+        callers in this process.
+
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found.
@@ -89,13 +97,28 @@ class BlockStructureStore(object):
         """
         bs_model = self._get_model(root_block_usage_key)
 
+        use_local_cache = is_local_cache_enabled()
+        if use_local_cache:
+            local_version = self._version_data_tuple_of_model(bs_model)
+            block_structure = local_cache.get(root_block_usage_key, local_version)
+            if block_structure is not None:
+                return block_structure
+
         try:
             serialized_data = self._get_from_cache(bs_model)
         except BlockStructureNotFound:
             serialized_data = self._get_from_store(bs_model)
             self._add_to_cache(serialized_data, bs_model)
 
-        return self._deserialize(serialized_data, root_block_usage_key)
+        block_structure = self._deserialize(serialized_data, root_block_usage_key)
+        if use_local_cache:
+            if not isinstance(block_structure, CompactBlockStructure):
+                block_structure = CompactBlockStructure.deserialize(
+                    CompactBlockStructure.serialize(block_structure),
+                    root_block_usage_key,
+                )
+            local_cache.set(root_block_usage_key, local_version, block_structure, block_structure.size)
+        return block_structure
 
     def delete(self, root_block_usage_key):
         """
@@ -106,6 +129,8 @@ class BlockStructureStore(object):
             root_block_usage_key (UsageKey) - The usage_key for the root
                 of the block structure that is to be removed.
         """
+        local_cache.evict(root_block_usage_key)
+        transformed_cache.evict(root_block_usage_key)
         bs_model = self._get_model(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
         bs_model.delete()
@@ -193,6 +218,9 @@ class BlockStructureStore(object):
         """
         Serializes the data for the given block_structure.
         """
+        if config.waffle().is_enabled(config.COMPACT_SERIALIZATION):
+            return CompactBlockStructure.serialize(block_structure)
+
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -203,7 +231,13 @@ class BlockStructureStore(object):
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+
+        Data serialized in the compact format is returned as a read-only
+        CompactBlockStructure.
         """
+        if CompactBlockStructure.is_serialized(serialized_data):
+            return CompactBlockStructure.deserialize(serialized_data, root_block_usage_key)
+
         block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         return BlockStructureFactory.create_new(
             root_block_usage_key,
@@ -250,9 +284,26 @@ class BlockStructureStore(object):
             for field_name in BlockStructureModel.VERSION_FIELDS
         }
 
+    @staticmethod
+    def _version_data_tuple_of_model(bs_model):
+        """
+        Returns the version-relevant data for the given
+        BlockStructureModel as a hashable tuple.
+        """
+        return tuple(getattr(bs_model, field_name, None) for field_name in BlockStructureModel.VERSION_FIELDS)
+
 
 def _is_storage_backing_enabled():
     """
     Returns whether storage backing for Block Structures is enabled.
     """
     return config.waffle().is_enabled(config.STORAGE_BACKING_FOR_CACHE)
+
+
+def is_local_cache_enabled():
+    """
+    Returns whether the process-local cache for Block Structures is
+    enabled.  The local cache relies on the version data of the stored
+    model, so it is only used along with storage backing.
+    """
+    return _is_storage_backing_enabled() and config.waffle().is_enabled(config.LOCAL_CACHE)
@@ -0,0 +1,135 @@
+"""
+Tests for block_structure/compact.py
+"""
+import ddt
+from nose.plugins.attrib import attr
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+
+from ..block_structure import BlockStructureBlockData
+from ..compact import CompactBlockStructure
+from ..config import COMPACT_SERIALIZATION, waffle
+from ..store import BlockStructureStore
+from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer, UsageKeyFactoryMixin
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestCompactBlockStructure(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheIsolationTestCase):
+    """
+    Tests for CompactBlockStructure
+    """
+    def _create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map, with
+        xBlock fields and transformer data set on every block.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)  # pylint: disable=protected-access
+        block_structure.set_transformer_data(MockTransformer, 'course_data', {'key': 'value'})
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_data = block_structure._get_or_create_block(block_key)  # pylint: disable=protected-access
+            block_data.display_name = u'Block {}'.format(block_id)
+            if block_id % 2:
+                block_structure.set_transformer_block_field(block_key, MockTransformer, 'odd', block_id)
+        return block_structure
+
+    def _serialize_and_load(self, block_structure):
+        """
+        Returns the CompactBlockStructure for the given block structure.
+        """
+        serialized_data = CompactBlockStructure.serialize(block_structure)
+        self.assertTrue(CompactBlockStructure.is_serialized(serialized_data))
+        return CompactBlockStructure.deserialize(serialized_data, block_structure.root_block_usage_key)
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_relations(self, children_map):
+        compact = self._serialize_and_load(self._create_collected_block_structure(children_map))
+        self.assertEqual(len(compact), len(children_map))
+        self.assert_block_structure(compact, children_map)
+        self.assertEqual(
+            list(compact.topological_traversal()),
+            list(self._create_collected_block_structure(children_map).topological_traversal()),
+        )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_block_data(self, children_map):
+        compact = self._serialize_and_load(self._create_collected_block_structure(children_map))
+        self.assertEqual(
+            compact._get_transformer_data_version(MockTransformer),  # pylint: disable=protected-access
+            MockTransformer.WRITE_VERSION,
+        )
+        self.assertEqual(compact.get_transformer_data(MockTransformer, 'course_data'), {'key': 'value'})
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            self.assertEqual(compact.get_xblock_field(block_key, 'display_name'), u'Block {}'.format(block_id))
+            self.assertEqual(compact.get_xblock_field(block_key, 'due', 'default'), 'default')
+            self.assertEqual(
+                compact.get_transformer_block_field(block_key, MockTransformer, 'odd'),
+                block_id if block_id % 2 else None,
+            )
+        self.assertIsNone(compact.get_xblock_field(self.block_key_factory(100), 'display_name'))
+
+    def test_copy(self):
+        children_map = self.SIMPLE_CHILDREN_MAP
+        compact = self._serialize_and_load(self._create_collected_block_structure(children_map))
+
+        block_structure = compact.copy()
+        self.assertIsInstance(block_structure, BlockStructureBlockData)
+        self.assert_block_structure(block_structure, children_map)
+        self.assertEqual(block_structure.get_xblock_field(self.block_key_factory(1), 'display_name'), u'Block 1')
+        self.assertEqual(
+            block_structure.get_transformer_block_field(self.block_key_factory(1), MockTransformer, 'odd'), 1,
+        )
+
+        # Mutating the copy leaves the compact block structure untouched.
+        block_structure.get_transformer_data(MockTransformer, 'course_data')['key'] = 'changed'
+        block_structure.remove_block(self.block_key_factory(1), keep_descendants=False)
+        self.assertEqual(compact.get_transformer_data(MockTransformer, 'course_data'), {'key': 'value'})
+        self.assert_block_structure(compact, children_map)
+
+    def test_copy_creates_accessed_blocks_only(self):
+        children_map = self.SIMPLE_CHILDREN_MAP
+        compact = self._serialize_and_load(self._create_collected_block_structure(children_map))
+
+        block_structure = compact.copy()
+        block_relations = block_structure._block_relations  # pylint: disable=protected-access
+        block_data_map = block_structure._block_data_map  # pylint: disable=protected-access
+        self.assertEqual(len(block_structure), len(children_map))
+        self.assertEqual(len(block_relations._blocks), 0)  # pylint: disable=protected-access
+        self.assertEqual(len(block_data_map._blocks), 0)  # pylint: disable=protected-access
+
+        # Transforming the copy from block 2 only creates the objects of the blocks it reaches.
+        block_structure.set_root_block(self.block_key_factory(2))
+        block_structure._prune_unreachable()  # pylint: disable=protected-access
+        self.assertEqual(block_structure.get_xblock_field(self.block_key_factory(2), 'display_name'), u'Block 2')
+        self.assertEqual(list(block_structure), [self.block_key_factory(2)])
+        self.assertEqual(len(block_data_map._blocks), 1)  # pylint: disable=protected-access
+
+        # Values are copied when their block is created.
+        block_structure.get_transformer_data(MockTransformer, 'course_data')['key'] = 'changed'
+        block_structure[self.block_key_factory(2)].display_name = u'Changed'
+        self.assertEqual(compact.get_xblock_field(self.block_key_factory(2), 'display_name'), u'Block 2')
+        self.assertEqual(compact.get_transformer_data(MockTransformer, 'course_data'), {'key': 'value'})
+
+    def test_store(self):
+        children_map = self.SIMPLE_CHILDREN_MAP
+        block_structure = self._create_collected_block_structure(children_map)
+        store = BlockStructureStore(MockCache())
+
+        with waffle().override(COMPACT_SERIALIZATION, active=True):
+            store.add(block_structure)
+        stored_value = store.get(block_structure.root_block_usage_key)
+        self.assertIsInstance(stored_value, CompactBlockStructure)
+        self.assert_block_structure(stored_value, children_map)
+
+        # Structures serialized by pickling are still readable.
+        store.add(block_structure)
+        self.assertIsInstance(store.get(block_structure.root_block_usage_key), BlockStructureBlockData)
@@ -0,0 +1,111 @@
+"""
+Tests for block_structure/local_cache.py
+"""
+from nose.plugins.attrib import attr
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+
+from ..compact import CompactBlockStructure
+from ..config import LOCAL_CACHE, STORAGE_BACKING_FOR_CACHE, waffle
+from ..local_cache import LocalBlockStructureCache, local_cache
+from ..store import BlockStructureStore
+from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer, UsageKeyFactoryMixin
+
+
+@attr(shard=2)
+class TestLocalBlockStructureCache(UsageKeyFactoryMixin, CacheIsolationTestCase):
+    """
+    Tests for LocalBlockStructureCache
+    """
+    def setUp(self):
+        super(TestLocalBlockStructureCache, self).setUp()
+        self.cache = LocalBlockStructureCache(max_size=10)
+
+    def test_get_and_set(self):
+        root_key = self.block_key_factory(0)
+        self.assertIsNone(self.cache.get(root_key, 'v1'))
+
+        self.cache.set(root_key, 'v1', 'structure v1', 4)
+        self.assertEqual(self.cache.get(root_key, 'v1'), 'structure v1')
+        self.assertIsNone(self.cache.get(root_key, 'v2'))
+        self.assertEqual(self.cache.total_size, 4)
+
+        self.cache.set(root_key, 'v1', 'structure v1', 5)
+        self.assertEqual(self.cache.total_size, 5)
+
+    def test_lru_eviction(self):
+        for block_id in range(3):
+            self.cache.set(self.block_key_factory(block_id), 'v1', block_id, 4)
+
+        # Block 0 was evicted to make room for block 2.
+        self.assertIsNone(self.cache.get(self.block_key_factory(0), 'v1'))
+        self.assertEqual(self.cache.get(self.block_key_factory(1), 'v1'), 1)
+
+        # Block 1 is now the most recently used, so block 2 is evicted.
+        self.cache.set(self.block_key_factory(3), 'v1', 3, 4)
+        self.assertIsNone(self.cache.get(self.block_key_factory(2), 'v1'))
+        self.assertEqual(self.cache.get(self.block_key_factory(1), 'v1'), 1)
+        self.assertEqual(self.cache.total_size, 8)
+
+    def test_too_large(self):
+        self.cache.set(self.block_key_factory(0), 'v1', 'structure', 11)
+        self.assertIsNone(self.cache.get(self.block_key_factory(0), 'v1'))
+        self.assertEqual(self.cache.total_size, 0)
+
+    def test_evict(self):
+        self.cache.set(self.block_key_factory(0), 'v1', 'structure v1', 1)
+        self.cache.set(self.block_key_factory(0), 'v2', 'structure v2', 1)
+        self.cache.set(self.block_key_factory(1), 'v1', 'other structure', 1)
+
+        self.cache.evict(self.block_key_factory(0))
+        self.assertIsNone(self.cache.get(self.block_key_factory(0), 'v1'))
+        self.assertIsNone(self.cache.get(self.block_key_factory(0), 'v2'))
+        self.assertEqual(self.cache.get(self.block_key_factory(1), 'v1'), 'other structure')
+        self.assertEqual(self.cache.total_size, 1)
+
+        self.cache.evict_course(self.block_key_factory(1).course_key)
+        self.assertIsNone(self.cache.get(self.block_key_factory(1), 'v1'))
+        self.assertEqual(self.cache.total_size, 0)
+
+
+@attr(shard=2)
+class TestBlockStructureStoreLocalCache(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheIsolationTestCase):
+    """
+    Tests for the local cache tier of BlockStructureStore
+    """
+    def setUp(self):
+        super(TestBlockStructureStoreLocalCache, self).setUp()
+
+        self.children_map = self.SIMPLE_CHILDREN_MAP
+        self.block_structure = self.create_block_structure(self.children_map)
+        self.block_structure._add_transformer(MockTransformer)  # pylint: disable=protected-access
+
+        self.mock_cache = MockCache()
+        self.store = BlockStructureStore(self.mock_cache)
+
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+    def test_get_from_local_cache(self):
+        root_key = self.block_structure.root_block_usage_key
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(LOCAL_CACHE, active=True):
+                self.store.add(self.block_structure)
+
+                stored_value = self.store.get(root_key)
+                self.assertIsInstance(stored_value, CompactBlockStructure)
+                self.assert_block_structure(stored_value, self.children_map)
+
+                # The shared, read-only instance is returned without
+                # accessing the cache.
+                self.mock_cache.map.clear()
+                self.assertIs(self.store.get(root_key), stored_value)
+
+                # Collecting a new version evicts the cached instance.
+                self.store.add(self.block_structure)
+                self.assertIsNot(self.store.get(root_key), stored_value)
+
+    def test_disabled_without_storage_backing(self):
+        with waffle().override(LOCAL_CACHE, active=True):
+            self.store.add(self.block_structure)
+            self.store.get(self.block_structure.root_block_usage_key)
+            self.assertEqual(local_cache.total_size, 0)
@@ -6,12 +6,20 @@ from django.test import TestCase
 from nose.plugins.attrib import attr
 
 from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
+from ..compact import CompactBlockStructure
+from ..config import (
+    LOCAL_CACHE,
+    RAISE_ERROR_WHEN_NOT_FOUND,
+    STORAGE_BACKING_FOR_CACHE,
+    TRANSFORMED_CACHE,
+    waffle,
+)
 from ..exceptions import UsageKeyNotInBlockStructure, BlockStructureNotFound
+from ..local_cache import transformed_cache
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
 from .helpers import (
-    MockModulestoreFactory, MockCache, MockTransformer,
+    MockModulestoreFactory, MockCache, MockFilteringTransformer, MockTransformer,
     ChildrenMapTestMixin, UsageKeyFactoryMixin,
     mock_registered_transformers,
 )
@@ -89,6 +97,21 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + unicode(block_key)
 
 
+class SignedFilteringTransformer(MockFilteringTransformer):
+    """
+    Test Transformer class that filters out the blocks in the usage_info,
+    which is also its access signature.
+    """
+    filter_call_count = 0
+
+    def transform_block_filters(self, usage_info, block_structure):
+        SignedFilteringTransformer.filter_call_count += 1
+        return [block_structure.create_removal_filter(lambda block_key: block_key in usage_info)]
+
+    def access_signature(self, usage_info, block_structure):
+        return usage_info
+
+
 @attr(shard=2)
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
@@ -161,6 +184,45 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
             )
             self.assert_block_structure(block_structure, expected_structure, missing_blocks=expected_missing_blocks)
 
+    @ddt.data(True, False)
+    def test_get_transformed_from_transformed_cache(self, local_cache_enabled):
+        transformed_cache.clear()
+        self.addCleanup(transformed_cache.clear)
+        SignedFilteringTransformer.filter_call_count = 0
+        registered_transformers = [TestTransformer1(), SignedFilteringTransformer()]
+
+        with mock_registered_transformers(registered_transformers):
+            transformers = BlockStructureTransformers(registered_transformers)
+            collected_block_structure = self.bs_manager.get_collected()
+            collected_block_structure = CompactBlockStructure.deserialize(
+                CompactBlockStructure.serialize(collected_block_structure),
+                collected_block_structure.root_block_usage_key,
+            )
+
+            with waffle().override(TRANSFORMED_CACHE, active=True):
+                with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+                    with waffle().override(LOCAL_CACHE, active=local_cache_enabled):
+                        for (removed_blocks, expected_structure, expected_missing_blocks, expected_filter_calls) in [
+                                ([2], [[1], [3, 4], [], [], []], [2], 1),
+                                ([2], [[1], [3, 4], [], [], []], [2], 1 if local_cache_enabled else 2),
+                                ([1], [[2], [], [], [], []], [1, 3, 4], 2 if local_cache_enabled else 3),
+                        ]:
+                            transformers.usage_info = frozenset(
+                                self.block_key_factory(block) for block in removed_blocks
+                            )
+                            block_structure = self.bs_manager.get_transformed(
+                                transformers,
+                                collected_block_structure=collected_block_structure,
+                            )
+                            self.assert_block_structure(
+                                block_structure, expected_structure, missing_blocks=expected_missing_blocks,
+                            )
+                            TestTransformer1.assert_transformed(block_structure)
+                            self.assertEqual(SignedFilteringTransformer.filter_call_count, expected_filter_calls)
+
+        # Without the local cache, nothing is added to the transformed cache.
+        self.assertEqual(transformed_cache.total_size > 0, local_cache_enabled)
+
     def test_get_transformed_with_nonexistent_starting_block(self):
         with mock_registered_transformers(self.registered_transformers):
             with self.assertRaises(UsageKeyNotInBlockStructure):
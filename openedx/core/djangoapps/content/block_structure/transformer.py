@@ -177,6 +177,33 @@ class FilteringTransformerMixin(BlockStructureTransformer):
         """
         block_structure.filter_topological_traversal(self.transform_block_filters(usage_info, block_structure))
 
+    def access_signature(self, usage_info, block_structure):
+        """
+        Returns a hashable value that determines which blocks this
+        transformer's filters keep for the given usage_info, or None
+        if there is no such value.
+
+        When the filters of two usage_infos with equal signatures keep
+        the same blocks, the framework can reuse the block structure
+        filtered for one of them for the other.  For example, a
+        transformer that only filters blocks based on the user's staff
+        access can return whether the user has staff access.
+
+        The default implementation returns None, so the transformer's
+        filters are applied for every usage_info.
+
+        Arguments:
+            usage_info (any negotiated type) - A usage-specific object
+                that is passed to the block_structure and forwarded to all
+                requested Transformers in order to apply a
+                usage-specific transform.
+
+            block_structure (BlockStructureBlockData) - A block
+                structure, with already collected data for the
+                transformer, that is not to be modified.
+        """
+        return None
+
     @abstractmethod
     def transform_block_filters(self, usage_info, block_structure):
         """
@@ -105,29 +105,67 @@ class BlockStructureTransformers(object):
             )
         return True
 
-    def transform(self, block_structure):
+    def access_signature(self, block_structure):
+        """
+        Returns a (signature, transformers) tuple, where transformers is
+        the list of filtering transformers in the collection that have
+        an access signature for the usage_info, and signature is a
+        hashable value made of their names and access signatures.
+
+        Applying the filters of those transformers to the given block
+        structure keeps the same blocks for any usage_info with an equal
+        signature.
+        """
+        signature = []
+        signed_transformers = []
+        for transformer in self._transformers['supports_filter']:
+            transformer_signature = transformer.access_signature(self.usage_info, block_structure)
+            if transformer_signature is not None:
+                signature.append((transformer.name(), transformer_signature))
+                signed_transformers.append(transformer)
+        return tuple(signature), signed_transformers
+
+    def transform(self, block_structure, applied_transformers=()):
         """
         The given block structure is transformed by each transformer in the
         collection. Tranformers with filters are combined and run first in a
         single course tree traversal, then remaining transformers are run in
         the order that they were added.
+
+        Filtering transformers in applied_transformers are skipped, since
+        their filters were already applied to the block structure.
         """
-        self._transform_with_filters(block_structure)
+        self._transform_with_filters(
+            block_structure,
+            [
+                transformer for transformer in self._transformers['supports_filter']
+                if transformer not in applied_transformers
+            ],
+        )
         self._transform_without_filters(block_structure)
 
         # Prune the block structure to remove any unreachable blocks.
         block_structure._prune_unreachable()  # pylint: disable=protected-access
 
-    def _transform_with_filters(self, block_structure):
+    def filter(self, block_structure, transformers):
+        """
+        The given block structure is transformed by the filters of the
+        given filtering transformers of the collection only, in a single
+        course tree traversal.
+        """
+        self._transform_with_filters(block_structure, transformers)
+        block_structure._prune_unreachable()  # pylint: disable=protected-access
+
+    def _transform_with_filters(self, block_structure, transformers):
         """
         Transforms the given block_structure using the transform_block_filters
         method from the given transformers.
         """
-        if not self._transformers['supports_filter']:
+        if not transformers:
             return
 
         filters = []
-        for transformer in self._transformers['supports_filter']:
+        for transformer in transformers:
             filters.extend(transformer.transform_block_filters(self.usage_info, block_structure))
 
         combined_filters = functools.reduce(
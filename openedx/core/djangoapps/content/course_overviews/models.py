@@ -21,6 +21,7 @@ from lms.djangoapps import django_comment_client
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
 from openedx.core.djangoapps.lang_pref.api import get_closest_released_language
 from openedx.core.djangoapps.models.course_details import CourseDetails
+from openedx.core.djangoapps.request_cache import get_cache
 from static_replace.models import AssetBaseUrlConfig
 from xmodule import course_metadata_utils, block_metadata_utils
 from xmodule.course_module import CourseDescriptor, DEFAULT_START_DATE
@@ -29,6 +30,9 @@ from xmodule.modulestore.django import modulestore
 
 log = logging.getLogger(__name__)
 
+# The request cache of the CourseOverviews loaded by CourseOverview.get_from_ids.
+REQUEST_CACHE_NAME = 'course_overviews.get_from_ids'
+
 
 class CourseOverview(TimeStampedModel):
     """
@@ -219,6 +223,7 @@ class CourseOverview(TimeStampedModel):
             - IOError if some other error occurs while trying to load the
                 course from the module store.
         """
+        get_cache(REQUEST_CACHE_NAME).pop(course_id, None)
         store = modulestore()
         with store.bulk_operations(course_id):
             course = store.get_course(course_id)
@@ -303,6 +308,56 @@ class CourseOverview(TimeStampedModel):
 
         return course_overview or cls.load_from_module_store(course_id)
 
+    @classmethod
+    def get_from_ids(cls, course_ids):
+        """
+        Return a dict mapping course_ids to CourseOverviews.
+
+        Like get_from_id, but the CourseOverviews that exist are loaded with
+        their image sets and tabs in a constant number of queries, rather than
+        a few queries for each course.  Missing and outdated CourseOverviews
+        are generated from the modulestore one at a time.  Courses that don't
+        exist, or can't be loaded from the modulestore, are left out of the
+        dict.
+
+        The CourseOverviews are kept in the request cache, so each is loaded
+        at most once per request.
+        """
+        cache = get_cache(REQUEST_CACHE_NAME)
+        overviews = {}
+        uncached_ids = set()
+        for course_id in course_ids:
+            if course_id in cache:
+                overviews[course_id] = cache[course_id]
+            else:
+                uncached_ids.add(course_id)
+
+        if not uncached_ids:
+            return overviews
+
+        loaded_overviews = {
+            overview.id: overview
+            for overview
+            in cls.objects.select_related('image_set').prefetch_related('tabs').filter(
+                id__in=uncached_ids,
+                version__gte=cls.VERSION
+            )
+        }
+        for course_id in uncached_ids:
+            course_overview = loaded_overviews.get(course_id)
+            if course_overview is None:
+                try:
+                    course_overview = cls.get_from_id(course_id)
+                except (cls.DoesNotExist, IOError):
+                    log.info('Course Overviews: unable to load course overview for %s.', unicode(course_id))
+                    continue
+            elif not hasattr(course_overview, 'image_set'):
+                # Regenerate the missing thumbnail images, as in get_from_id.
+                CourseOverviewImageSet.create(course_overview)
+            overviews[course_id] = cache[course_id] = course_overview
+
+        return overviews
+
     @classmethod
     def get_from_ids_if_exists(cls, course_ids):
         """
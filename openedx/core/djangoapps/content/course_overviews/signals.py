@@ -6,7 +6,9 @@ import logging
 from django.dispatch import Signal
 from django.dispatch.dispatcher import receiver
 
-from .models import CourseOverview
+from openedx.core.djangoapps.request_cache import get_cache
+
+from .models import CourseOverview, REQUEST_CACHE_NAME
 from xmodule.modulestore.django import SignalHandler
 
 LOG = logging.getLogger(__name__)
@@ -34,6 +36,7 @@ def _listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=
     invalidates the corresponding CourseOverview cache entry if one exists.
     """
     CourseOverview.objects.filter(id=course_key).delete()
+    get_cache(REQUEST_CACHE_NAME).pop(course_key, None)
     # import CourseAboutSearchIndexer inline due to cyclic import
     from cms.djangoapps.contentstore.courseware_index import CourseAboutSearchIndexer
     # Delete course entry from Course About Search_index
@@ -14,6 +14,7 @@ from django.conf import settings
 from django.db.utils import IntegrityError
 from django.test.utils import override_settings
 from django.utils import timezone
+from opaque_keys.edx.keys import CourseKey
 from PIL import Image
 
 from lms.djangoapps.certificates.api import get_active_web_certificate
@@ -546,6 +547,39 @@ class CourseOverviewTestCase(CatalogIntegrationMixin, ModuleStoreTestCase):
         self.assertEqual(len(course_ids_to_overviews), 1)
         self.assertIn(course_with_overview_1.id, course_ids_to_overviews)
 
+    def test_get_from_ids(self):
+        course_with_overview_1 = CourseFactory.create(emit_signals=True)
+        course_with_overview_2 = CourseFactory.create(emit_signals=True)
+        course_without_overview = CourseFactory.create(emit_signals=False)
+        non_existent_course_key = CourseKey.from_string('course-v1:NoSuch+Course+Run')
+
+        course_ids = [course_with_overview_1.id, course_with_overview_2.id, course_without_overview.id]
+        course_ids_to_overviews = CourseOverview.get_from_ids(course_ids + [non_existent_course_key])
+
+        # The missing CourseOverview is generated, and the course that doesn't
+        # exist is left out.
+        self.assertEqual(set(course_ids_to_overviews), set(course_ids))
+        self.assertTrue(CourseOverview.objects.filter(id=course_without_overview.id).exists())
+
+        # The tabs of the loaded CourseOverviews are prefetched, and the
+        # CourseOverviews are kept in the request cache.
+        overview_1 = course_ids_to_overviews[course_with_overview_1.id]
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [tab.tab_id for tab in overview_1.tabs.all()],
+                [tab.tab_id for tab in course_with_overview_1.tabs],
+            )
+            self.assertIs(
+                CourseOverview.get_from_ids([course_with_overview_1.id])[course_with_overview_1.id], overview_1,
+            )
+
+        # Reloading the CourseOverview from the modulestore removes it from
+        # the request cache.
+        CourseOverview.load_from_module_store(course_with_overview_1.id)
+        self.assertIsNot(
+            CourseOverview.get_from_ids([course_with_overview_1.id])[course_with_overview_1.id], overview_1,
+        )
+
 
 @attr(shard=3)
 @ddt.ddt
@@ -1,11 +1,40 @@
 """
 Helper functions for caching course assets.
+
+Assets are cached in three tiers:
+
+* Small assets are kept in memory in each process for a short time, if
+  COURSE_ASSETS_LOCAL_CACHE allows it, since other processes can't tell
+  this one that they've changed.
+* Assets under 1MB are cached in the "course_assets" cache.
+* The data of larger assets is cached in files in a local directory, if
+  COURSE_ASSETS_DISK_CACHE configures one, keyed by the asset's location
+  and digest.  Their metadata is kept in the "course_assets" cache.
+
+The AssetManifest of each course is cached too, for rewriting asset URLs.
+It's pickled and cached in chunks, since the manifest of a course with many
+assets can be larger than the item size limit of memcached.
 """
+import cPickle as pickle
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from openedx.core.djangoapps.request_cache import get_cache
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, StaticContentStream
+from xmodule.contentstore.django import contentstore
+
+log = logging.getLogger(__name__)
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -14,19 +43,374 @@ try:
 except InvalidCacheBackendError:
     pass
 
+# Seconds that a course's AssetManifest is cached for.  Changes to assets made in Studio delete
+# the cached manifest, but other changes, like course imports, don't.
+ASSET_MANIFEST_TIMEOUT = 5 * 60
+ASSET_MANIFEST_REQUEST_CACHE_NAME = 'contentserver.asset_manifest'
+
+# Pickled AssetManifests are cached in chunks of this many bytes, so that each cached value
+# stays under the item size limit of memcached.
+ASSET_MANIFEST_CHUNK_SIZE = 512 * 1024
+
+# AssetManifests that take more chunks than this aren't cached.  Instead, a marker is cached
+# for ASSET_MANIFEST_TIMEOUT seconds so that the course's asset URLs are rewritten by looking
+# each asset up, rather than by building the manifest again on every request.
+ASSET_MANIFEST_MAX_CHUNKS = 32
+ASSET_MANIFEST_TOO_LARGE = 'too_large'
+
+# Assets this large or larger are cached on disk rather than in CONTENT_CACHE.  This is the
+# default item size limit of memcached, and we don't want to do too much buffering in memory
+# when we're serving an actual request.
+MAX_CACHED_CONTENT_SIZE = 1048576
+
+
+def _location_str(location):
+    """Force the location to a Unicode string."""
+    return unicode(location).encode("utf-8")
+
+
+class LocalAssetCache(object):
+    """
+    An in-process cache of small assets, which evicts the least recently used
+    assets to keep the total length of the cached assets under `max_size`.
+    Assets longer than `max_item_size` aren't cached, and assets are only
+    used for `timeout` seconds.
+    """
+    def __init__(self, max_size, max_item_size, timeout):
+        self.max_size = max_size
+        self.max_item_size = max_item_size
+        self.timeout = timeout
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the asset cached for `key`, or None.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            content, length, expires = entry
+            if expires < time.time():
+                self.size -= length
+                return None
+            self._entries[key] = entry
+            return content
+
+    def set(self, key, content):
+        """
+        Cache `content` for `key`, if it's small enough.
+        """
+        length = getattr(content, 'length', None)
+        if length is None or length > self.max_item_size:
+            self.delete(key)
+            return
+        with self._lock:
+            self._delete(key)
+            self._entries[key] = (content, length, time.time() + self.timeout)
+            self.size += length
+            while self.size > self.max_size:
+                _, (_, evicted_length, _) = self._entries.popitem(last=False)
+                self.size -= evicted_length
+
+    def delete(self, key):
+        """
+        Remove the asset cached for `key`, if any.
+        """
+        with self._lock:
+            self._delete(key)
+
+    def _delete(self, key):
+        """
+        Remove the asset cached for `key`, with the lock held.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+
+class CachedAssetFile(StaticContentStream):
+    """
+    An asset whose data is read from a file in an `AssetFileCache`.
+    """
+    def __init__(self, content, asset_file=None):
+        super(CachedAssetFile, self).__init__(
+            content.location, content.name, content.content_type, asset_file,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked,
+            content_digest=content.content_digest,
+        )
+
+    @property
+    def file(self):
+        """
+        The open file of the asset's data.
+        """
+        return self._stream
+
+    def __getstate__(self):
+        """
+        Leave the file out when caching the asset's metadata.
+        """
+        state = self.__dict__.copy()
+        state['_stream'] = None
+        return state
+
+
+class AssetFileCache(object):
+    """
+    A cache of the data of assets in files in `directory`, which evicts the
+    least recently used files to keep their total size under `max_size`.
+
+    The directory can be shared by several processes.  Files are named after
+    the asset's location and digest, so a changed asset gets a new file, and
+    the old one is eventually evicted.
+    """
+    TEMP_PREFIX = '.tmp'
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+
+    def _path(self, content):
+        """
+        Return the path of the file for the data of `content`.
+        """
+        name = hashlib.sha1(_location_str(content.location) + '|' + content.content_digest).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def get(self, content):
+        """
+        Return a CachedAssetFile for the data of `content`, or None if it
+        isn't cached.
+        """
+        path = self._path(content)
+        try:
+            asset_file = open(path, 'rb')
+        except IOError:
+            return None
+        try:
+            # Record that the file was used, for eviction.
+            os.utime(path, None)
+        except OSError:
+            pass
+        return CachedAssetFile(content, asset_file)
+
+    def add(self, content):
+        """
+        Write the data of the StaticContentStream `content` to the cache, and
+        return a CachedAssetFile for it, or None if it can't be written.
+        `content`'s stream is read to its end in either case.
+        """
+        temp_path = None
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            temp_fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=self.TEMP_PREFIX)
+            with os.fdopen(temp_fd, 'wb') as temp_file:
+                for chunk in content.stream_data():
+                    temp_file.write(chunk)
+            # Readers only ever see complete files.
+            os.rename(temp_path, self._path(content))
+        except (IOError, OSError):
+            log.exception(u"Couldn't cache the data of %s", unicode(content.location))
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return None
+
+        self._evict()
+        return self.get(content)
+
+    def _evict(self):
+        """
+        Remove the least recently used files until the total size of the
+        files is under `max_size`.
+        """
+        files = []
+        for name in os.listdir(self.directory):
+            if name.startswith(self.TEMP_PREFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Another process evicted it.
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_size <= self.max_size:
+                break
+            try:
+                # Requests that are reading the file can finish.
+                os.remove(path)
+            except OSError:
+                pass
+            total_size -= size
+
+
+_local_caches = {}
+_file_caches = {}
+
+
+def get_local_cache():
+    """
+    Return the LocalAssetCache configured by COURSE_ASSETS_LOCAL_CACHE, or
+    None if it is turned off.
+    """
+    config = getattr(settings, 'COURSE_ASSETS_LOCAL_CACHE', {})
+    if not config.get('MAX_SIZE'):
+        return None
+    key = (config['MAX_SIZE'], config.get('MAX_ITEM_SIZE', 32768), config.get('TIMEOUT', 60))
+    if key not in _local_caches:
+        _local_caches[key] = LocalAssetCache(*key)
+    return _local_caches[key]
+
+
+def get_file_cache():
+    """
+    Return the AssetFileCache configured by COURSE_ASSETS_DISK_CACHE, or None
+    if it is turned off.
+    """
+    config = getattr(settings, 'COURSE_ASSETS_DISK_CACHE', {})
+    if not config.get('DIRECTORY'):
+        return None
+    key = (config['DIRECTORY'], config.get('MAX_SIZE', 1073741824))
+    if key not in _file_caches:
+        _file_caches[key] = AssetFileCache(*key)
+    return _file_caches[key]
+
+
+def _asset_manifest_key(course_key):
+    """
+    Returns the cache key of the course's AssetManifest.
+    """
+    return u'asset_manifest.{}'.format(course_key.for_branch(None)).encode('utf-8')
+
+
+def _asset_manifest_chunk_key(cache_key, generation, index):
+    """
+    Returns the cache key of a chunk of a cached AssetManifest.
+    """
+    return '{}.{}.{}'.format(cache_key, generation, index)
+
+
+def _get_cached_asset_manifest(cache_key):
+    """
+    Returns the AssetManifest cached under cache_key, ASSET_MANIFEST_TOO_LARGE if the
+    manifest was too large to cache, or None if it isn't cached.
+    """
+    cached = CONTENT_CACHE.get(cache_key, version=STATIC_CONTENT_VERSION)
+    if cached is None or cached == ASSET_MANIFEST_TOO_LARGE:
+        return cached
+
+    generation, num_chunks = cached
+    chunk_keys = [_asset_manifest_chunk_key(cache_key, generation, index) for index in range(num_chunks)]
+    chunks = CONTENT_CACHE.get_many(chunk_keys, version=STATIC_CONTENT_VERSION)
+    if len(chunks) != num_chunks:
+        # Some chunks were evicted.
+        return None
+    return pickle.loads(''.join(chunks[chunk_key] for chunk_key in chunk_keys))
+
+
+def _set_cached_asset_manifest(cache_key, manifest):
+    """
+    Caches the AssetManifest under cache_key, in chunks of ASSET_MANIFEST_CHUNK_SIZE bytes.
+
+    The chunks of each cached manifest are keyed by a new generation, which is stored under
+    cache_key once all of them are cached, so that chunks of different manifests are never
+    mixed up.
+    """
+    data = pickle.dumps(manifest, pickle.HIGHEST_PROTOCOL)
+    num_chunks = max(1, (len(data) + ASSET_MANIFEST_CHUNK_SIZE - 1) // ASSET_MANIFEST_CHUNK_SIZE)
+    if num_chunks > ASSET_MANIFEST_MAX_CHUNKS:
+        log.warning(
+            u"The asset manifest of %s is too large to cache (%d bytes), its asset URLs will be rewritten "
+            u"by looking each asset up.",
+            unicode(manifest.course_key), len(data),
+        )
+        CONTENT_CACHE.set(cache_key, ASSET_MANIFEST_TOO_LARGE, ASSET_MANIFEST_TIMEOUT, version=STATIC_CONTENT_VERSION)
+        return
+
+    generation = uuid.uuid4().hex
+    CONTENT_CACHE.set_many(
+        {
+            _asset_manifest_chunk_key(cache_key, generation, index):
+            data[index * ASSET_MANIFEST_CHUNK_SIZE:(index + 1) * ASSET_MANIFEST_CHUNK_SIZE]
+            for index in range(num_chunks)
+        },
+        ASSET_MANIFEST_TIMEOUT,
+        version=STATIC_CONTENT_VERSION,
+    )
+    CONTENT_CACHE.set(cache_key, (generation, num_chunks), ASSET_MANIFEST_TIMEOUT, version=STATIC_CONTENT_VERSION)
+
+
+def get_asset_manifest(course_key):
+    """
+    Returns the AssetManifest of the course's assets, or None if the contentstore can't make one,
+    or if it's too large to cache.
+
+    Manifests are cached in the request cache and in the "course_assets" cache, until an
+    asset of the course is changed through `del_cached_content`, or ASSET_MANIFEST_TIMEOUT
+    seconds pass.
+    """
+    cache_key = _asset_manifest_key(course_key)
+    request_cache = get_cache(ASSET_MANIFEST_REQUEST_CACHE_NAME)
+    if cache_key in request_cache:
+        return request_cache[cache_key]
+
+    manifest = _get_cached_asset_manifest(cache_key)
+    if manifest == ASSET_MANIFEST_TOO_LARGE:
+        manifest = None
+    elif manifest is None:
+        try:
+            manifest = contentstore().get_asset_manifest(course_key)
+        except NotImplementedError:
+            manifest = None
+        else:
+            _set_cached_asset_manifest(cache_key, manifest)
+    request_cache[cache_key] = manifest
+    return manifest
+
+
+def del_asset_manifest(course_key):
+    """
+    Delete the cached AssetManifest of the course.
+    """
+    cache_key = _asset_manifest_key(course_key)
+    get_cache(ASSET_MANIFEST_REQUEST_CACHE_NAME).pop(cache_key, None)
+    CONTENT_CACHE.delete(cache_key, version=STATIC_CONTENT_VERSION)
+
 
 def set_cached_content(content):
     """
     Stores the given piece of content in the cache, using its location as the key.
     """
-    CONTENT_CACHE.set(unicode(content.location).encode("utf-8"), content, version=STATIC_CONTENT_VERSION)
+    local_cache = get_local_cache()
+    if local_cache is not None and not isinstance(content, CachedAssetFile):
+        local_cache.set(_location_str(content.location), content)
+    CONTENT_CACHE.set(_location_str(content.location), content, version=STATIC_CONTENT_VERSION)
 
 
 def get_cached_content(location):
     """
     Retrieves the given piece of content by its location if cached.
     """
-    return CONTENT_CACHE.get(unicode(location).encode("utf-8"), version=STATIC_CONTENT_VERSION)
+    local_cache = get_local_cache()
+    if local_cache is not None:
+        content = local_cache.get(_location_str(location))
+        if content is not None:
+            return content
+    content = CONTENT_CACHE.get(_location_str(location), version=STATIC_CONTENT_VERSION)
+    if content is not None and local_cache is not None:
+        local_cache.set(_location_str(location), content)
+    return content
 
 
 def del_cached_content(location):
@@ -36,15 +420,16 @@ def del_cached_content(location):
     It's possible that the content could have been cached without knowing the course_key,
     and so without having the run.
     """
-    def location_str(loc):
-        """Force the location to a Unicode string."""
-        return unicode(loc).encode("utf-8")
-
-    locations = [location_str(location)]
+    locations = [_location_str(location)]
     try:
-        locations.append(location_str(location.replace(run=None)))
+        locations.append(_location_str(location.replace(run=None)))
     except InvalidKeyError:
         # although deprecated keys allowed run=None, new keys don't if there is no version.
         pass
 
+    local_cache = get_local_cache()
+    if local_cache is not None:
+        for location_str in locations:
+            local_cache.delete(location_str)
     CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+    del_asset_manifest(location.course_key)
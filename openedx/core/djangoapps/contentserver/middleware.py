@@ -10,7 +10,7 @@ try:
 except ImportError:
     newrelic = None  # pylint: disable=invalid-name
 from django.http import (
-    HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
+    FileResponse, HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
     HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
 from six import text_type
 from student.models import CourseEnrollment
@@ -21,7 +21,13 @@ from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from openedx.core.djangoapps.header_control import force_header_for_response
-from .caching import get_cached_content, set_cached_content
+from .caching import (
+    MAX_CACHED_CONTENT_SIZE,
+    CachedAssetFile,
+    get_cached_content,
+    get_file_cache,
+    set_cached_content
+)
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -124,7 +130,8 @@ class StaticContentServer(object):
             response = None
             if request.META.get('HTTP_RANGE'):
                 # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
+                # The data of a CachedAssetFile is read from its file.
+                if isinstance(content, StaticContent) and not isinstance(content, CachedAssetFile):
                     content = AssetManager.find(loc, as_stream=True)
 
                 header_value = request.META['HTTP_RANGE']
@@ -169,7 +176,11 @@ class StaticContentServer(object):
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                if isinstance(content, CachedAssetFile):
+                    # Let the server send the file without copying it, if it can.
+                    response = FileResponse(content.file)
+                else:
+                    response = HttpResponse(content.stream_data())
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -275,6 +286,10 @@ class StaticContentServer(object):
 
         # See if we can load this item from cache.
         content = get_cached_content(location)
+        if isinstance(content, CachedAssetFile):
+            # Only the metadata of large assets is cached, and their data may be in a file.
+            file_cache = get_file_cache()
+            content = file_cache.get(content) if file_cache is not None else None
         if content is None:
             # Not in cache, so just try and load it from the asset manager.
             try:
@@ -282,12 +297,21 @@ class StaticContentServer(object):
             except (ItemNotFoundError, NotFoundError):
                 raise
 
-            # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
-            # because it's the default for memcached and also we don't want to do too much
-            # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            # Now that we fetched it, let's go ahead and try to cache it. Small assets are
+            # cached whole, and the data of larger ones is cached in a file, if possible.
+            if content.length is not None and content.length < MAX_CACHED_CONTENT_SIZE:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
+            elif content.length is not None and content.content_digest:
+                file_cache = get_file_cache()
+                if file_cache is not None:
+                    cached_file = file_cache.add(content)
+                    if cached_file is not None:
+                        set_cached_content(cached_file)
+                        content = cached_file
+                    else:
+                        # Reading the asset into the file used up its stream.
+                        content = AssetManager.find(location, as_stream=True)
 
         return content
 
@@ -0,0 +1,191 @@
+"""
+Tests for the local tiers of the course asset cache.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from django.core.cache.backends.locmem import LocMemCache
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
+
+from openedx.core.djangoapps.request_cache.middleware import RequestCache
+from xmodule.contentstore.content import AssetManifest, ManifestEntry, StaticContentStream
+
+from ..caching import AssetFileCache, CachedAssetFile, LocalAssetCache, del_asset_manifest, get_asset_manifest
+
+
+def make_content(path, data, content_digest='digest'):
+    """
+    Return a StaticContentStream for an asset at `path` with `data`.
+    """
+    location = CourseLocator('edX', 'toy', '2012_Fall').make_asset_key('asset', path)
+    return StaticContentStream(
+        location, path, 'text/plain', StringIO(data), length=len(data), content_digest=content_digest
+    )
+
+
+class LocalAssetCacheTestCase(unittest.TestCase):
+    """
+    Tests for LocalAssetCache.
+    """
+    def setUp(self):
+        super(LocalAssetCacheTestCase, self).setUp()
+        self.cache = LocalAssetCache(max_size=10, max_item_size=5, timeout=60)
+
+    def test_get_and_set(self):
+        content = make_content('a.txt', 'aaaa').copy_to_in_mem()
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.set('a', content)
+        self.assertIs(self.cache.get('a'), content)
+        self.assertEqual(self.cache.size, 4)
+
+    def test_too_large(self):
+        self.cache.set('a', make_content('a.txt', 'aaaaaa').copy_to_in_mem())
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.size, 0)
+
+    def test_lru_eviction(self):
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, make_content(key, 'xxxx').copy_to_in_mem())
+            self.cache.get('a')
+
+        # 'b' was the least recently used.
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNotNone(self.cache.get('c'))
+        self.assertEqual(self.cache.size, 8)
+
+    def test_timeout(self):
+        self.cache.set('a', make_content('a.txt', 'aaaa').copy_to_in_mem())
+        with patch('openedx.core.djangoapps.contentserver.caching.time.time', return_value=2 ** 40):
+            self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.size, 0)
+
+    def test_delete(self):
+        self.cache.set('a', make_content('a.txt', 'aaaa').copy_to_in_mem())
+        self.cache.delete('a')
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual(self.cache.size, 0)
+
+
+class AssetFileCacheTestCase(unittest.TestCase):
+    """
+    Tests for AssetFileCache.
+    """
+    def setUp(self):
+        super(AssetFileCacheTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.cache = AssetFileCache(os.path.join(self.directory, 'assets'), max_size=10)
+
+    def test_add_and_get(self):
+        content = make_content('a.txt', 'aaaa')
+        self.assertIsNone(self.cache.get(content))
+
+        cached_file = self.cache.add(content)
+        self.assertIsInstance(cached_file, CachedAssetFile)
+        self.assertEqual(''.join(cached_file.stream_data()), 'aaaa')
+        self.assertEqual(cached_file.location, content.location)
+        self.assertEqual(cached_file.content_digest, 'digest')
+
+        cached_file = self.cache.get(content)
+        self.assertEqual(''.join(cached_file.stream_data_in_range(1, 2)), 'aa')
+
+    def test_changed_asset(self):
+        self.cache.add(make_content('a.txt', 'aaaa'))
+        self.assertIsNone(self.cache.get(make_content('a.txt', 'bbbb', content_digest='changed')))
+
+    def test_lru_eviction(self):
+        for path in ('a', 'b', 'c'):
+            self.cache.add(make_content(path, 'xxxx'))
+            # Make each file look used before the next one.
+            for name in os.listdir(self.cache.directory):
+                os.utime(os.path.join(self.cache.directory, name), (0, 0))
+            self.cache.get(make_content('a', ''))
+
+        self.assertIsNone(self.cache.get(make_content('b', '')))
+        self.assertIsNotNone(self.cache.get(make_content('a', '')))
+        self.assertIsNotNone(self.cache.get(make_content('c', '')))
+
+    def test_metadata_is_picklable(self):
+        cached_file = self.cache.add(make_content('a.txt', 'aaaa'))
+        state = cached_file.__getstate__()
+        self.assertIsNone(state['_stream'])
+        self.assertIsNotNone(cached_file.file)
+
+    def test_unwritable_directory(self):
+        with patch('openedx.core.djangoapps.contentserver.caching.os.rename', side_effect=OSError):
+            self.assertIsNone(self.cache.add(make_content('a.txt', 'aaaa')))
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+
+
+class AssetManifestCacheTestCase(unittest.TestCase):
+    """
+    Tests for the caching of AssetManifests.
+    """
+    def setUp(self):
+        super(AssetManifestCacheTestCase, self).setUp()
+        self.course_key = CourseLocator('edX', 'toy', '2012_Fall')
+        self.manifest = AssetManifest(self.course_key, {
+            u'asset{}.png'.format(index): ManifestEntry('digest{}'.format(index), False, index)
+            for index in range(100)
+        })
+        self.content_cache = LocMemCache('asset_manifest_test', {})
+        for patcher in (
+                patch('openedx.core.djangoapps.contentserver.caching.CONTENT_CACHE', self.content_cache),
+                patch('openedx.core.djangoapps.contentserver.caching.ASSET_MANIFEST_CHUNK_SIZE', 1000),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(RequestCache.clear_request_cache)
+
+    def get_asset_manifest(self):
+        """
+        Returns the course's manifest from a new request, and the number of times it was built.
+        """
+        RequestCache.clear_request_cache()
+        with patch('openedx.core.djangoapps.contentserver.caching.contentstore') as mock_contentstore:
+            mock_contentstore.return_value.get_asset_manifest.return_value = self.manifest
+            manifest = get_asset_manifest(self.course_key)
+        return manifest, mock_contentstore.return_value.get_asset_manifest.call_count
+
+    def test_manifest_cached_in_chunks(self):
+        manifest, build_count = self.get_asset_manifest()
+        self.assertIs(manifest, self.manifest)
+        self.assertEqual(build_count, 1)
+
+        manifest, build_count = self.get_asset_manifest()
+        self.assertEqual(build_count, 0)
+        self.assertEqual(manifest.entries, self.manifest.entries)
+
+        del_asset_manifest(self.course_key)
+        _, build_count = self.get_asset_manifest()
+        self.assertEqual(build_count, 1)
+
+    def test_evicted_chunk(self):
+        self.get_asset_manifest()
+        cached_values = self.content_cache._cache  # pylint: disable=protected-access
+        chunk_keys = [key for key in cached_values if key.endswith('.1')]
+        self.assertEqual(len(chunk_keys), 1)
+        del cached_values[chunk_keys[0]]
+
+        manifest, build_count = self.get_asset_manifest()
+        self.assertEqual(build_count, 1)
+        self.assertIs(manifest, self.manifest)
+
+    @patch('openedx.core.djangoapps.contentserver.caching.ASSET_MANIFEST_MAX_CHUNKS', 2)
+    def test_oversized_manifest(self):
+        with patch('openedx.core.djangoapps.contentserver.caching.log') as mock_log:
+            manifest, build_count = self.get_asset_manifest()
+        self.assertIs(manifest, self.manifest)
+        self.assertEqual(build_count, 1)
+        self.assertTrue(mock_log.warning.called)
+
+        # Later requests look assets up one at a time rather than building the manifest again.
+        manifest, build_count = self.get_asset_manifest()
+        self.assertIsNone(manifest)
+        self.assertEqual(build_count, 0)
@@ -6,10 +6,14 @@ import copy
 import datetime
 import ddt
 import logging
+import os
+import shutil
+import tempfile
 import unittest
 from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache import caches
 from django.test import RequestFactory
 from django.test.client import Client
 from django.test.utils import override_settings
@@ -27,6 +31,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
+from .. import caching
 from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
@@ -294,6 +299,34 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertEquals('Origin', resp['Vary'])
 
+    @patch('openedx.core.djangoapps.contentserver.middleware.MAX_CACHED_CONTENT_SIZE', 0)
+    def test_large_asset_cached_in_file(self):
+        """
+        Tests that the data of assets too large for the cache is served from files,
+        when a disk cache is configured.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        disk_cache = {'DIRECTORY': directory, 'MAX_SIZE': 1048576}
+        with override_settings(COURSE_ASSETS_DISK_CACHE=disk_cache):
+            with patch.object(caching, 'CONTENT_CACHE', caches['default']):
+                resp = self.client.get(self.url_unlocked)
+                self.assertEqual(resp.status_code, 200)
+                data = ''.join(resp.streaming_content)
+                self.assertEqual(len(data), self.length_unlocked)
+
+                with patch('openedx.core.djangoapps.contentserver.middleware.AssetManager.find') as mock_find:
+                    resp = self.client.get(self.url_unlocked)
+                    self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
+                    self.assertEqual(''.join(resp.streaming_content), data)
+
+                    resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=1-2')
+                    self.assertEqual(resp.status_code, 206)
+                    self.assertEqual(resp.content, data[1:3])
+                    self.assertFalse(mock_find.called)
+
+        self.assertEqual(len(os.listdir(directory)), 1)
+
     @patch('openedx.core.djangoapps.contentserver.models.CourseAssetCacheTtlConfig.get_cache_ttl')
     def test_cache_headers_with_ttl_unlocked(self, mock_get_cache_ttl):
         """
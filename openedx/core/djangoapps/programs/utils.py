@@ -435,11 +435,18 @@ class ProgramDataExtender(object):
 
     def _extend_course_runs(self):
         """Execute course run data handlers."""
+        course_overviews = CourseOverview.get_from_ids(
+            CourseKey.from_string(course_run['key'])
+            for course in self.data['courses']
+            for course_run in course['course_runs']
+        )
         for course in self.data['courses']:
             for course_run in course['course_runs']:
                 # State to be shared across handlers.
                 self.course_run_key = CourseKey.from_string(course_run['key'])
-                self.course_overview = CourseOverview.get_from_id(self.course_run_key)
+                self.course_overview = (
+                    course_overviews.get(self.course_run_key) or CourseOverview.get_from_id(self.course_run_key)
+                )
                 self.enrollment_start = self.course_overview.enrollment_start or DEFAULT_ENROLLMENT_START_DATE
 
                 self._execute('_attach_course_run', course_run)
@@ -253,6 +253,24 @@ def replace_static_urls(data_dir, block, view, frag, context, course_id=None, st
     ))
 
 
+def replace_urls(course_id, jump_to_id_base_url, data_dir, block, view, frag, context, static_asset_path=''):  # pylint: disable=unused-argument
+    """
+    Does the replacements of replace_static_urls, replace_course_urls and
+    replace_jump_to_id_urls in a single pass over the content of `frag`.
+    See static_replace.replace_urls.
+
+    output: a new :class:`~web_fragments.fragment.Fragment` that modifies `frag` with
+        content that has had its /static, /course and /jump_to_id links replaced
+    """
+    return wrap_fragment(frag, static_replace.replace_urls(
+        frag.content,
+        course_id,
+        data_directory=data_dir,
+        static_asset_path=static_asset_path,
+        jump_to_id_base_url=jump_to_id_base_url,
+    ))
+
+
 def grade_histogram(module_id):
     '''
     Print out a histogram of grades on a given problem in staff member debug info.